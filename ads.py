@@ -1,9 +1,137 @@
-import time
-import pandas as pd
+import sys
+from collections import defaultdict
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
 from tqdm import tqdm
-from src import api
-from src.utils.data import get_periodo_ultimos_dias, get_first_and_last_day_of_last_year
-from src.factories.factory import Factory
+from src import api, factory
+from src.models.mercado_livre import (
+    AdsMetricsResponse,
+    AdsSearchResponse,
+    AdvertisersResponse,
+)
+from src.models.records import AdsRecord, from_frame
+from src.models.rollups import agregar_ads
+from src.models.schemas import SCHEMA_ADS, aplicar_schema, to_frame
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.config import settings
+from src.utils.data import get_data_corte, somar_dias
+from src.utils.log import log
+
+# Anúncios por página na busca de anúncios do anunciante
+ADS_SEARCH_LIMIT = 50
+
+
+def get_intervalos_requisicao(
+    lista_mlb: List[str],
+    finalizados: Dict[str, Tuple[str, str]],
+    data_inicial: str,
+    data_final: str,
+    data_final_ano: str,
+) -> Dict[str, str]:
+    """
+    Define, por MLB, a data a partir da qual as métricas precisam ser requisitadas.
+
+    Dias já finalizados e armazenados em ads_ml não são requisitados novamente;
+    apenas a cauda ainda aberta (a partir do último dia finalizado) é buscada.
+    Janelas que alcançam o ano passado são requisitadas por completo, pois
+    esses dias são excluídos a cada execução.
+    """
+    datas: Dict[str, str] = {}
+
+    for mlb in lista_mlb:
+        data_from = data_inicial
+        intervalo = finalizados.get(mlb)
+
+        if intervalo is not None and data_inicial > data_final_ano:
+            finalizado_de, finalizado_ate = intervalo
+            if finalizado_de <= data_inicial <= somar_dias(finalizado_ate, 1):
+                data_from = max(data_inicial, somar_dias(finalizado_ate, 1))
+
+        if data_from <= data_final:
+            datas[mlb] = data_from
+
+    return datas
+
+
+def get_mlbs_com_anuncios(
+    id: str, data_inicial: str, data_final: str
+) -> Optional[Set[str]]:
+    """
+    Lista, em lote, os MLBs com anúncio ativo ou com atividade na janela.
+
+    Usa a busca de anúncios do anunciante (ADS_SEARCH_LIMIT por página) em
+    vez de uma requisição por MLB. Retorna None se a listagem não estiver
+    disponível, para que o chamador use todos os MLBs.
+    """
+    anunciantes = api.get(
+        f"{settings.ml_api_url}/advertising/advertisers?product_id=PADS",
+        id,
+        {"api-version": "1"},
+        schema=AdvertisersResponse,
+    )
+    if not anunciantes or not anunciantes.advertisers:
+        log.warning(f"Ads ML: anunciante não encontrado para {id}")
+        return None
+
+    advertiser_id = anunciantes.advertisers[0].advertiser_id
+    mlbs: Set[str] = set()
+    offset = 0
+    while True:
+        pagina = api.get(
+            f"{settings.ml_api_url}/advertising/advertisers/{advertiser_id}/product_ads/ads/search?limit={ADS_SEARCH_LIMIT}&offset={offset}&date_from={data_inicial}&date_to={data_final}&metrics=prints,clicks,cost",
+            id,
+            {"api-version": "2"},
+            schema=AdsSearchResponse,
+        )
+        if not pagina:
+            log.warning(f"Ads ML: falha ao listar anúncios de {id}")
+            return None
+
+        for anuncio in pagina.results:
+            metricas = anuncio.metrics
+            ativo_na_janela = metricas is not None and bool(
+                metricas.prints or metricas.clicks or metricas.cost
+            )
+            if anuncio.status == "active" or ativo_na_janela:
+                mlbs.add(anuncio.item_id)
+
+        offset += len(pagina.results)
+        if not pagina.results or offset >= pagina.paging.total:
+            break
+
+    log.info(f"Ads ML: {len(mlbs)} MLBs com anúncios ativos na janela para {id}")
+    return mlbs
+
+
+def get_mlbs_para_ads(id: str, data_inicial: str, data_final: str) -> List[str]:
+    """
+    Define os MLBs cujas métricas serão requisitadas.
+
+    Com ADS_PREFILTER, apenas MLBs com anúncio ativo ou atividade na janela;
+    com ADS_ONLY_SOLD_IN_WINDOW, apenas os que também venderam na janela.
+    Sem a listagem de anúncios, usa todos os MLBs já vendidos pela loja.
+    """
+    repository = factory.create_credentials_repository()
+
+    anunciados = (
+        get_mlbs_com_anuncios(id, data_inicial, data_final)
+        if settings.ads_prefilter
+        else None
+    )
+    if anunciados is None:
+        lista_mlb = repository.get_unique_mlbs_by_id(id)
+    else:
+        lista_mlb = sorted(anunciados)
+
+    if settings.ads_only_sold_in_window:
+        vendidos = set(
+            repository.get_unique_mlbs_by_id_and_date(id, data_inicial, data_final)
+        )
+        lista_mlb = [mlb for mlb in lista_mlb if mlb in vendidos]
+
+    return lista_mlb
 
 
 def req_ads(
@@ -13,73 +141,156 @@ def req_ads(
     data_inicial_ano: str,
     data_final_ano: str,
 ) -> bool:
-    repository = Factory().create_credentials_repository()
-    dados_ads = pd.DataFrame({})
-    lista_mlb = repository.get_unique_mlbs_by_id(id)
+    repository = factory.create_credentials_repository()
+    staging = factory.create_staging_service()
+    run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    registros: List[AdsRecord] = []
+    respostas_brutas: List[Dict[str, Any]] = []
+    try:
+        lista_mlb = get_mlbs_para_ads(id, data_inicial, data_final)
+    except CircuitOpenError as e:
+        log.error(f"Ads ML: {e}; sincronização de {id} não iniciada")
+        return False
 
-    for mlb in tqdm(lista_mlb):
-        result = api.get(
-            f"https://api.mercadolibre.com/advertising/MLB/product_ads/ads/{mlb}?limit=1&offset=0&date_from={data_anterior}&date_to={data_posterior}&metrics=clicks,prints,ctr,cost,cpc,acos,organic_units_quantity,organic_units_amount,organic_items_quantity,direct_items_quantity,indirect_items_quantity,advertising_items_quantity,cvr,roas,sov,direct_units_quantity,indirect_units_quantity,units_quantity,direct_amount,indirect_amount,total_amount&aggregation_type=DAILY",
-            id,
-            {"api-version": "2"},
-        )
+    data_corte = get_data_corte(settings.ads_attribution_days)
+    # No modo full todos os dias da janela são requisitados novamente
+    finalizados = (
+        {} if settings.sync_mode == "full" else repository.get_ads_finalized_ranges(id)
+    )
+    datas_requisicao = get_intervalos_requisicao(
+        lista_mlb, finalizados, data_inicial, data_final, data_final_ano
+    )
+
+    mlbs_por_data: Dict[str, List[str]] = defaultdict(list)
+    novos_finalizados: Dict[str, Tuple[str, str]] = {}
+
+    interrompido = False
+    # Janela inteira fora da atribuição: as métricas não mudam mais
+    cache_ttl = settings.ml_cache_final_ttl if data_final < data_corte else None
+
+    for mlb, data_from in tqdm(datas_requisicao.items()):
+        try:
+            result = api.get(
+                f"{settings.ml_api_url}/advertising/MLB/product_ads/ads/{mlb}?limit=1&offset=0&date_from={data_from}&date_to={data_final}&metrics=clicks,prints,ctr,cost,cpc,acos,organic_units_quantity,organic_units_amount,organic_items_quantity,direct_items_quantity,indirect_items_quantity,advertising_items_quantity,cvr,roas,sov,direct_units_quantity,indirect_units_quantity,units_quantity,direct_amount,indirect_amount,total_amount&aggregation_type=DAILY",
+                id,
+                {"api-version": "2"},
+                cache_ttl=cache_ttl,
+                schema=AdsMetricsResponse,
+            )
+        except CircuitOpenError as e:
+            # Grava os MLBs já requisitados (e seus dias finalizados) e para
+            interrompido = True
+            log.error(
+                f"Ads ML: {e}; gravando os {sum(map(len, mlbs_por_data.values()))} "
+                f"MLBs já requisitados de {id} e interrompendo"
+            )
+            break
+
+        if not result:
+            continue
+
+        mlbs_por_data[data_from].append(mlb)
+        if staging is not None:
+            respostas_brutas.append({"mlb": mlb, **asdict(result)})
+
+        # Dias anteriores ao corte passam a ser finais para este MLB
+        ultimo_finalizado = somar_dias(data_corte, -1)
+        if ultimo_finalizado >= data_from:
+            intervalo = finalizados.get(mlb)
+            if data_from > data_inicial and intervalo is not None:
+                novos_finalizados[mlb] = (intervalo[0], ultimo_finalizado)
+            else:
+                novos_finalizados[mlb] = (data_from, ultimo_finalizado)
 
-        df_result = pd.DataFrame(result["results"])
-        df_result["mlb"] = mlb
-        df_result["id"] = id
-
-        if result and "date" in df_result.columns:
-            df_result["date"] = pd.to_datetime(df_result["date"])
-            df_result = df_result.sort_values("date").reset_index(drop=True)
-
-        dados_ads = pd.concat([dados_ads, df_result], ignore_index=True)
-
-    if len(dados_ads) > 0:
-        df_vendas_ml = pd.DataFrame(dados_ads)
-        df_vendas_ml = df_vendas_ml.fillna(
-            {
-                "Número_do_pedido_multiloja": 0,
-                "title": "",
-                "category_id": "",
-                "mlb": "",
-                "seller_sku": "",
-                "quantity": 0,
-                "unit_price": 0.0,
-                "full_unit_price": 0.0,
-                "sale_fee": 0.0,
-                "listing_type_id": "",
-                "pack_id": 0,
-                "date_created": "",
-                "paid_amount": 0.0,
-                "id": id,
-            }
+        metricas = sorted(result.results, key=lambda m: m.date)
+        registros.extend(AdsRecord.from_metric(m, mlb, id) for m in metricas)
+
+    if len(registros) > 0 and staging is not None:
+        df_ads = to_frame(registros, SCHEMA_ADS)
+        staging.write_raw("ads", id, run_id, respostas_brutas)
+        staging.write_frame("ads", id, df_ads, "date")
+
+    if settings.write_backend == "none":
+        log.info(
+            f"Ads ML: {len(registros)} registros de {id} não gravados (ML_WRITE_BACKEND=none)"
         )
+        return not interrompido
 
+    if len(registros) > 0:
         repository.delete_ads_by_id_and_date(id, data_inicial_ano, data_final_ano)
-        repository.delete_ads_by_id_and_date(id, data_inicial, data_final)
+        for data_from, mlbs in mlbs_por_data.items():
+            repository.delete_ads_by_mlbs_and_date(id, mlbs, data_from, data_final)
 
-        repository.insert_ads_from_dataframe(df_vendas_ml)
+        repository.insert_ads_records(registros)
 
-    return True
+        if settings.daily_rollups:
+            # Os dias de cada MLB requisitado vêm completos em registros
+            repository.delete_ads_rollups_by_id_and_date(
+                id, data_inicial_ano, data_final_ano
+            )
+            repository.upsert_ads_rollups(agregar_ads(registros))
 
+    repository.save_ads_finalized_ranges(id, novos_finalizados)
 
-if __name__ == "__main__":
-    start_time = time.time()
+    return not interrompido
 
-    # id = sys.argv[1]
-    # periodo = sys.argv[2]
 
-    id = "179385579"
-    periodo = "short"
+def recarregar_ads_do_staging(id: str, data_inicial: str, data_final: str) -> bool:
+    """
+    Regrava em ads_ml as métricas do período a partir do staging, sem chamar a API.
+    """
+    repository = factory.create_credentials_repository()
+    staging = factory.create_staging_service()
+    if staging is None:
+        log.error("Ads ML: staging não configurado (ML_STAGING_DIR)")
+        return False
 
-    data_inicial_ano, data_final_ano = get_first_and_last_day_of_last_year()
+    df_ads = staging.load_frame("ads", id, data_inicial, data_final)
+    if df_ads.empty:
+        log.warning(f"Ads ML: nenhum dado no staging para {id}")
+        return False
+    df_ads = aplicar_schema(df_ads, SCHEMA_ADS)
 
-    if periodo == "short":
-        data_anterior, data_posterior = get_periodo_ultimos_dias(7)
-    else:
-        data_anterior, data_posterior = get_periodo_ultimos_dias(120)
+    # Cada partição tem apenas os MLBs requisitados na última execução que a
+    # gravou: exclui só os pares (MLB, dia) presentes no staging
+    registros = from_frame(AdsRecord, df_ads)
+    for (de, ate), mlbs in _intervalos_por_mlb(registros).items():
+        repository.delete_ads_by_mlbs_and_date(id, mlbs, de, ate)
+    repository.insert_ads_records(registros)
+
+    if settings.daily_rollups:
+        # O upsert por (id, date, mlb) substitui apenas os mesmos pares
+        repository.upsert_ads_rollups(agregar_ads(registros))
+    return True
 
-    req_ads(id, data_anterior, data_posterior, data_inicial_ano, data_final_ano)
 
-    end_time = time.time()
-    print(f"Vendas ML requisitadas em {end_time - start_time:.2f} segundos")
+def _intervalos_por_mlb(registros: List[AdsRecord]) -> Dict[Tuple[str, str], List[str]]:
+    """
+    Agrupa os dias de cada MLB em intervalos consecutivos.
+
+    Returns:
+        {(primeiro dia, último dia): MLBs com exatamente esse intervalo}
+    """
+    dias: Dict[str, Set[str]] = defaultdict(set)
+    for r in registros:
+        if r.date:
+            dias[r.mlb].add(r.date)
+
+    intervalos: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    for mlb, datas in dias.items():
+        de = ate = None
+        for dia in sorted(datas):
+            if ate is not None and dia == somar_dias(ate, 1):
+                ate = dia
+                continue
+            if de is not None:
+                intervalos[(de, ate)].append(mlb)
+            de = ate = dia
+        intervalos[(de, ate)].append(mlb)
+    return intervalos
+
+
+if __name__ == "__main__":
+    from src.cli import main
+
+    sys.exit(main(["sync", "ads", *sys.argv[1:]]))
@@ -0,0 +1,564 @@
+"""
+Stand-in local da API do Mercado Livre para benchmarks.
+
+Atende os endpoints usados pela integração com dados sintéticos e
+determinísticos:
+
+- GET  /orders/search                               (paginação e limite de offset)
+- GET  /orders/{id}                                  (pedido do seller do token)
+- GET  /advertising/MLB/product_ads/ads/{mlb}        (métricas DAILY)
+- GET  /items?ids=...                                 (multi-get, até 20 ids)
+- GET  /advertising/advertisers?product_id=PADS      (anunciante do token)
+- GET  /advertising/advertisers/{id}/product_ads/ads/search (anúncios paginados)
+- POST /oauth/token                                  (refresh com rotação)
+- POST /__changes?seller=&updates=&cancels=&new=     (altera pedidos e devolve
+                                                      as notificações orders_v2)
+
+Latência e erros (401, 429, 5xx) são injetados de forma configurável.
+Respostas grandes saem em gzip quando o cliente envia Accept-Encoding: gzip.
+"""
+
+import bisect
+import gzip
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Respostas a partir deste tamanho saem em gzip, se o cliente aceitar
+GZIP_MIN_BYTES = 1024
+MAX_OFFSET = 10000
+MAX_MULTIGET = 20
+MAX_ADS_SEARCH_LIMIT = 50
+
+
+@dataclass
+class FakeMLConfig:
+    latency_ms: float = 0.0
+    error_401_rate: float = 0.0
+    error_429_rate: float = 0.0
+    error_5xx_rate: float = 0.0
+    max_limit: int = 51
+    days: int = 120
+    items_per_seller: int = 200
+    # Fração dos itens com anúncio ativo
+    ads_active_rate: float = 0.1
+    seed: int = 42
+    # seller id -> quantidade de pedidos gerados na janela
+    sellers: Dict[str, int] = field(default_factory=dict)
+
+
+class FakeMercadoLivre:
+    """Dados sintéticos e estado (tokens, contadores) do stand-in."""
+
+    def __init__(self, config: FakeMLConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed)
+        self.orders: Dict[str, List[Dict[str, Any]]] = {}
+        self.order_dates: Dict[str, List[datetime]] = {}
+        # order id -> (seller, pedido), para GET /orders/{id}
+        self.orders_by_id: Dict[int, Any] = {}
+        self.items: Dict[str, List[Dict[str, Any]]] = {}
+        self.items_by_id: Dict[str, Dict[str, Any]] = {}
+        # token -> seller ("" quando emitido sem seller)
+        self.access_tokens: Dict[str, str] = {}
+        self.refresh_tokens: Dict[str, str] = {}
+        self.requests: Dict[str, int] = {}
+        self.statuses: Dict[int, int] = {}
+        self.bytes_sent = 0
+
+        for seller_id, n_orders in config.sellers.items():
+            self._generate_seller(seller_id, n_orders)
+
+    def issue_tokens(self, seller: str = "") -> Dict[str, str]:
+        """Emite um par de tokens válido (usado para semear credenciais)."""
+        with self._lock:
+            access = f"APP_USR-{self._rng.getrandbits(64):016x}"
+            refresh = f"TG-{self._rng.getrandbits(64):016x}"
+            self.access_tokens[access] = seller
+            self.refresh_tokens[refresh] = seller
+        return {"access_token": access, "refresh_token": refresh}
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def count(self, endpoint: str, status: int, size: int) -> None:
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_sent += size
+
+    def roll_error(self) -> Optional[int]:
+        """Sorteia um erro a ser injetado, conforme as taxas configuradas."""
+        with self._lock:
+            roll = self._rng.random()
+        cfg = self.config
+        if roll < cfg.error_429_rate:
+            return 429
+        roll -= cfg.error_429_rate
+        if roll < cfg.error_401_rate:
+            return 401
+        roll -= cfg.error_401_rate
+        if roll < cfg.error_5xx_rate:
+            return 500
+        return None
+
+    def _generate_seller(self, seller_id: str, n_orders: int) -> None:
+        rng = random.Random(f"{self.config.seed}-{seller_id}")
+        items = [
+            {
+                "id": f"MLB{rng.randint(10**9, 10**10 - 1)}",
+                "title": f"Produto {i} do seller {seller_id}",
+                "category_id": f"MLB{rng.randint(1000, 9999)}",
+                "seller_sku": f"SKU-{seller_id}-{i}",
+                "listing_type_id": rng.choice(["gold_special", "gold_pro"]),
+                "status": rng.choice(["active", "active", "active", "paused"]),
+                "price": round(rng.uniform(10, 500), 2),
+            }
+            for i in range(self.config.items_per_seller)
+        ]
+
+        now = datetime.now(timezone(timedelta(hours=-4))).replace(microsecond=0)
+        start = now - timedelta(days=self.config.days)
+        span = int((now - start).total_seconds())
+        orders = []
+        for n in range(n_orders):
+            # Segundos arredondados a cada 10s para gerar timestamps repetidos
+            created = start + timedelta(seconds=rng.randrange(0, span, 10))
+            orders.append(_build_order(rng, items, seller_id, n, created))
+        orders.sort(key=lambda o: (o["date_created"], o["id"]))
+        self.orders[seller_id] = orders
+        self.order_dates[seller_id] = [
+            _parse_date(o["date_created"]) for o in orders  # type: ignore
+        ]
+        self.orders_by_id.update((o["id"], (seller_id, o)) for o in orders)
+        self.items[seller_id] = items
+        self.items_by_id.update((item["id"], item) for item in items)
+
+    def get_order(self, seller: str, order_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self.orders_by_id.get(order_id)
+        return entry[1] if entry and entry[0] == seller else None
+
+    def change_orders(
+        self, seller: str, updates: int, cancels: int, new: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Altera pedidos do seller e devolve as notificações orders_v2 correspondentes.
+
+        updates muda a quantidade de um item, cancels cancela pedidos pagos e
+        new cria pedidos com a data atual.
+        """
+        rng = random.Random(f"{self.config.seed}-changes-{seller}-{len(self.orders_by_id)}")
+        with self._lock:
+            orders = self.orders[seller]
+            pagos = [o for o in orders if o["status"] == "paid"]
+            alterados = rng.sample(pagos, min(updates + cancels, len(pagos)))
+            for order in alterados[:updates]:
+                item = order["order_items"][0]
+                item["quantity"] += 1
+                order["paid_amount"] = round(
+                    sum(i["unit_price"] * i["quantity"] for i in order["order_items"]), 2
+                )
+            for order in alterados[updates:]:
+                order["status"] = "cancelled"
+
+            now = datetime.now(timezone(timedelta(hours=-4))).replace(microsecond=0)
+            criados = []
+            for _ in range(new):
+                order = _build_order(
+                    rng, self.items[seller], seller, len(orders), now
+                )
+                orders.append(order)
+                self.order_dates[seller].append(_parse_date(order["date_created"]))  # type: ignore
+                self.orders_by_id[order["id"]] = (seller, order)
+                criados.append(order)
+
+        return [
+            {
+                "resource": f"/orders/{order['id']}",
+                "user_id": int(seller),
+                "topic": "orders_v2",
+                "application_id": 1,
+                "attempts": 1,
+                "sent": datetime.now(timezone.utc).isoformat(),
+            }
+            for order in alterados + criados
+        ]
+
+    def multiget_items(self, ids: List[str], attributes: Optional[str]) -> List[Any]:
+        fields = attributes.split(",") if attributes else None
+        entries = []
+        for mlb in ids:
+            item = self.items_by_id.get(mlb)
+            if item is None:
+                entries.append(
+                    {"code": 404, "body": {"message": f"Item {mlb} not found", "error": "not_found"}}
+                )
+                continue
+            body = {k: v for k, v in item.items() if fields is None or k in fields}
+            entries.append({"code": 200, "body": body})
+        return entries
+
+    def search_orders(self, params: Dict[str, str]) -> Dict[str, Any]:
+        seller = params.get("seller", "")
+        orders = self.orders.get(seller, [])
+        dates = self.order_dates.get(seller, [])
+        date_from = _parse_date(params.get("order.date_created.from"))
+        date_to = _parse_date(params.get("order.date_created.to"))
+        lo = bisect.bisect_left(dates, date_from) if date_from else 0
+        hi = bisect.bisect_right(dates, date_to) if date_to else len(dates)
+        selected = orders[lo:hi]
+        status = params.get("order.status")
+        if status:
+            selected = [o for o in selected if o["status"] == status]
+        if params.get("sort") == "date_desc":
+            selected = selected[::-1]
+
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 50))
+        return {
+            "query": "",
+            "results": selected[offset : offset + limit],
+            "paging": {"total": len(selected), "offset": offset, "limit": limit},
+        }
+
+    def ad_status(self, mlb: str) -> Optional[str]:
+        """
+        Situação do anúncio do item: None (sem anúncio), "active",
+        "paused_recent" (pausado com atividade na janela) ou "paused".
+        """
+        roll = random.Random(f"{self.config.seed}-ad-{mlb}").random()
+        if roll < self.config.ads_active_rate:
+            return "active"
+        if roll < self.config.ads_active_rate * 1.3:
+            return "paused_recent"
+        if roll < self.config.ads_active_rate * 1.6:
+            return "paused"
+        return None
+
+    def search_ads(self, seller: str, params: Dict[str, str]) -> Dict[str, Any]:
+        anunciados = [
+            (item["id"], status)
+            for item in self.items.get(seller, [])
+            if (status := self.ad_status(item["id"])) is not None
+        ]
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 50))
+        results = []
+        for mlb, status in anunciados[offset : offset + limit]:
+            totals = {"prints": 0, "clicks": 0, "cost": 0.0}
+            if status != "paused" and "date_from" in params:
+                for day in self.ads_metrics(mlb, params)["results"]:
+                    for key in totals:
+                        totals[key] += day[key]
+            results.append(
+                {
+                    "item_id": mlb,
+                    "campaign_id": int(seller) * 10,
+                    "status": "active" if status == "active" else "paused",
+                    "metrics": {**totals, "cost": round(totals["cost"], 2)},
+                }
+            )
+        return {
+            "paging": {"total": len(anunciados), "offset": offset, "limit": limit},
+            "results": results,
+        }
+
+    def ads_metrics(self, mlb: str, params: Dict[str, str]) -> Dict[str, Any]:
+        day = datetime.strptime(params["date_from"], "%Y-%m-%d")
+        end = datetime.strptime(params["date_to"], "%Y-%m-%d")
+        sem_atividade = self.ad_status(mlb) in (None, "paused")
+        results = []
+        while day <= end:
+            if sem_atividade:
+                results.append(
+                    {"date": day.strftime("%Y-%m-%d"), "clicks": 0, "prints": 0, "cost": 0}
+                )
+                day += timedelta(days=1)
+                continue
+            rng = random.Random(f"{self.config.seed}-{mlb}-{day:%Y-%m-%d}")
+            prints = rng.randint(0, 2000)
+            clicks = rng.randint(0, max(prints // 20, 1))
+            cost = round(clicks * rng.uniform(0.2, 1.5), 2)
+            amount = round(rng.uniform(0, 5) * cost, 2)
+            results.append(
+                {
+                    "date": day.strftime("%Y-%m-%d"),
+                    "clicks": clicks,
+                    "prints": prints,
+                    "ctr": round(clicks / prints * 100, 2) if prints else 0,
+                    "cost": cost,
+                    "cpc": round(cost / clicks, 2) if clicks else 0,
+                    "acos": round(cost / amount * 100, 2) if amount else 0,
+                    "roas": round(amount / cost, 2) if cost else 0,
+                    "units_quantity": rng.randint(0, 5),
+                    "direct_amount": amount,
+                    "indirect_amount": 0,
+                    "total_amount": amount,
+                }
+            )
+            day += timedelta(days=1)
+        return {"paging": {"total": 1, "offset": 0, "limit": 1}, "results": results}
+
+    def refresh(self, form: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            token = form.get("refresh_token", "")
+            if token not in self.refresh_tokens:
+                return None
+            # O refresh token é rotacionado: o anterior deixa de valer
+            seller = self.refresh_tokens.pop(token)
+        tokens = self.issue_tokens(seller)
+        return {**tokens, "token_type": "Bearer", "expires_in": 21600}
+
+
+def _build_order(
+    rng: random.Random,
+    items: List[Dict[str, Any]],
+    seller_id: str,
+    n: int,
+    created: datetime,
+) -> Dict[str, Any]:
+    order_items = []
+    for _ in range(rng.choice([1, 1, 1, 2, 3])):
+        item = rng.choice(items)
+        unit_price = item["price"]
+        order_items.append(
+            {
+                "item": {
+                    "id": item["id"],
+                    "title": item["title"],
+                    "category_id": item["category_id"],
+                    "seller_sku": item["seller_sku"],
+                },
+                "quantity": rng.randint(1, 3),
+                "unit_price": unit_price,
+                "full_unit_price": unit_price,
+                "sale_fee": round(unit_price * 0.14, 2),
+                "listing_type_id": item["listing_type_id"],
+            }
+        )
+    return {
+        "id": int(f"2000{seller_id[-4:]:0>4}{n:08d}"),
+        "pack_id": rng.choice([None, int(f"3000{n:09d}")]),
+        "date_created": created.isoformat(timespec="milliseconds"),
+        "status": "paid",
+        "paid_amount": round(
+            sum(i["unit_price"] * i["quantity"] for i in order_items), 2
+        ),
+        "order_items": order_items,
+    }
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _make_handler(state: FakeMercadoLivre):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers e corpo saem em writes separados; sem TCP_NODELAY, conexões
+        # keep-alive esperam o ACK atrasado do cliente (~40 ms) a cada resposta
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, endpoint: str, status: int, body: Any) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if len(payload) >= GZIP_MIN_BYTES and "gzip" in self.headers.get(
+                "Accept-Encoding", ""
+            ):
+                payload = gzip.compress(payload, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            state.count(endpoint, status, len(payload))
+
+        def _send_raw(self, status: int, body: Any) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_stats(self) -> None:
+            with state._lock:
+                stats = {
+                    "requests": dict(state.requests),
+                    "statuses": {str(k): v for k, v in state.statuses.items()},
+                    "bytes_sent": state.bytes_sent,
+                }
+            self._send_raw(200, stats)
+
+        def _prepare(self, endpoint: str, check_auth: bool = True) -> bool:
+            if state.config.latency_ms:
+                time.sleep(state.config.latency_ms / 1000)
+
+            error = state.roll_error()
+            if error is not None and (check_auth or error != 401):
+                self._send(endpoint, error, {"message": "injected", "status": error})
+                return False
+
+            if check_auth:
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                if token not in state.access_tokens:
+                    self._send(
+                        endpoint, 401, {"message": "invalid access token", "status": 401}
+                    )
+                    return False
+                self.seller = state.access_tokens[token]
+            return True
+
+        def do_GET(self) -> None:
+            parts = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            path = parts.path.rstrip("/")
+
+            if path == "/__stats":
+                self._send_stats()
+                return
+
+            if path == "/orders/search":
+                if not self._prepare(path):
+                    return
+                if int(params.get("limit", 50)) > state.config.max_limit:
+                    self._send(path, 400, {"message": "invalid limit", "status": 400})
+                    return
+                if int(params.get("offset", 0)) >= MAX_OFFSET:
+                    self._send(path, 400, {"message": "invalid offset", "status": 400})
+                    return
+                self._send(path, 200, state.search_orders(params))
+                return
+
+            if path.startswith("/orders/"):
+                endpoint = "/orders/{id}"
+                if not self._prepare(endpoint):
+                    return
+                order = state.get_order(self.seller, int(path.rsplit("/", 1)[-1]))
+                if order is None:
+                    self._send(endpoint, 404, {"message": "order not found", "status": 404})
+                    return
+                self._send(endpoint, 200, order)
+                return
+
+            if path == "/items":
+                if not self._prepare(path):
+                    return
+                ids = [i for i in params.get("ids", "").split(",") if i]
+                if not ids or len(ids) > MAX_MULTIGET:
+                    self._send(path, 400, {"message": "invalid ids", "status": 400})
+                    return
+                self._send(path, 200, state.multiget_items(ids, params.get("attributes")))
+                return
+
+            if path == "/advertising/advertisers":
+                if not self._prepare(path):
+                    return
+                advertisers = (
+                    [{"advertiser_id": int(self.seller), "site_id": "MLB"}]
+                    if self.seller and params.get("product_id") == "PADS"
+                    else []
+                )
+                self._send(path, 200, {"advertisers": advertisers})
+                return
+
+            if path.startswith("/advertising/advertisers/") and path.endswith(
+                "/product_ads/ads/search"
+            ):
+                endpoint = "/advertising/advertisers/{id}/product_ads/ads/search"
+                if not self._prepare(endpoint):
+                    return
+                advertiser = path.split("/")[3]
+                if self.headers.get("api-version") != "2" or advertiser != self.seller:
+                    self._send(endpoint, 400, {"message": "bad request", "status": 400})
+                    return
+                if int(params.get("limit", 50)) > MAX_ADS_SEARCH_LIMIT:
+                    self._send(endpoint, 400, {"message": "invalid limit", "status": 400})
+                    return
+                self._send(endpoint, 200, state.search_ads(advertiser, params))
+                return
+
+            prefix = "/advertising/MLB/product_ads/ads/"
+            if path.startswith(prefix):
+                endpoint = prefix + "{mlb}"
+                if not self._prepare(endpoint):
+                    return
+                if self.headers.get("api-version") != "2":
+                    self._send(endpoint, 400, {"message": "api-version", "status": 400})
+                    return
+                self._send(
+                    endpoint, 200, state.ads_metrics(path[len(prefix) :], params)
+                )
+                return
+
+            self._send(path, 404, {"message": "not found", "status": 404})
+
+        def do_POST(self) -> None:
+            parts = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length).decode("utf-8")
+
+            if parts.path == "/__tokens":
+                seller = parse_qs(parts.query).get("seller", [""])[-1]
+                self._send_raw(200, state.issue_tokens(seller))
+                return
+
+            if parts.path == "/__changes":
+                params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                self._send_raw(
+                    200,
+                    state.change_orders(
+                        params["seller"],
+                        int(params.get("updates", 0)),
+                        int(params.get("cancels", 0)),
+                        int(params.get("new", 0)),
+                    ),
+                )
+                return
+
+            if parts.path == "/oauth/token":
+                if not self._prepare(parts.path, check_auth=False):
+                    return
+                form = {k: v[-1] for k, v in parse_qs(body).items()}
+                tokens = state.refresh(form)
+                if tokens is None:
+                    self._send(
+                        parts.path, 400, {"error": "invalid_grant", "status": 400}
+                    )
+                    return
+                self._send(parts.path, 200, tokens)
+                return
+
+            self._send(parts.path, 404, {"message": "not found", "status": 404})
+
+    return Handler
+
+
+def start_fake_ml_api(
+    config: FakeMLConfig, host: str = "127.0.0.1", port: int = 0
+) -> tuple[ThreadingHTTPServer, FakeMercadoLivre]:
+    """
+    Sobe o stand-in em uma thread daemon.
+
+    Returns:
+        Servidor HTTP (server.server_port tem a porta) e o estado compartilhado
+    """
+    state = FakeMercadoLivre(config)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
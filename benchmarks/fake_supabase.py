@@ -0,0 +1,252 @@
+"""
+Stand-in local do Supabase (PostgREST) para benchmarks.
+
+Implementa, em memória, o subconjunto da API REST usado pelo repositório:
+select com filtros (eq, neq, gt, gte, lt, lte, in), offset/limit, contagem
+via Prefer: count=exact, insert, upsert (on_conflict, merge ou ignore
+duplicates), update e delete.
+Corpos com Content-Encoding: gzip são aceitos.
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+}
+
+_RESERVED_PARAMS = {"select", "offset", "limit", "order", "on_conflict", "columns"}
+
+
+class FakeSupabase:
+    """Tabelas em memória e contadores do stand-in."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rows_written = 0
+        self.bytes_received = 0
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.tables.setdefault(table, []).extend(dict(r) for r in rows)
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [dict(r) for r in self.tables.get(table, [])]
+
+
+def _coerce(raw: str) -> str:
+    return raw[1:-1] if len(raw) >= 2 and raw[0] == raw[-1] == '"' else raw
+
+
+def _compare_value(row_value: Any, raw: str) -> Tuple[Any, Any]:
+    """Compara números como números e o resto como texto (datas ISO inclusas)."""
+    if isinstance(row_value, (int, float)) and not isinstance(row_value, bool):
+        try:
+            return row_value, float(raw)
+        except ValueError:
+            pass
+    if row_value is None:
+        return None, raw
+    return str(row_value)[: len(raw)] if _is_date(raw) else str(row_value), raw
+
+
+def _is_date(raw: str) -> bool:
+    return len(raw) == 10 and raw[4] == "-" and raw[7] == "-"
+
+
+def _build_filters(params: List[Tuple[str, str]]) -> List[Callable[[Dict], bool]]:
+    filters = []
+    for column, expression in params:
+        if column in _RESERVED_PARAMS:
+            continue
+        op, _, raw = expression.partition(".")
+        if op == "in":
+            values = {_coerce(v) for v in raw.strip("()").split(",") if v}
+            filters.append(
+                lambda row, c=column, vs=values: str(row.get(c)) in vs
+            )
+        elif op in _OPERATORS:
+            raw = _coerce(raw)
+
+            def check(row, c=column, o=_OPERATORS[op], r=raw):
+                a, b = _compare_value(row.get(c), r)
+                return o(a, b)
+
+            filters.append(check)
+    return filters
+
+
+def _make_handler(state: FakeSupabase):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers e corpo saem em writes separados; sem TCP_NODELAY, conexões
+        # keep-alive esperam o ACK atrasado do cliente (~40 ms) a cada resposta
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _parse(self) -> Tuple[str, List[Tuple[str, str]], Dict[str, str]]:
+            parts = urlsplit(self.path)
+            table = parts.path.rsplit("/", 1)[-1]
+            params = parse_qsl(parts.query, keep_blank_values=True)
+            return table, params, dict(params)
+
+        def _body(self) -> Any:
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length) if length else b""
+            with state.lock:
+                state.bytes_received += len(raw)
+            if self.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            return json.loads(raw) if raw else None
+
+        def _send(
+            self, status: int, body: Any, headers: Optional[Dict[str, str]] = None
+        ) -> None:
+            payload = json.dumps(body, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(payload)
+
+        def _begin(self) -> None:
+            if state.latency_ms:
+                time.sleep(state.latency_ms / 1000)
+            with state.lock:
+                state.requests += 1
+
+        def _project(self, rows: List[Dict], select: Optional[str]) -> List[Dict]:
+            if not select or select.strip() == "*":
+                return rows
+            columns = [c.strip() for c in select.split(",")]
+            return [{c: r.get(c) for c in columns} for r in rows]
+
+        def do_GET(self) -> None:
+            if self.path == "/__stats":
+                with state.lock:
+                    stats = {
+                        "requests": state.requests,
+                        "rows_written": state.rows_written,
+                        "bytes_received": state.bytes_received,
+                        "tables": {t: len(r) for t, r in state.tables.items()},
+                    }
+                self._send(200, stats)
+                return
+
+            self._begin()
+            table, params, single = self._parse()
+            filters = _build_filters(params)
+            with state.lock:
+                rows = [
+                    dict(r)
+                    for r in state.tables.get(table, [])
+                    if all(f(r) for f in filters)
+                ]
+            total = len(rows)
+            offset = int(single.get("offset", 0))
+            limit = int(single["limit"]) if "limit" in single else None
+            rows = rows[offset : offset + limit if limit is not None else None]
+
+            headers = {}
+            if "count=" in self.headers.get("Prefer", ""):
+                end = offset + len(rows) - 1
+                headers["Content-Range"] = f"{offset}-{max(end, offset)}/{total}"
+            self._send(200, self._project(rows, single.get("select")), headers)
+
+        def do_HEAD(self) -> None:
+            self.do_GET()
+
+        def do_POST(self) -> None:
+            self._begin()
+            table, _, single = self._parse()
+            body = self._body()
+            records = body if isinstance(body, list) else [body]
+            prefer = self.headers.get("Prefer", "")
+            conflict = [
+                c.strip() for c in single.get("on_conflict", "").split(",") if c.strip()
+            ]
+
+            with state.lock:
+                rows = state.tables.setdefault(table, [])
+                if "resolution=" in prefer and conflict:
+                    merge = "resolution=merge-duplicates" in prefer
+                    index = {tuple(r.get(c) for c in conflict): r for r in rows}
+                    for record in records:
+                        key = tuple(record.get(c) for c in conflict)
+                        if key in index:
+                            if merge:
+                                index[key].update(record)
+                        else:
+                            rows.append(dict(record))
+                            index[key] = rows[-1]
+                else:
+                    rows.extend(dict(r) for r in records)
+                state.rows_written += len(records)
+
+            self._send(201, records if "return=representation" in prefer else [])
+
+        def do_PATCH(self) -> None:
+            self._begin()
+            table, params, _ = self._parse()
+            filters = _build_filters(params)
+            changes = self._body() or {}
+            updated = []
+            with state.lock:
+                for row in state.tables.get(table, []):
+                    if all(f(row) for f in filters):
+                        row.update(changes)
+                        updated.append(dict(row))
+                state.rows_written += len(updated)
+            self._send(200, updated)
+
+        def do_DELETE(self) -> None:
+            self._begin()
+            self._body()
+            table, params, _ = self._parse()
+            filters = _build_filters(params)
+            with state.lock:
+                rows = state.tables.get(table, [])
+                kept, deleted = [], []
+                for row in rows:
+                    (deleted if all(f(row) for f in filters) else kept).append(row)
+                state.tables[table] = kept
+            self._send(200, deleted)
+
+    return Handler
+
+
+def start_fake_supabase(
+    latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0
+) -> tuple[ThreadingHTTPServer, FakeSupabase]:
+    """
+    Sobe o stand-in em uma thread daemon.
+
+    Use http://host:porta como SUPABASE_URL (o cliente acrescenta /rest/v1).
+
+    Returns:
+        Servidor HTTP e o estado compartilhado
+    """
+    state = FakeSupabase(latency_ms)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
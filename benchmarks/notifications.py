@@ -0,0 +1,195 @@
+"""
+Benchmark do receptor de notificações orders_v2 contra os stand-ins locais.
+
+Popula sales_ml com uma sincronização por janela, altera pedidos no stand-in
+(quantidades, cancelamentos e pedidos novos), envia ao receptor as
+notificações geradas, com repetições, e mede o tempo até sales_ml refletir
+as alterações e as requisições feitas, comparando com a sincronização por
+janela.
+
+Uso:
+    python -m benchmarks.notifications --orders 5000 --days 7 \\
+        --updates 40 --cancels 5 --new 15 --duplicates 0.5 --latency-ms 20
+
+Falha (código 1) se alguma linha de sales_ml não corresponder ao pedido no
+stand-in depois do processamento.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_ml_api import FakeMLConfig
+from benchmarks.run import _http_json, _serve_ml, _serve_supabase, _start
+
+SELLER = "900002"
+
+
+def _post(url: str, body: Dict[str, Any]) -> float:
+    started = time.perf_counter()
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--history-days", type=int, default=30)
+    parser.add_argument("--updates", type=int, default=40)
+    parser.add_argument("--cancels", type=int, default=5)
+    parser.add_argument("--new", type=int, default=15)
+    parser.add_argument(
+        "--duplicates", type=float, default=0.5, help="Fração de notificações reenviadas"
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--senders", type=int, default=8, help="Envios em paralelo")
+    args = parser.parse_args(argv)
+
+    config = FakeMLConfig(
+        latency_ms=args.latency_ms,
+        days=args.history_days,
+        sellers={SELLER: args.orders},
+    )
+    ml_url = f"http://127.0.0.1:{_start(_serve_ml, config)}"
+    supabase_url = f"http://127.0.0.1:{_start(_serve_supabase, 0.0)}"
+
+    # As variáveis precisam existir antes do primeiro import de src
+    os.environ.update(
+        {
+            "SUPABASE_URL": supabase_url,
+            "SUPABASE_KEY": "benchmark",
+            "ML_API_URL": ml_url,
+            "ML_APP_ID": "benchmark",
+            "ML_APP_SECRET": "benchmark",
+        }
+    )
+    os.environ.setdefault("ENCRYPTION_KEY", "benchmark")
+
+    from src import api, factory
+    from src.utils.data import (
+        get_first_and_last_day_of_last_year,
+        get_periodo_ultimos_dias,
+    )
+    from src.webhook import NOTIFICATIONS_PATH, criar_servidor_webhook
+    from vendas import get_vendas_ml
+
+    encryption = factory.create_encryption_service()
+    supabase = factory.create_supabase_client()
+    tokens = _http_json(f"{ml_url}/__tokens?seller={SELLER}", method="POST")
+    supabase.table("credenciais_ml").insert(
+        {
+            "id": SELLER,
+            "access_token": encryption.encrypt(tokens["access_token"]),
+            "refresh_token": encryption.encrypt(tokens["refresh_token"]),
+            "validade": str(datetime.now() + timedelta(hours=4)),
+            "client_id": "benchmark",
+            "token_version": 0,
+        }
+    ).execute()
+
+    def ml_stats() -> Dict[str, Any]:
+        return _http_json(f"{ml_url}/__stats")
+
+    # Sincronização por janela: carga inicial e referência de custo
+    before = ml_stats()
+    started = time.perf_counter()
+    janela = (*get_periodo_ultimos_dias(args.days), *get_first_and_last_day_of_last_year())
+    get_vendas_ml(SELLER, *janela)
+    poll_wall = time.perf_counter() - started
+    after = ml_stats()
+    poll_requests = sum(after["requests"].values()) - sum(before["requests"].values())
+    poll_bytes = after["bytes_sent"] - before["bytes_sent"]
+
+    service = factory.create_order_notification_service(api)
+    server = criar_servidor_webhook(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    callback = f"http://127.0.0.1:{server.server_port}{NOTIFICATIONS_PATH}"
+
+    notifications = _http_json(
+        f"{ml_url}/__changes?seller={SELLER}&updates={args.updates}"
+        f"&cancels={args.cancels}&new={args.new}",
+        method="POST",
+    )
+    rng = random.Random(7)
+    sent = [n for n in notifications for _ in range(1 + (rng.random() < args.duplicates))]
+    rng.shuffle(sent)
+
+    before = ml_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.senders) as executor:
+        ack = list(executor.map(lambda n: _post(callback, n), sent))
+    service.flush()
+    push_wall = time.perf_counter() - started
+    after = ml_stats()
+    push_requests = sum(after["requests"].values()) - sum(before["requests"].values())
+    push_bytes = after["bytes_sent"] - before["bytes_sent"]
+
+    # Confere sales_ml com o estado atual de cada pedido notificado
+    order_ids = [int(n["resource"].rsplit("/", 1)[-1]) for n in notifications]
+    rows: Dict[int, List[Dict[str, Any]]] = {order_id: [] for order_id in order_ids}
+    for i in range(0, len(order_ids), 100):
+        response = (
+            supabase.table("sales_ml")
+            .select("*")
+            .eq("id", SELLER)
+            .in_("Número_do_pedido_multiloja", order_ids[i : i + 100])
+            .execute()
+        )
+        for row in response.data:
+            rows[int(row["Número_do_pedido_multiloja"])].append(row)
+
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    divergentes = 0
+    for order_id in order_ids:
+        request = urllib.request.Request(f"{ml_url}/orders/{order_id}", headers=headers)
+        with urllib.request.urlopen(request) as response:
+            order = json.loads(response.read())
+        esperado = (
+            sorted(i["quantity"] for i in order["order_items"])
+            if order["status"] == "paid"
+            else []
+        )
+        if sorted(r["quantity"] for r in rows[order_id]) != esperado:
+            divergentes += 1
+
+    ack_ms = sorted(t * 1000 for t in ack)
+    stats = service.stats()
+    print(
+        f"notificações={len(sent)} pedidos={len(notifications)} "
+        f"duplicadas={stats.get('duplicate', 0)} linhas={stats.get('linhas', 0)} "
+        f"divergentes={divergentes}"
+    )
+    print(
+        f"push: {push_requests} requisições, {push_bytes / 1024:.0f} KB, "
+        f"{push_wall:.2f}s até sales_ml atualizado, "
+        f"callback p50={statistics.median(ack_ms):.1f}ms p95={ack_ms[int(len(ack_ms) * 0.95) - 1]:.1f}ms"
+    )
+    print(
+        f"janela de {args.days} dias: {poll_requests} requisições, "
+        f"{poll_bytes / 1024:.0f} KB, {poll_wall:.2f}s"
+    )
+
+    server.shutdown()
+    service.close()
+    return 1 if divergentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
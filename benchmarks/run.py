@@ -0,0 +1,221 @@
+"""
+Benchmark ponta a ponta de get_vendas_ml e req_ads contra stand-ins locais.
+
+Os stand-ins da API do Mercado Livre e do Supabase rodam em processos
+separados, de modo que o RSS e o tempo medidos refletem apenas a integração.
+
+Uso:
+    python -m benchmarks.run --sellers small=500,medium=5000,large=20000 \\
+        --days 7 --latency-ms 20 --error-429 0.01 --json resultado.json
+
+O JSON gerado inclui o commit atual para comparar execuções entre commits.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from benchmarks.fake_ml_api import FakeMLConfig, start_fake_ml_api
+from benchmarks.fake_supabase import start_fake_supabase
+
+# Ids sintéticos dos sellers por nome de cenário
+SELLER_IDS = {"small": "900001", "medium": "900002", "large": "900003"}
+
+
+def _serve_ml(config: FakeMLConfig, ports: Any) -> None:
+    server, _ = start_fake_ml_api(config)
+    ports.put(server.server_port)
+    while True:
+        time.sleep(3600)
+
+
+def _serve_supabase(latency_ms: float, ports: Any) -> None:
+    server, _ = start_fake_supabase(latency_ms)
+    ports.put(server.server_port)
+    while True:
+        time.sleep(3600)
+
+
+def _start(target: Any, *args: Any) -> int:
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(*args, ports), daemon=True)
+    process.start()
+    return ports.get(timeout=120)
+
+
+def _http_json(url: str, method: str = "GET") -> Dict[str, Any]:
+    request = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def _parse_sellers(spec: str) -> Dict[str, int]:
+    sellers = {}
+    for part in spec.split(","):
+        name, _, size = part.partition("=")
+        sellers[name.strip()] = int(size)
+    return sellers
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sellers", default="small=500,medium=5000")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--history-days", type=int, default=120)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--supabase-latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-401", type=float, default=0.0)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-5xx", type=float, default=0.0)
+    parser.add_argument("--only", choices=["sales", "ads"], default=None)
+    parser.add_argument(
+        "--runs", type=int, default=1, help="Execuções seguidas de cada job (repetições incrementais)"
+    )
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args(argv)
+
+    scenarios = _parse_sellers(args.sellers)
+    config = FakeMLConfig(
+        latency_ms=args.latency_ms,
+        error_401_rate=args.error_401,
+        error_429_rate=args.error_429,
+        error_5xx_rate=args.error_5xx,
+        days=args.history_days,
+        items_per_seller=args.items,
+        sellers={SELLER_IDS.get(name, name): size for name, size in scenarios.items()},
+    )
+
+    ml_url = f"http://127.0.0.1:{_start(_serve_ml, config)}"
+    supabase_url = f"http://127.0.0.1:{_start(_serve_supabase, args.supabase_latency_ms)}"
+
+    # As variáveis precisam existir antes do primeiro import de src
+    os.environ.update(
+        {
+            "SUPABASE_URL": supabase_url,
+            "SUPABASE_KEY": "benchmark",
+            "ML_API_URL": ml_url,
+            "ML_APP_ID": "benchmark",
+            "ML_APP_SECRET": "benchmark",
+        }
+    )
+    os.environ.setdefault("ENCRYPTION_KEY", "benchmark")
+
+    from src import factory
+    from src.utils.data import (
+        get_first_and_last_day_of_last_year,
+        get_periodo_ultimos_dias,
+    )
+    from ads import req_ads
+    from vendas import get_vendas_ml
+
+    encryption = factory.create_encryption_service()
+    supabase = factory.create_supabase_client()
+    validade = str(datetime.now() + timedelta(hours=4))
+    for seller_id in config.sellers:
+        tokens = _http_json(f"{ml_url}/__tokens?seller={seller_id}", method="POST")
+        supabase.table("credenciais_ml").insert(
+            {
+                "id": seller_id,
+                "access_token": encryption.encrypt(tokens["access_token"]),
+                "refresh_token": encryption.encrypt(tokens["refresh_token"]),
+                "validade": validade,
+                "client_id": "benchmark",
+                "token_version": 0,
+            }
+        ).execute()
+
+    data_inicial, data_final = get_periodo_ultimos_dias(args.days)
+    data_inicial_ano, data_final_ano = get_first_and_last_day_of_last_year()
+
+    jobs = [("sales", get_vendas_ml), ("ads", req_ads)]
+    results = []
+    for name, seller_id in ((n, SELLER_IDS.get(n, n)) for n in scenarios):
+        for (job, function), run in itertools.product(jobs, range(1, args.runs + 1)):
+            if args.only and job != args.only:
+                continue
+
+            ml_before = _http_json(f"{ml_url}/__stats")
+            db_before = _http_json(f"{supabase_url}/__stats")
+            started = time.perf_counter()
+            error = None
+            try:
+                function(seller_id, data_inicial, data_final, data_inicial_ano, data_final_ano)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            wall = time.perf_counter() - started
+            ml_after = _http_json(f"{ml_url}/__stats")
+            db_after = _http_json(f"{supabase_url}/__stats")
+
+            requests_made = sum(ml_after["requests"].values()) - sum(
+                ml_before["requests"].values()
+            )
+            rows = db_after["rows_written"] - db_before["rows_written"]
+            results.append(
+                {
+                    "scenario": name if args.runs == 1 else f"{name}#{run}",
+                    "job": job,
+                    "wall_s": round(wall, 3),
+                    "requests": requests_made,
+                    "requests_per_s": round(requests_made / wall, 1) if wall else 0.0,
+                    "bytes_from_api": ml_after["bytes_sent"] - ml_before["bytes_sent"],
+                    "bytes_to_db": db_after["bytes_received"] - db_before["bytes_received"],
+                    "db_requests": db_after["requests"] - db_before["requests"],
+                    "rows": rows,
+                    "rows_per_s": round(rows / wall, 1) if wall else 0.0,
+                    "peak_rss_mb": round(_peak_rss_mb(), 1),
+                    "error": error,
+                }
+            )
+
+    header = f"{'cenário':<10}{'job':<7}{'wall(s)':>9}{'reqs':>8}{'req/s':>9}{'rows':>9}{'rows/s':>10}{'RSS(MB)':>9}{'API(KB)':>10}{'DB(KB)':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<10}{r['job']:<7}{r['wall_s']:>9.2f}{r['requests']:>8}"
+            f"{r['requests_per_s']:>9.1f}{r['rows']:>9}{r['rows_per_s']:>10.1f}{r['peak_rss_mb']:>9.1f}"
+            f"{r['bytes_from_api'] / 1024:>10.0f}{r['bytes_to_db'] / 1024:>10.0f}"
+            + (f"  ERRO: {r['error']}" if r["error"] else "")
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "commit": _git_commit(),
+                    "timestamp": datetime.now().isoformat(),
+                    "args": vars(args),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Teste de estresse do Client compartilhado entre threads.
+
+Uma única instância de `src.api` atende um pool de threads que requisitam
+/orders/search de vários sellers contra os stand-ins locais. As credenciais
+começam expiradas, de modo que todas as threads disputam o primeiro refresh.
+
+Uso:
+    python -m benchmarks.stress --threads 32 --requests 50 --sellers 4 \\
+        --latency-ms 5 --error-401 0.02
+
+Com GETs idênticos agrupados (padrão), a maior parte das requisições é
+atendida pela primeira em andamento; ML_COALESCE_GETS=0 envia todas à API.
+
+Falha (código 1) se alguma requisição não retornar a página esperada ou se
+houver mais refreshes OAuth do que os forçados pelos 401 injetados.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from benchmarks.fake_ml_api import FakeMLConfig
+from benchmarks.run import _http_json, _serve_ml, _serve_supabase, _start
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="Requisições por thread")
+    parser.add_argument("--sellers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--error-401", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    sellers = [str(910000 + i) for i in range(args.sellers)]
+    config = FakeMLConfig(
+        latency_ms=args.latency_ms,
+        error_401_rate=args.error_401,
+        days=7,
+        items_per_seller=20,
+        sellers={seller: 200 for seller in sellers},
+    )
+    ml_url = f"http://127.0.0.1:{_start(_serve_ml, config)}"
+    supabase_url = f"http://127.0.0.1:{_start(_serve_supabase, 0.0)}"
+
+    # As variáveis precisam existir antes do primeiro import de src
+    os.environ.update(
+        {
+            "SUPABASE_URL": supabase_url,
+            "SUPABASE_KEY": "benchmark",
+            "ML_API_URL": ml_url,
+            "ML_APP_ID": "benchmark",
+            "ML_APP_SECRET": "benchmark",
+        }
+    )
+    os.environ.setdefault("ENCRYPTION_KEY", "benchmark")
+
+    from src import api, factory
+    from src.models.mercado_livre import OrderSearchResponse
+
+    encryption = factory.create_encryption_service()
+    supabase = factory.create_supabase_client()
+    for seller in sellers:
+        tokens = _http_json(f"{ml_url}/__tokens?seller={seller}", method="POST")
+        supabase.table("credenciais_ml").insert(
+            {
+                "id": seller,
+                "access_token": encryption.encrypt(tokens["access_token"]),
+                "refresh_token": encryption.encrypt(tokens["refresh_token"]),
+                "validade": "2000-01-01 00:00:00",
+                "client_id": "benchmark",
+                "token_version": 0,
+            }
+        ).execute()
+
+    def worker(index: int) -> int:
+        falhas = 0
+        for i in range(args.requests):
+            seller = sellers[(index + i) % len(sellers)]
+            page = api.get(
+                f"{ml_url}/orders/search?seller={seller}&offset=0&limit=1",
+                seller,
+                schema=OrderSearchResponse,
+            )
+            # O stand-in só devolve pedidos do seller dono do token
+            if not isinstance(page, OrderSearchResponse) or page.paging.total == 0:
+                falhas += 1
+        return falhas
+
+    before = _http_json(f"{ml_url}/__stats")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        falhas = sum(executor.map(worker, range(args.threads)))
+    wall = time.perf_counter() - started
+    after = _http_json(f"{ml_url}/__stats")
+
+    def delta(endpoint: str) -> int:
+        return after["requests"].get(endpoint, 0) - before["requests"].get(endpoint, 0)
+
+    total = args.threads * args.requests
+    refreshes = delta("/oauth/token")
+    injetados = after["statuses"].get("401", 0) - before["statuses"].get("401", 0)
+    print(
+        f"threads={args.threads} requisições={total} falhas={falhas} "
+        f"wall={wall:.2f}s req/s={total / wall:.1f} "
+        f"refresh_oauth={refreshes} 401={injetados} "
+        f"orders_search={delta('/orders/search')} agrupadas={api.coalesce_stats().get('followers', 0)}"
+    )
+
+    # Um refresh inicial por seller; depois, no máximo um por par de 401 seguidos
+    if falhas or refreshes > len(sellers) + injetados // 2:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
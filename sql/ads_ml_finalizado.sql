@@ -0,0 +1,9 @@
+-- Intervalo de dias de ads_ml já finalizados (fora da janela de atribuição)
+-- por loja e MLB. Usado pelo ads.py para requisitar apenas os dias abertos.
+create table if not exists public.ads_ml_finalizado (
+    id text not null,
+    mlb text not null,
+    date_from date not null,
+    date_to date not null,
+    primary key (id, mlb)
+);
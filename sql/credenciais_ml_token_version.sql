@@ -0,0 +1,4 @@
+-- Versão das credenciais, usada para coordenar o refresh do token entre
+-- processos (compare-and-swap). Versão ímpar indica refresh em andamento.
+alter table public.credenciais_ml
+    add column if not exists token_version bigint not null default 0;
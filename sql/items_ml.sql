@@ -0,0 +1,12 @@
+-- Atributos dos MLBs vendidos, lidos de /items?ids= pelo enriquecimento
+-- de vendas (ML_ENRICH_ITEMS). Uma linha por loja e MLB.
+create table if not exists public.items_ml (
+    id text not null,
+    mlb text not null,
+    title text,
+    category_id text,
+    listing_type_id text,
+    status text,
+    updated_at timestamptz not null default now(),
+    primary key (id, mlb)
+);
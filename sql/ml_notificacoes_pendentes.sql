@@ -0,0 +1,10 @@
+-- Pedidos notificados (orders_v2) cuja busca falhou depois de o callback já
+-- ter respondido 200. O receptor volta a buscá-los ao iniciar e a cada
+-- ML_WEBHOOK_RETRY_INTERVAL segundos, até ML_WEBHOOK_MAX_ATTEMPTS tentativas.
+create table if not exists public.ml_notificacoes_pendentes (
+    id text not null,
+    order_id bigint not null,
+    attempts integer not null default 1,
+    failed_at timestamptz not null default now(),
+    primary key (id, order_id)
+);
@@ -0,0 +1,45 @@
+-- Agregados diários por loja, dia e MLB, mantidos pela sincronização
+-- (ML_DAILY_ROLLUPS) apenas para os dias regravados em cada execução.
+create table if not exists public.sales_ml_diario (
+    id text not null,
+    date date not null,
+    mlb text not null,
+    orders integer not null default 0,
+    units integer not null default 0,
+    revenue numeric(14, 2) not null default 0,
+    sale_fee numeric(14, 2) not null default 0,
+    primary key (id, date, mlb)
+);
+
+create table if not exists public.ads_ml_diario (
+    id text not null,
+    date date not null,
+    mlb text not null,
+    prints bigint not null default 0,
+    clicks bigint not null default 0,
+    cost numeric(14, 2) not null default 0,
+    units integer not null default 0,
+    revenue numeric(14, 2) not null default 0,
+    acos numeric(10, 2),
+    roas numeric(10, 2),
+    primary key (id, date, mlb)
+);
+
+-- Visão combinada para os painéis: vendas e ads do mesmo dia e MLB
+create or replace view public.vendas_ads_diario as
+select
+    coalesce(s.id, a.id) as id,
+    coalesce(s.date, a.date) as date,
+    coalesce(s.mlb, a.mlb) as mlb,
+    coalesce(s.orders, 0) as orders,
+    coalesce(s.units, 0) as units,
+    coalesce(s.revenue, 0) as revenue,
+    coalesce(s.sale_fee, 0) as sale_fee,
+    coalesce(a.cost, 0) as ad_cost,
+    coalesce(a.revenue, 0) as ad_revenue,
+    a.acos,
+    a.roas,
+    case when s.revenue > 0 then round(coalesce(a.cost, 0) / s.revenue * 100, 2) end as tacos
+from public.sales_ml_diario s
+full outer join public.ads_ml_diario a
+    on a.id = s.id and a.date = s.date and a.mlb = s.mlb;
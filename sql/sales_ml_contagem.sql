@@ -0,0 +1,9 @@
+-- Quantidade de pedidos pagos gravada em sales_ml por loja e dia. Usada
+-- pelo vendas.py para sondar /orders/search e rebuscar apenas os dias
+-- cujo total na API mudou desde a última gravação.
+create table if not exists public.sales_ml_contagem (
+    id text not null,
+    date date not null,
+    orders integer not null,
+    primary key (id, date)
+);
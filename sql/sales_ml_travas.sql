@@ -0,0 +1,10 @@
+-- Trava de gravação de sales_ml por loja, compartilhada entre processos (a
+-- sincronização por janela e o receptor de notificações). Cada exclusão
+-- seguida de inserção só é feita por quem detém a trava: o dono grava
+-- expires_at no futuro com um update condicionado a expires_at < agora
+-- (compare-and-swap); travas de processos encerrados expiram sozinhas.
+create table if not exists public.sales_ml_travas (
+    id text primary key,
+    owner text not null default '',
+    expires_at timestamptz not null default 'epoch'
+);
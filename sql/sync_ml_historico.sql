@@ -0,0 +1,23 @@
+-- Última execução bem-sucedida de cada job (sales, ads) por loja, com o
+-- tamanho da loja e da janela naquele momento. Usada pelo agendador do sync
+-- para estimar a duração de cada loja e respeitar o prazo da execução.
+create table if not exists public.sync_ml_historico (
+    id text not null,
+    job text not null,
+    seconds double precision not null,
+    orders integer not null default 0,
+    mlbs integer not null default 0,
+    days integer not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (id, job)
+);
+
+alter table public.sync_ml_historico
+    add column if not exists days integer not null default 0;
+
+-- Lojas adiadas pelo prazo na última execução em que foram selecionadas;
+-- começam antes das demais na execução seguinte.
+create table if not exists public.sync_ml_adiadas (
+    id text primary key,
+    deferred_at timestamptz not null default now()
+);
@@ -1,6 +1,15 @@
 from src.factories.factory import Factory
 
-# Instancia a factory e expõe o cliente já criado
-api = Factory().create_client()
+# Instancia a factory única do processo; o cliente é criado no primeiro acesso
+# a `src.api`, depois de a CLI aplicar suas configurações
+factory = Factory()
 
-__all__ = ["api"]
\ No newline at end of file
+
+def __getattr__(name: str):
+    if name == "api":
+        api = globals()["api"] = factory.create_client()
+        return api
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["api", "factory"]
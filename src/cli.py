@@ -0,0 +1,393 @@
+"""
+Linha de comando da integração (`integracao-ml`, ou `python -m src`).
+
+    python -m src sync sales --seller 179385579 --periodo short
+    python -m src sync all --all-sellers --days 30 --workers 4 --rate-limit 20
+    python -m src sync ads --seller 123 --from 2024-01-01 --to 2024-01-31 --mode full
+    python -m src sync all --all-sellers --periodo long --workers 2 --deadline 1h
+    python -m src daemon all --all-sellers --sales-every 15m --ads-every 1h --port 8080
+    python -m src webhook --host 0.0.0.0 --port 8080
+
+As opções de execução sobrescrevem as variáveis de ambiente equivalentes
+(ML_SYNC_MODE, ML_SYNC_WORKERS, ML_RATE_LIMIT, ML_WRITE_BACKEND,
+SUPABASE_INSERT_BATCH, ML_ORDERS_PAGE_LIMIT, ML_HTTP_BACKEND, ML_SYNC_DEADLINE)
+apenas no processo atual.
+
+O sync de várias lojas começa pelas mais demoradas, estimadas pelo histórico
+de execuções; com prazo, as lojas que não cabem no tempo restante ficam para
+a próxima execução (ver src.services.sync_scheduler).
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.config import configurar, settings
+from src.utils.data import get_first_and_last_day_of_last_year, get_periodo_ultimos_dias
+from src.utils.log import log
+from src.utils.metrics import metrics
+
+# Dias retroativos de cada período pré-definido
+PERIODOS = {"short": 7, "long": 120}
+
+SyncFn = Callable[[str, str, str, str, str], bool]
+
+# O prazo do sync é contado a partir do início do processo, como o timeout do job
+_INICIO = time.monotonic()
+
+
+def _data(valor: str) -> str:
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida (use YYYY-MM-DD): {valor}")
+
+
+def _positivo(valor: str) -> int:
+    numero = int(valor)
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {valor}")
+    return numero
+
+
+def _duracao(valor: str) -> float:
+    """Segundos, ou número com sufixo s/m/h (ex.: 90, 15m, 1h)."""
+    multiplicadores = {"s": 1, "m": 60, "h": 3600}
+    try:
+        if valor[-1:] in multiplicadores:
+            segundos = float(valor[:-1]) * multiplicadores[valor[-1]]
+        else:
+            segundos = float(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"duração inválida (ex.: 90, 15m, 1h): {valor}")
+    if segundos <= 0:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {valor}")
+    return segundos
+
+
+def _add_opcoes_comuns(parser: argparse.ArgumentParser) -> None:
+    """Seleção de lojas, janela em dias e opções de execução (sync e daemon)."""
+    parser.add_argument("target", choices=["sales", "ads", "all"])
+
+    lojas = parser.add_mutually_exclusive_group()
+    lojas.add_argument(
+        "--seller",
+        action="append",
+        dest="sellers",
+        metavar="ID",
+        help="Loja a sincronizar (repetível; padrão: ML_SELLERS, separado por vírgulas)",
+    )
+    lojas.add_argument(
+        "--all-sellers",
+        action="store_true",
+        help="Sincroniza todas as lojas com credenciais cadastradas",
+    )
+
+    janela = parser.add_mutually_exclusive_group()
+    janela.add_argument("--days", type=_positivo, help="Últimos N dias")
+    janela.add_argument(
+        "--periodo",
+        choices=sorted(PERIODOS),
+        help="Período pré-definido (short = 7 dias, long = 120 dias)",
+    )
+
+    parser.add_argument("--mode", choices=["incremental", "full"], default=None)
+    parser.add_argument(
+        "--workers", type=_positivo, default=None, help="Lojas em paralelo"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Requisições por segundo à API do ML (0 = sem limite)",
+    )
+    parser.add_argument(
+        "--write-backend",
+        choices=["supabase", "none"],
+        default=None,
+        help="none busca e grava apenas no staging, sem alterar o banco",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=_positivo,
+        default=None,
+        help="Registros por requisição de insert no Supabase",
+    )
+    parser.add_argument(
+        "--page-limit",
+        type=_positivo,
+        default=None,
+        help="Tamanho de página de /orders/search",
+    )
+    parser.add_argument(
+        "--http-backend",
+        choices=["requests", "httpx"],
+        default=None,
+        help="Transporte HTTP da API do ML (httpx usa HTTP/2 quando disponível)",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="integracao-ml",
+        description="Sincroniza vendas e métricas de ads do Mercado Livre com o Supabase.",
+    )
+    comandos = parser.add_subparsers(dest="command", required=True)
+
+    sync = comandos.add_parser("sync", help="Sincroniza vendas, ads ou ambos")
+    _add_opcoes_comuns(sync)
+    sync.add_argument("--from", dest="data_inicial", type=_data, metavar="YYYY-MM-DD")
+    sync.add_argument("--to", dest="data_final", type=_data, metavar="YYYY-MM-DD")
+    sync.add_argument(
+        "--deadline",
+        type=_duracao,
+        default=None,
+        help="Prazo da execução desde o início do processo (ex.: 55m); "
+        "lojas que não couberem ficam para a próxima (padrão: ML_SYNC_DEADLINE)",
+    )
+
+    daemon = comandos.add_parser(
+        "daemon",
+        help="Mantém o processo ativo e sincroniza as lojas periodicamente",
+    )
+    _add_opcoes_comuns(daemon)
+    daemon.set_defaults(data_inicial=None, data_final=None)
+    daemon.add_argument(
+        "--sales-every",
+        type=_duracao,
+        default=None,
+        help="Intervalo entre syncs de vendas de cada loja (padrão: ML_DAEMON_SALES_INTERVAL)",
+    )
+    daemon.add_argument(
+        "--ads-every",
+        type=_duracao,
+        default=None,
+        help="Intervalo entre syncs de ads de cada loja (padrão: ML_DAEMON_ADS_INTERVAL)",
+    )
+    daemon.add_argument(
+        "--host", default=None, help="Endereço do endpoint de controle (padrão: ML_DAEMON_HOST)"
+    )
+    daemon.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Porta do endpoint de controle, 0 desativa (padrão: ML_DAEMON_PORT)",
+    )
+    daemon.add_argument(
+        "--webhooks",
+        action="store_true",
+        default=None,
+        help="Recebe notificações orders_v2 em POST /notifications (padrão: ML_WEBHOOKS)",
+    )
+
+    webhook = comandos.add_parser(
+        "webhook",
+        help="Recebe notificações orders_v2 e atualiza apenas os pedidos notificados",
+    )
+    webhook.add_argument(
+        "--seller",
+        action="append",
+        dest="sellers",
+        metavar="ID",
+        help="Loja aceita (repetível; padrão: qualquer loja)",
+    )
+    webhook.add_argument("--host", default=None, help="Endereço (padrão: ML_DAEMON_HOST)")
+    webhook.add_argument("--port", type=int, default=None, help="Porta (padrão: ML_DAEMON_PORT)")
+    webhook.add_argument("--write-backend", choices=["supabase", "none"], default=None)
+    webhook.add_argument("--rate-limit", type=float, default=None)
+    webhook.add_argument("--http-backend", choices=["requests", "httpx"], default=None)
+    return parser
+
+
+def resolver_janela(args: argparse.Namespace) -> Tuple[str, str]:
+    """Retorna (data_inicial, data_final) a partir das opções de janela."""
+    if args.data_inicial or args.data_final:
+        if args.days or args.periodo:
+            raise ValueError("--from/--to não podem ser combinados com --days ou --periodo")
+        if not (args.data_inicial and args.data_final):
+            raise ValueError("--from e --to devem ser informados juntos")
+        if args.data_inicial > args.data_final:
+            raise ValueError("--from deve ser anterior ou igual a --to")
+        return args.data_inicial, args.data_final
+
+    dias = args.days or PERIODOS[args.periodo or "short"]
+    return get_periodo_ultimos_dias(dias)
+
+
+def resolver_lojas(args: argparse.Namespace) -> List[str]:
+    """Retorna as lojas selecionadas, sem repetições."""
+    if args.all_sellers:
+        from src import factory
+
+        lojas = factory.create_credentials_repository().get_seller_ids()
+    elif args.sellers:
+        lojas = args.sellers
+    else:
+        lojas = (os.environ.get("ML_SELLERS") or "").split(",")
+
+    return list(dict.fromkeys(loja.strip() for loja in lojas if loja.strip()))
+
+
+def aplicar_opcoes(args: argparse.Namespace) -> None:
+    """Sobrescreve em `settings` as opções de execução informadas."""
+    opcoes = {
+        "sync_mode": args.mode,
+        "sync_workers": args.workers,
+        "ml_rate_limit": args.rate_limit,
+        "write_backend": args.write_backend,
+        "supabase_insert_batch": args.batch_size,
+        "ml_orders_page_limit": args.page_limit,
+        "ml_http_backend": args.http_backend,
+        "sync_deadline": getattr(args, "deadline", None),
+    }
+    configurar(**{nome: valor for nome, valor in opcoes.items() if valor is not None})
+
+
+def selecionar_jobs(target: str) -> List[Tuple[str, SyncFn]]:
+    """Retorna (nome, função) dos jobs de "sales", "ads" ou "all"."""
+    # Importados só agora para que o cliente seja criado com as opções aplicadas
+    from ads import req_ads
+    from vendas import get_vendas_ml
+
+    jobs: List[Tuple[str, SyncFn]] = []
+    if target in ("sales", "all"):
+        jobs.append(("sales", get_vendas_ml))
+    if target in ("ads", "all"):
+        jobs.append(("ads", req_ads))
+    return jobs
+
+
+def sincronizar_loja(
+    id: str, jobs: Sequence[Tuple[str, SyncFn]], janela: Tuple[str, str, str, str]
+) -> Dict[str, bool]:
+    resultados = {}
+    for nome, job in jobs:
+        started = time.time()
+        try:
+            resultados[nome] = bool(job(id, *janela))
+        except Exception as e:
+            log.error(f"Sync {nome}: erro na loja {id}: {e}")
+            resultados[nome] = False
+        log.info(
+            f"Sync {nome}: loja {id} {'ok' if resultados[nome] else 'falhou'} "
+            f"em {time.time() - started:.2f} segundos"
+        )
+    return resultados
+
+
+def sync(args: argparse.Namespace, data_inicial: str, data_final: str) -> int:
+    aplicar_opcoes(args)
+
+    lojas = resolver_lojas(args)
+    if not lojas:
+        log.error("Nenhuma loja selecionada (use --seller, --all-sellers ou ML_SELLERS)")
+        return 2
+
+    jobs = selecionar_jobs(args.target)
+    data_inicial_ano, data_final_ano = get_first_and_last_day_of_last_year()
+    janela = (data_inicial, data_final, data_inicial_ano, data_final_ano)
+
+    log.info(
+        f"Sync {args.target}: {len(lojas)} loja(s), {data_inicial}..{data_final}, "
+        f"modo {settings.sync_mode}, {settings.sync_workers} worker(s), "
+        f"backend {settings.write_backend}"
+    )
+
+    from src import api, factory
+    from src.services.sync_scheduler import (
+        SyncScheduler,
+        estimar_custos,
+        registrar_execucao,
+    )
+
+    start_time = time.time()
+    repository = factory.create_credentials_repository()
+    gravar = settings.write_backend != "none"
+    custos = estimar_custos(
+        repository, lojas, [nome for nome, _ in jobs], data_inicial, data_final
+    )
+    prazo = None
+    if settings.sync_deadline > 0:
+        prazo = settings.sync_deadline - (time.monotonic() - _INICIO)
+    try:
+        prioritarias = repository.get_deferred_sellers()
+    except Exception as e:
+        log.warning(f"Agendador: lojas adiadas indisponíveis ({e})")
+        prioritarias = []
+    agendador = SyncScheduler(
+        custos,
+        settings.sync_workers,
+        prazo=prazo,
+        reserva=settings.sync_deadline_reserve,
+        prioritarias=prioritarias,
+    )
+
+    def executar_loja(loja: str) -> Dict[str, bool]:
+        resultados: Dict[str, bool] = {}
+        for nome, job in jobs:
+            started = time.monotonic()
+            resultados.update(sincronizar_loja(loja, [(nome, job)], janela))
+            if resultados[nome] and gravar:
+                registrar_execucao(
+                    repository, loja, nome, time.monotonic() - started, data_inicial, data_final
+                )
+        return resultados
+
+    falhas: List[str] = []
+    executadas = agendador.executar(executar_loja)
+    for loja, resultados in executadas.items():
+        falhas.extend(f"{loja}/{nome}" for nome, ok in resultados.items() if not ok)
+
+    if gravar:
+        try:
+            repository.update_deferred_sellers(list(executadas), agendador.adiadas)
+        except Exception as e:
+            log.warning(f"Agendador: lojas adiadas não registradas: {e}")
+
+    log.info(f"Sincronização concluída em {time.time() - start_time:.2f} segundos")
+
+    if agendador.adiadas:
+        metrics.inc("sync_sellers_deferred_total", len(agendador.adiadas))
+        log.warning(
+            f"Sync {args.target}: prazo de {settings.sync_deadline:.0f}s; "
+            f"{len(agendador.adiadas)} loja(s) adiada(s) para a próxima execução: "
+            + ", ".join(
+                f"{loja} (~{custos[loja]:.0f}s)" for loja in agendador.adiadas
+            )
+        )
+
+    if api.cache_stats():
+        log.info(f"Cache de respostas: {api.cache_stats()}")
+    if api.coalesce_stats().get("followers"):
+        log.info(f"GETs agrupados: {api.coalesce_stats()}")
+    abertos = {f: e for f, e in api.circuit_stats().items() if e != "closed"}
+    if abertos:
+        log.warning(f"Circuitos não fechados ao final: {abertos}")
+
+    if falhas:
+        log.error(f"Sync {args.target}: falhas em {', '.join(sorted(falhas))}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "webhook":
+        from src.webhook import run_webhook
+
+        return run_webhook(args, sellers=args.sellers)
+
+    try:
+        data_inicial, data_final = resolver_janela(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "daemon":
+        from src.daemon import run_daemon
+
+        return run_daemon(args)
+    return sync(args, data_inicial, data_final)
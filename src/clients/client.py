@@ -6,20 +6,51 @@ e usa Design Patterns para uma arquitetura mais limpa e testável.
 """
 
 import json
+import re
 import time
 from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
 
-import requests
-
+from src.clients.http_transport import RequestsTransport
 from src.services.tratamento_de_resposta import tratamento_de_resposta
+from src.utils.json_decoder import decode
+from src.interfaces.http_transport_interface import IHttpTransport
+from src.interfaces.response_cache_interface import IResponseCache
 from src.interfaces.token_manager_interface import ITokenManager
+from src.utils.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from src.utils.coalescer import RequestCoalescer
 from src.utils.log import log
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import RateLimiter
+
+_ID_SEGMENT = re.compile(r"\d")
+
+
+def endpoint_label(url: str) -> str:
+    """
+    Normaliza a URL para um rótulo de endpoint de baixa cardinalidade.
+
+    Segmentos com dígitos (MLBs, ids de pedidos, sellers) viram "{id}".
+    """
+    segments = urlsplit(url).path.strip("/").split("/")
+    return "/" + "/".join(
+        "{id}" if _ID_SEGMENT.search(segment) else segment for segment in segments
+    )
+
+
+def endpoint_family(url: str) -> str:
+    """Primeiro segmento do caminho (ex.: "/advertising"), usado pelo circuit breaker."""
+    return "/" + urlsplit(url).path.strip("/").split("/")[0]
 
 
 class Client:
     """
     Cliente principal da API  refatorado.
 
+    Uma instância pode ser compartilhada entre threads: o estado por
+    requisição fica em variáveis locais, o transporte HTTP mantém as conexões
+    de forma thread-safe e o gerenciador de tokens, o cache e o limitador são thread-safe.
+
     Implementa:
     - Single Responsibility: Apenas coordena chamadas de API
     - Open/Closed: Extensível via interfaces
@@ -33,6 +64,11 @@ class Client:
         token_manager: ITokenManager,
         max_retries: int,
         retry_delay: float,
+        response_cache: Optional[IResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        coalescer: Optional[RequestCoalescer] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        transport: Optional[IHttpTransport] = None,
     ):
         """
         Inicializa o cliente .
@@ -40,10 +76,20 @@ class Client:
         Args:
             token_manager: Gerenciador de tokens
             api_client: Cliente HTTP para requisições
+            response_cache: Cache de respostas GET (opcional)
+            rate_limiter: Limitador de requisições por segundo (opcional)
+            coalescer: Agrupador de GETs idênticos em andamento (opcional)
+            breakers: Circuit breakers por família de endpoint (opcional)
+            transport: Transporte HTTP (padrão: requests, uma sessão por thread)
         """
         self._token_manager = token_manager
         self._max_retries = max_retries
         self._retry_delay = retry_delay
+        self._response_cache = response_cache
+        self._rate_limiter = rate_limiter
+        self._coalescer = coalescer
+        self._breakers = breakers
+        self._transport = transport or RequestsTransport()
 
     def _request(
         self,
@@ -52,17 +98,35 @@ class Client:
         id: str,
         data: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
-    ) -> Dict[str, Any]:
+        cache_ttl: Optional[float] = None,
+        schema: Optional[type] = None,
+    ) -> Any:
         """
         Método privado para executar requisições HTTP genéricas (GET, POST, PUT).
         """
+        # Falhas retornam None em GETs tipados, como respostas de erro
+        falha = None if schema is not None else {}
         try:
+            cache_key = None
+            cached = None
+            if method == "GET" and self._response_cache is not None:
+                cache_key = self._response_cache.make_key(url, id)
+                cached = self._response_cache.get(cache_key)
+                if cached and cached["fresh"]:
+                    return decode(cached["body"], schema)
+
             access_token = self._token_manager.get_access_token(id)
             if not access_token:
                 log.error(f"Access token indisponível para {id}. Abortando requisição.")
-                return {}
+                return falha
 
             refresh = False
+            endpoint = endpoint_label(url)
+            breaker = (
+                self._breakers.get(endpoint_family(url))
+                if self._breakers is not None
+                else None
+            )
 
             for attempt in range(self._max_retries):
                 default_headers = {
@@ -72,30 +136,81 @@ class Client:
 
                 if method in ["POST", "PUT"]:
                     default_headers["Content-Type"] = "application/json"
+                if cached:
+                    if cached.get("etag"):
+                        default_headers["If-None-Match"] = cached["etag"]
+                    if cached.get("last_modified"):
+                        default_headers["If-Modified-Since"] = cached["last_modified"]
+                # Monta os headers a cada tentativa sem alterar o argumento,
+                # para que um token renovado não seja sobrescrito pelo anterior
                 if headers is not None:
-                    headers = {**default_headers, **headers}
-                else:
-                    headers = default_headers
-
-                if method == "GET":
-                    response = requests.get(url, headers=headers)
-                elif method == "POST":
-                    payload = json.dumps(data) if data is not None else None
-                    response = requests.post(url, headers=headers, data=payload)
-                elif method == "PUT":
-                    payload = json.dumps(data) if data is not None else None
-                    response = requests.put(url, headers=headers, data=payload)
+                    request_headers = {**default_headers, **headers}
                 else:
-                    raise ValueError(f"Método HTTP não suportado: {method}")
+                    request_headers = default_headers
+
+                if breaker is not None:
+                    breaker.before_call()
+                # None: a chamada não chegou ao endpoint (só libera o circuito)
+                sucesso: Optional[bool] = None
+                try:
+                    if self._rate_limiter is not None:
+                        self._rate_limiter.acquire()
 
-                result = tratamento_de_resposta(response)
+                    if method not in ("GET", "POST", "PUT"):
+                        raise ValueError(f"Método HTTP não suportado: {method}")
+                    payload = (
+                        json.dumps(data).encode("utf-8")
+                        if method != "GET" and data is not None
+                        else None
+                    )
+
+                    started = time.perf_counter()
+                    try:
+                        response = self._transport.request(
+                            method, url, request_headers, payload
+                        )
+                    except Exception:
+                        sucesso = False
+                        raise
+                    sucesso = response.status_code != 429 and response.status_code < 500
+                finally:
+                    if breaker is not None:
+                        breaker.record(sucesso)
+
+                metrics.observe(
+                    "ml_request_seconds",
+                    time.perf_counter() - started,
+                    endpoint=endpoint,
+                    method=method,
+                )
+                metrics.inc(
+                    "ml_responses_total",
+                    endpoint=endpoint,
+                    status=str(response.status_code),
+                )
+                metrics.inc(
+                    "ml_response_wire_bytes_total",
+                    self._transport.wire_bytes(response),
+                    endpoint=endpoint,
+                )
+
+                if cached and response.status_code == 304:
+                    self._response_cache.refresh(cache_key, cache_ttl or 0)  # type: ignore
+                    return decode(cached["body"], schema)
+
+                result = tratamento_de_resposta(response, schema)
 
                 if result["retry"]:
+                    metrics.inc(
+                        "ml_retries_total",
+                        endpoint=endpoint,
+                        status=str(response.status_code),
+                    )
                     time.sleep(self._retry_delay)
                     if result["refresh_token"]:
                         if refresh:
                             access_token = self._token_manager.force_refreshing_token(
-                                id
+                                id, access_token
                             )
                         else:
                             access_token = self._token_manager.get_access_token(
@@ -107,22 +222,110 @@ class Client:
                             log.error(
                                 f"Novo access token indisponível para {id} após tentativa de refresh."
                             )
-                            return {}
+                            return falha
 
                     continue
+
+                if not 200 <= response.status_code < 300 and schema is not None:
+                    # Erro não é decodificado no esquema: o chamador recebe None
+                    log.warning(
+                        f"Resposta {response.status_code} em {endpoint} para {id}: {result['response']}"
+                    )
+                    return None
+
+                if cache_key is not None and 200 <= response.status_code < 300:
+                    self._store_in_cache(cache_key, response, cache_ttl)
+
                 return result["response"]
-            return {}
+            return falha
+        except CircuitOpenError:
+            raise
         except Exception as e:
             log.error(f"Erro na requisição {method} para {id}: {e}")
             raise
 
+    def _store_in_cache(
+        self,
+        cache_key: str,
+        response: Any,
+        cache_ttl: Optional[float],
+    ) -> None:
+        """
+        Armazena a resposta quando ela pode ser revalidada ou tem TTL definido.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified or cache_ttl:
+            self._response_cache.set(  # type: ignore
+                cache_key,
+                response.text,
+                etag=etag,
+                last_modified=last_modified,
+                ttl=cache_ttl or 0,
+            )
+
+    def close(self) -> None:
+        """
+        Fecha as conexões HTTP mantidas pelo transporte.
+        """
+        self._transport.close()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Retorna as estatísticas do cache de respostas (vazio se desativado).
+        """
+        if self._response_cache is None:
+            return {}
+        return self._response_cache.stats()
+
+    def circuit_stats(self) -> Dict[str, str]:
+        """
+        Retorna o estado do circuito de cada família de endpoint (vazio se desativado).
+        """
+        if self._breakers is None:
+            return {}
+        return self._breakers.stats()
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """
+        Retorna os GETs executados e os agrupados a outro idêntico em andamento
+        (vazio se desativado).
+        """
+        if self._coalescer is None:
+            return {}
+        return self._coalescer.stats()
+
     def get(
-        self, url: str, id: str, headers: Optional[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
+        self,
+        url: str,
+        id: str,
+        headers: Optional[Dict[str, str]] = None,
+        cache_ttl: Optional[float] = None,
+        schema: Optional[type] = None,
+    ) -> Any:
         """
         Executa requisição GET na API .
+
+        GETs idênticos (URL, loja, headers e schema) em andamento em outras
+        threads não são repetidos: o resultado da primeira é compartilhado.
+
+        Args:
+            cache_ttl: Segundos em que a resposta é servida do cache sem
+                revalidação. Use apenas para janelas históricas imutáveis.
+            schema: Dataclass de src.models para decodificar a resposta
+                (respostas de erro retornam None)
         """
-        return self._request("GET", url, id, headers=headers)
+
+        def request() -> Any:
+            return self._request(
+                "GET", url, id, headers=headers, cache_ttl=cache_ttl, schema=schema
+            )
+
+        if self._coalescer is None:
+            return request()
+
+        key = (url, id, tuple(sorted((headers or {}).items())), cache_ttl, schema)
+        return self._coalescer.do(key, request, endpoint=endpoint_label(url))
 
     def post(
         self,
@@ -0,0 +1,233 @@
+"""
+Transportes HTTP do cliente da API e do cliente Supabase.
+
+- RequestsTransport: requests/HTTP 1.1, uma sessão (pool) por thread.
+  Padrão (ML_HTTP_BACKEND=requests).
+- HttpxTransport: um único httpx.Client compartilhado pelas threads. Com
+  HTTP/2 (negociado via ALPN), as requisições simultâneas são multiplexadas
+  em uma só conexão TLS por host (ML_HTTP_BACKEND=httpx).
+- GzipRequestTransport: envolve o transporte httpx do Supabase e comprime
+  em gzip os corpos grandes de insert/upsert (SUPABASE_GZIP_INSERTS).
+- CircuitBreakerTransport: envolve o transporte httpx do Supabase com um
+  circuit breaker (SUPABASE_BREAKER_FAILURES).
+- PayloadMetricsTransport: conta os bytes enviados ao Supabase por tabela
+  e operação, a partir do corpo já serializado pelo cliente.
+
+As respostas são pedidas comprimidas (gzip/deflate e, com os pacotes
+opcionais brotli ou zstandard instalados, br/zstd) e descomprimidas pelo
+próprio transporte.
+"""
+
+import gzip
+import importlib.util
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+import requests
+
+from src.interfaces.http_transport_interface import IHttpTransport
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.metrics import metrics
+
+# Corpos menores que isso não compensam a compressão
+GZIP_MIN_BYTES = 8 * 1024
+GZIP_LEVEL = 5
+
+
+def _installed(*modules: str) -> bool:
+    return any(importlib.util.find_spec(module) is not None for module in modules)
+
+
+def accept_encoding() -> str:
+    """Codificações de resposta que os transportes conseguem descomprimir."""
+    encodings = ["gzip", "deflate"]
+    if _installed("brotli", "brotlicffi"):
+        encodings.append("br")
+    if _installed("zstandard"):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+class RequestsTransport(IHttpTransport):
+    """Transporte requests com uma sessão por thread (requests.Session não é thread-safe)."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: List[requests.Session] = []
+        self._accept_encoding = accept_encoding()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["Accept-Encoding"] = self._accept_encoding
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        content: Optional[bytes] = None,
+    ) -> requests.Response:
+        return self._session().request(method, url, headers=headers, data=content)
+
+    def wire_bytes(self, response: Any) -> int:
+        # urllib3 conta os bytes lidos do socket, antes da descompressão
+        try:
+            return int(response.raw.tell())
+        except Exception:
+            return len(response.content)
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+
+class HttpxTransport(IHttpTransport):
+    """Transporte httpx compartilhado entre threads, com HTTP/2 opcional."""
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 20,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            http2: Negocia HTTP/2 quando o servidor oferece (requer o pacote h2)
+            max_connections: Conexões simultâneas no fallback para HTTP/1.1
+            timeout: Timeout em segundos (None = sem timeout, como no requests)
+        """
+        self._client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+            headers={"Accept-Encoding": accept_encoding()},
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        content: Optional[bytes] = None,
+    ) -> httpx.Response:
+        response = self._client.request(method, url, headers=headers, content=content)
+        metrics.inc("ml_http_version_total", http_version=response.http_version)
+        return response
+
+    def wire_bytes(self, response: Any) -> int:
+        return response.num_bytes_downloaded
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class GzipRequestTransport(httpx.BaseTransport):
+    """
+    Comprime em gzip os corpos de POST/PATCH/PUT a partir de GZIP_MIN_BYTES.
+
+    Usado no cliente httpx do Supabase para os inserts em lote; o gateway
+    de destino precisa aceitar Content-Encoding: gzip nas requisições.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, min_bytes: int = GZIP_MIN_BYTES):
+        self._transport = transport
+        self._min_bytes = min_bytes
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method in ("POST", "PATCH", "PUT") and (
+            "Content-Encoding" not in request.headers
+        ):
+            body = request.read()
+            if len(body) >= self._min_bytes:
+                compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+                headers = request.headers.copy()
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Length"] = str(len(compressed))
+                request = httpx.Request(
+                    request.method,
+                    request.url,
+                    headers=headers,
+                    content=compressed,
+                    extensions=request.extensions,
+                )
+                metrics.inc("supabase_gzip_bytes_in_total", len(body))
+                metrics.inc("supabase_gzip_bytes_out_total", len(compressed))
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class PayloadMetricsTransport(httpx.BaseTransport):
+    """
+    Registra supabase_bytes_written_total dos POST/PATCH/PUT ao PostgREST.
+
+    O corpo já foi serializado pelo cliente, então contar os bytes não
+    custa uma nova serialização; fica antes da compressão gzip, para medir
+    o tamanho do payload e não o do corpo comprimido.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if metrics.enabled and request.method in ("POST", "PATCH", "PUT"):
+            # /rest/v1/<tabela>; upsert é um POST com resolução de duplicatas
+            table = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+            if request.method == "PATCH":
+                op = "update"
+            elif request.method == "PUT" or "resolution=" in request.headers.get(
+                "Prefer", ""
+            ):
+                op = "upsert"
+            else:
+                op = "insert"
+            metrics.inc(
+                "supabase_bytes_written_total", len(request.read()), table=table, op=op
+            )
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class CircuitBreakerTransport(httpx.BaseTransport):
+    """
+    Passa as requisições pelo circuit breaker informado.
+
+    Com o circuito aberto, as chamadas ao Supabase falham na hora com
+    CircuitOpenError em vez de esperar o timeout de cada uma.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, breaker: CircuitBreaker):
+        self._transport = transport
+        self._breaker = breaker
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._breaker.before_call()
+        sucesso: Optional[bool] = None
+        try:
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError:
+                sucesso = False
+                raise
+            sucesso = response.status_code != 429 and response.status_code < 500
+            return response
+        finally:
+            self._breaker.record(sucesso)
+
+    def close(self) -> None:
+        self._transport.close()
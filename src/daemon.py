@@ -0,0 +1,458 @@
+"""
+Modo daemon da integração (`python -m src daemon`).
+
+Em vez de um processo por execução, mantém vivos a factory, o cliente
+Supabase, as conexões HTTP e o cache de tokens, e sincroniza cada loja em
+intervalos fixos:
+
+- cada (loja, job) tem seu próximo horário, contado a partir do fim da
+  execução anterior; um job nunca roda em paralelo consigo mesmo;
+- o primeiro sync das lojas é espalhado ao longo do intervalo;
+- com --all-sellers, a lista de lojas é relida a cada ML_DAEMON_SELLERS_REFRESH.
+
+Endpoint de controle (padrão 127.0.0.1:8080):
+
+    GET  /healthz                     200 com o agendador ativo, senão 503
+    GET  /status                      estado de cada loja/job, circuitos e caches
+    GET  /metrics                     métricas no formato texto do Prometheus
+    POST /run?seller=<id>&job=<job>   antecipa o sync (sem job: todos os da loja)
+    POST /stop                        encerra após os syncs em andamento
+    POST /notifications               callback orders_v2 (com --webhooks; ver src.webhook)
+
+Com ML_DAEMON_TOKEN, /status, /metrics, /run e /stop exigem o header
+`Authorization: Bearer <token>`; /healthz e /notifications (chamado pelo
+Mercado Livre) continuam abertos. Fora de 127.0.0.1/localhost o token é
+obrigatório.
+
+SIGTERM e SIGINT também encerram de forma ordenada.
+"""
+
+import argparse
+import hmac
+import json
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.cli import (
+    PERIODOS,
+    SyncFn,
+    aplicar_opcoes,
+    resolver_lojas,
+    selecionar_jobs,
+    sincronizar_loja,
+)
+from src.interfaces.order_notification_interface import IOrderNotificationService
+from src.services.metrics_sink import render_prometheus
+from src.utils.config import configurar, settings
+from src.utils.data import get_first_and_last_day_of_last_year, get_periodo_ultimos_dias
+from src.utils.log import log
+from src.utils.metrics import metrics
+from src.webhook import NOTIFICATIONS_PATH, receber_notificacao
+
+Janela = Tuple[str, str, str, str]
+
+# Rotas que exigem ML_DAEMON_TOKEN, quando configurado
+ROTAS_PROTEGIDAS = {"/status", "/metrics", "/run", "/stop"}
+
+
+@dataclass
+class Agendamento:
+    """Próxima execução e histórico de um job de uma loja."""
+
+    loja: str
+    job: str
+    intervalo: float
+    proxima: float
+    estado: str = "aguardando"
+    execucoes: int = 0
+    falhas: int = 0
+    ultimo_ok: Optional[bool] = None
+    ultimo_inicio: Optional[str] = None
+    ultima_duracao: Optional[float] = None
+
+    def status(self, agora: float) -> Dict[str, Any]:
+        return {
+            "seller": self.loja,
+            "job": self.job,
+            "estado": self.estado,
+            "proxima_em_s": round(max(0.0, self.proxima - agora), 1),
+            "execucoes": self.execucoes,
+            "falhas": self.falhas,
+            "ultimo_ok": self.ultimo_ok,
+            "ultimo_inicio": self.ultimo_inicio,
+            "ultima_duracao_s": self.ultima_duracao,
+        }
+
+
+class SyncDaemon:
+    """Agendador dos syncs periódicos de cada loja."""
+
+    def __init__(
+        self,
+        jobs: Sequence[Tuple[str, SyncFn]],
+        intervalos: Dict[str, float],
+        lojas: Callable[[], List[str]],
+        janela: Callable[[], Janela],
+        workers: int,
+        releitura_lojas: Optional[float] = None,
+        ao_concluir: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            jobs: (nome, função) dos jobs agendados
+            intervalos: Segundos entre execuções, por job
+            lojas: Retorna as lojas a sincronizar
+            janela: Retorna a janela de datas de cada execução
+            workers: Syncs em paralelo
+            releitura_lojas: Segundos entre releituras de `lojas` (None = lista fixa)
+            ao_concluir: Chamado ao fim de cada sync (ex.: exportar métricas)
+        """
+        self._jobs = dict(jobs)
+        self._intervalos = intervalos
+        self._lojas_fn = lojas
+        self._janela = janela
+        self._releitura = releitura_lojas
+        self._ao_concluir = ao_concluir
+
+        self._cond = threading.Condition()
+        self._agendamentos: Dict[Tuple[str, str], Agendamento] = {}
+        self._lojas: set = set()
+        self._proxima_releitura = 0.0
+        self._parando = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync")
+        self._thread = threading.Thread(
+            target=self._loop, name="sync-scheduler", daemon=True
+        )
+        self.iniciado_em = time.time()
+
+    def iniciar(self) -> "SyncDaemon":
+        self._atualizar_lojas()
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        """Interrompe o agendamento; os syncs em andamento terminam normalmente."""
+        with self._cond:
+            if not self._parando:
+                log.info("Daemon: encerrando após os syncs em andamento")
+            self._parando = True
+            self._cond.notify_all()
+
+    def aguardar(self) -> None:
+        """Bloqueia até o daemon parar e os syncs em andamento terminarem."""
+        # join com timeout para que SIGTERM/SIGINT sejam tratados na thread principal
+        while self._thread.is_alive():
+            self._thread.join(1.0)
+        self._executor.shutdown(wait=True)
+
+    def saudavel(self) -> bool:
+        return self._thread.is_alive() and not self._parando
+
+    def executar_agora(self, loja: str, job: Optional[str] = None) -> int:
+        """
+        Antecipa o próximo sync da loja (de um job ou de todos).
+
+        Returns:
+            Quantidade de jobs antecipados (0 se a loja/job não estiver agendada)
+        """
+        with self._cond:
+            encontrados = [
+                ag
+                for (l, j), ag in self._agendamentos.items()
+                if l == loja and (job is None or j == job)
+            ]
+            for ag in encontrados:
+                if ag.estado == "aguardando":
+                    ag.proxima = 0.0
+            self._cond.notify_all()
+        return len(encontrados)
+
+    def status(self) -> Dict[str, Any]:
+        agora = time.monotonic()
+        with self._cond:
+            agendamentos = [
+                ag.status(agora)
+                for _, ag in sorted(self._agendamentos.items())
+            ]
+        return {
+            "saudavel": self.saudavel(),
+            "iniciado_em": datetime.fromtimestamp(self.iniciado_em).isoformat(
+                timespec="seconds"
+            ),
+            "uptime_s": round(time.time() - self.iniciado_em, 1),
+            "agendamentos": agendamentos,
+        }
+
+    def _atualizar_lojas(self) -> None:
+        lojas = self._lojas_fn()
+        agora = time.monotonic()
+        with self._cond:
+            novas = [loja for loja in lojas if loja not in self._lojas]
+            removidas = self._lojas - set(lojas)
+            self._lojas = set(lojas)
+
+            for i, loja in enumerate(novas):
+                for job in self._jobs:
+                    intervalo = self._intervalos[job]
+                    self._agendamentos[(loja, job)] = Agendamento(
+                        loja, job, intervalo, agora + intervalo * i / len(novas)
+                    )
+            # Jobs em andamento de lojas removidas saem ao concluir
+            for chave, ag in list(self._agendamentos.items()):
+                if chave[0] in removidas and ag.estado == "aguardando":
+                    del self._agendamentos[chave]
+            self._cond.notify_all()
+
+        if novas or removidas:
+            log.info(
+                f"Daemon: {len(self._lojas)} loja(s) agendada(s) "
+                f"(+{len(novas)}, -{len(removidas)})"
+            )
+
+    def _loop(self) -> None:
+        while True:
+            if self._releitura and time.monotonic() >= self._proxima_releitura:
+                try:
+                    self._atualizar_lojas()
+                except Exception as e:
+                    log.error(f"Daemon: erro ao reler a lista de lojas: {e}")
+                self._proxima_releitura = time.monotonic() + self._releitura
+
+            with self._cond:
+                if self._parando:
+                    return
+                agora = time.monotonic()
+                for ag in self._agendamentos.values():
+                    if ag.estado == "aguardando" and ag.proxima <= agora:
+                        ag.estado = "na_fila"
+                        self._executor.submit(self._executar, ag)
+
+                espera = min(
+                    (ag.proxima for ag in self._agendamentos.values() if ag.estado == "aguardando"),
+                    default=agora + 60.0,
+                ) - agora
+                if self._releitura:
+                    espera = min(espera, self._proxima_releitura - agora)
+                self._cond.wait(timeout=max(espera, 0.01))
+
+    def _executar(self, ag: Agendamento) -> None:
+        with self._cond:
+            if self._parando:
+                ag.estado = "aguardando"
+                return
+            ag.estado = "executando"
+            ag.ultimo_inicio = datetime.now().isoformat(timespec="seconds")
+
+        started = time.perf_counter()
+        ok = False
+        try:
+            ok = sincronizar_loja(ag.loja, [(ag.job, self._jobs[ag.job])], self._janela())[
+                ag.job
+            ]
+        except Exception as e:
+            log.error(f"Daemon: erro no sync {ag.job} da loja {ag.loja}: {e}")
+        duracao = time.perf_counter() - started
+
+        metrics.inc("daemon_syncs_total", job=ag.job, status="ok" if ok else "falhou")
+        metrics.observe("daemon_sync_seconds", duracao, job=ag.job)
+
+        with self._cond:
+            ag.estado = "aguardando"
+            ag.execucoes += 1
+            ag.falhas += 0 if ok else 1
+            ag.ultimo_ok = ok
+            ag.ultima_duracao = round(duracao, 2)
+            ag.proxima = time.monotonic() + ag.intervalo
+            if ag.loja not in self._lojas:
+                self._agendamentos.pop((ag.loja, ag.job), None)
+            self._cond.notify_all()
+
+        if self._ao_concluir is not None:
+            self._ao_concluir()
+
+
+def criar_servidor_controle(
+    daemon: SyncDaemon,
+    host: str,
+    port: int,
+    notificacoes: Optional[IOrderNotificationService] = None,
+    token: Optional[str] = None,
+) -> ThreadingHTTPServer:
+    """
+    Cria o servidor HTTP de saúde/controle do daemon (não o inicia).
+
+    Com token, as rotas de controle exigem `Authorization: Bearer <token>`.
+    """
+    from src import api
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, body: Any, content_type: str = "application/json") -> None:
+            if content_type == "application/json":
+                body = json.dumps(body, ensure_ascii=False)
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _autorizado(self) -> bool:
+            if token is None:
+                return True
+            recebido = self.headers.get("Authorization", "")
+            if hmac.compare_digest(recebido.encode(), f"Bearer {token}".encode()):
+                return True
+            self._send(401, {"erro": "token inválido ou ausente"})
+            return False
+
+        def do_GET(self) -> None:
+            path = urlsplit(self.path).path
+            if path in ROTAS_PROTEGIDAS and not self._autorizado():
+                return
+            if path == "/healthz":
+                ok = daemon.saudavel()
+                self._send(200 if ok else 503, {"status": "ok" if ok else "parado"})
+            elif path == "/status":
+                self._send(
+                    200,
+                    {
+                        **daemon.status(),
+                        "circuitos": api.circuit_stats(),
+                        "cache": api.cache_stats(),
+                        "gets_agrupados": api.coalesce_stats(),
+                        "notificacoes": notificacoes.stats() if notificacoes else {},
+                    },
+                )
+            elif path == "/metrics":
+                self._send(
+                    200,
+                    render_prometheus(metrics.snapshot()),
+                    "text/plain; version=0.0.4",
+                )
+            else:
+                self._send(404, {"erro": "não encontrado"})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b""
+            parts = urlsplit(self.path)
+            params = dict(parse_qsl(parts.query))
+            if parts.path in ROTAS_PROTEGIDAS and not self._autorizado():
+                return
+            if parts.path == NOTIFICATIONS_PATH and notificacoes is not None:
+                self._send(*receber_notificacao(notificacoes, body))
+            elif parts.path == "/run":
+                if not params.get("seller"):
+                    self._send(400, {"erro": "informe ?seller=<id>"})
+                    return
+                agendados = daemon.executar_agora(params["seller"], params.get("job"))
+                self._send(202 if agendados else 404, {"agendados": agendados})
+            elif parts.path == "/stop":
+                daemon.parar()
+                self._send(202, {"status": "parando"})
+            else:
+                self._send(404, {"erro": "não encontrado"})
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    aplicar_opcoes(args)
+    opcoes = {
+        "daemon_sales_interval": args.sales_every,
+        "daemon_ads_interval": args.ads_every,
+        "daemon_host": args.host,
+        "daemon_port": args.port,
+        "ml_webhooks": args.webhooks,
+    }
+    configurar(**{nome: valor for nome, valor in opcoes.items() if valor is not None})
+
+    if settings.daemon_port and not settings.daemon_token and settings.daemon_host not in (
+        "127.0.0.1",
+        "localhost",
+        "::1",
+    ):
+        log.error(
+            f"Daemon: endpoint de controle em {settings.daemon_host} exige ML_DAEMON_TOKEN"
+        )
+        return 2
+
+    lojas = resolver_lojas(args)
+    if not lojas and not args.all_sellers:
+        log.error("Nenhuma loja selecionada (use --seller, --all-sellers ou ML_SELLERS)")
+        return 2
+
+    dias = args.days or PERIODOS[args.periodo or "short"]
+
+    def janela() -> Janela:
+        # Recalculada a cada sync: a janela acompanha a virada do dia
+        return (*get_periodo_ultimos_dias(dias), *get_first_and_last_day_of_last_year())
+
+    from src import api, factory
+
+    daemon = SyncDaemon(
+        selecionar_jobs(args.target),
+        {"sales": settings.daemon_sales_interval, "ads": settings.daemon_ads_interval},
+        lojas=(lambda: resolver_lojas(args)) if args.all_sellers else (lambda: lojas),
+        janela=janela,
+        workers=settings.sync_workers,
+        releitura_lojas=settings.daemon_sellers_refresh if args.all_sellers else None,
+        ao_concluir=factory.export_metrics,
+    )
+
+    notificacoes = None
+    if settings.ml_webhooks:
+        notificacoes = factory.create_order_notification_service(
+            api, sellers=None if args.all_sellers else lojas
+        )
+
+    servidor = None
+    if settings.daemon_port:
+        servidor = criar_servidor_controle(
+            daemon,
+            settings.daemon_host,
+            settings.daemon_port,
+            notificacoes,
+            token=settings.daemon_token,
+        )
+        threading.Thread(
+            target=servidor.serve_forever, name="daemon-control", daemon=True
+        ).start()
+        log.info(
+            f"Daemon: endpoint de controle em http://{settings.daemon_host}:"
+            f"{servidor.server_port}"
+        )
+
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sinal, lambda *_: daemon.parar())
+
+    log.info(
+        f"Daemon {args.target}: {len(lojas)} loja(s), últimos {dias} dias, "
+        f"vendas a cada {settings.daemon_sales_interval:.0f}s, "
+        f"ads a cada {settings.daemon_ads_interval:.0f}s, "
+        f"{settings.sync_workers} worker(s)"
+    )
+    daemon.iniciar()
+    daemon.aguardar()
+
+    if servidor is not None:
+        servidor.shutdown()
+        servidor.server_close()
+    if notificacoes is not None:
+        notificacoes.close()
+    api.close()
+    factory.close()
+    log.info("Daemon encerrado")
+    return 0
@@ -5,26 +5,55 @@ Implementa o padrão Factory Method para criação do Ap
 com todas as suas dependências configuradas.
 """
 
-from typing import Optional
+import atexit
+from typing import Iterable, Optional
 
 from src.interfaces.credentials_repository_interface import (
     ICredentialsRepository,
 )
 from src.interfaces.encryption_service_interface import IEncryptionService
+from src.interfaces.http_transport_interface import IHttpTransport
+from src.interfaces.item_cache_interface import IItemCache
+from src.interfaces.item_enrichment_interface import IItemEnrichmentService
+from src.interfaces.metrics_sink_interface import IMetricsSink
+from src.interfaces.order_notification_interface import IOrderNotificationService
+from src.interfaces.response_cache_interface import IResponseCache
+from src.interfaces.staging_service_interface import IStagingService
 from src.interfaces.token_manager_interface import ITokenManager
 
 from src.repositories.credentials_repository import CredentialsRepository
 
 from src.services.encryption_service import EncryptionService
+from src.services.item_cache import SqliteItemCache
+from src.services.item_enrichment import ItemEnrichmentService
+from src.services.metrics_sink import JsonSummarySink, PrometheusTextFileSink
+from src.services.order_notifications import OrderNotificationService
+from src.services.response_cache import DiskResponseCache
+from src.services.staging_service import ParquetStagingService
 from src.services.token_manager import TokenManager
 
 from src.clients.client import Client
+from src.clients.http_transport import (
+    CircuitBreakerTransport,
+    GzipRequestTransport,
+    HttpxTransport,
+    PayloadMetricsTransport,
+    RequestsTransport,
+)
 
 import os
+import httpx
 from supabase import create_client, Client as SupabaseClient
 from supabase.client import ClientOptions
 from dotenv import load_dotenv
 
+from src.utils.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from src.utils.coalescer import RequestCoalescer
+from src.utils.config import settings
+from src.utils.log import log
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import RateLimiter
+
 
 class Factory:
     """Factory para criação do cliente."""
@@ -34,11 +63,20 @@ class Factory:
         self._token_manager: Optional[ITokenManager] = None
         self._credentials_repository: Optional[ICredentialsRepository] = None
         self._encryption_service: Optional[IEncryptionService] = None
+        self._response_cache: Optional[IResponseCache] = None
+        self._staging_service: Optional[IStagingService] = None
+        self._item_cache: Optional[IItemCache] = None
+        self._item_enrichment_service: Optional[IItemEnrichmentService] = None
+        self._metrics_sink: Optional[IMetricsSink] = None
+        self._order_notification_service: Optional[IOrderNotificationService] = None
+        self._supabase_client: Optional[SupabaseClient] = None
+        self._http_client: Optional[httpx.Client] = None
 
     def create_client(
         self,
         max_retries: int = 3,
         retry_delay: int = 1,
+        cache_dir: Optional[str] = None,
     ) -> Client:
         """
         Cria cliente com todas as dependências configuradas.
@@ -46,11 +84,14 @@ class Factory:
         Args:
             max_retries: Número máximo de tentativas para requisições
             retry_delay: Delay entre tentativas em segundos
+            cache_dir: Diretório do cache de respostas (padrão: ML_CACHE_DIR)
 
         Returns:
             Cliente configurado
         """
 
+        self.create_metrics_sink()
+
         encryption_service = self.create_encryption_service()
         credentials_repository = self.create_credentials_repository(encryption_service)
 
@@ -62,8 +103,37 @@ class Factory:
             token_manager=token_manager,
             max_retries=max_retries,
             retry_delay=retry_delay,
+            response_cache=self.create_response_cache(cache_dir),
+            rate_limiter=RateLimiter(),
+            coalescer=(
+                RequestCoalescer("ml_coalesced_requests_total")
+                if settings.ml_coalesce_gets
+                else None
+            ),
+            breakers=CircuitBreakerRegistry(),
+            transport=self.create_http_transport(),
         )
 
+    def create_http_transport(self, backend: Optional[str] = None) -> IHttpTransport:
+        """
+        Cria o transporte HTTP do cliente da API.
+
+        Args:
+            backend: "requests" ou "httpx" (padrão: ML_HTTP_BACKEND)
+
+        Returns:
+            Transporte HTTP
+        """
+        backend = backend or settings.ml_http_backend
+        if backend == "requests":
+            return RequestsTransport()
+        if backend == "httpx":
+            return HttpxTransport(
+                http2=settings.ml_http2,
+                max_connections=settings.ml_http_pool_size,
+            )
+        raise ValueError(f"ML_HTTP_BACKEND inválido: {backend}")
+
     def create_token_manager(
         self,
         credentials_repository: Optional[ICredentialsRepository] = None,
@@ -99,6 +169,40 @@ class Factory:
             Repositório de credenciais
         """
 
+        if self._credentials_repository is None:
+            if not encryption_service:
+                encryption_service = self.create_encryption_service()
+
+            self._credentials_repository = CredentialsRepository(
+                encryption_service=encryption_service,
+                supabase_client=self.create_supabase_client(),
+            )
+        return self._credentials_repository
+
+    def create_supabase_client(
+        self,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> SupabaseClient:
+        """
+        Cria o cliente Supabase compartilhado pelo processo.
+
+        O cliente usa um único httpx.Client com keep-alive, de forma que todos
+        os repositórios reaproveitam as mesmas conexões TLS com o PostgREST.
+        Opcionalmente negocia HTTP/2 (SUPABASE_HTTP2) e comprime os corpos
+        de insert em gzip (SUPABASE_GZIP_INSERTS). Falhas seguidas abrem o
+        circuit breaker do Supabase (SUPABASE_BREAKER_FAILURES).
+
+        Args:
+            pool_size: Máximo de conexões simultâneas (padrão: SUPABASE_POOL_SIZE)
+            timeout: Timeout de leitura/escrita em segundos (padrão: SUPABASE_TIMEOUT)
+
+        Returns:
+            Cliente Supabase configurado
+        """
+        if self._supabase_client is not None:
+            return self._supabase_client
+
         load_dotenv()
 
         url = os.environ.get("SUPABASE_URL")
@@ -108,24 +212,188 @@ class Factory:
                 "SUPABASE_URL and SUPABASE_KEY environment variables must be set"
             )
 
-        supabase: SupabaseClient = create_client(
+        pool_size = pool_size or settings.supabase_pool_size
+        timeout = timeout or settings.supabase_timeout
+
+        # Com transport explícito, limits/http2 precisam ir no próprio transporte
+        transport: httpx.BaseTransport = httpx.HTTPTransport(
+            http2=settings.supabase_http2,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=settings.supabase_keepalive_expiry,
+            ),
+        )
+        if settings.supabase_gzip_inserts:
+            transport = GzipRequestTransport(transport)
+        transport = PayloadMetricsTransport(transport)
+        transport = CircuitBreakerTransport(
+            transport,
+            CircuitBreaker(
+                "supabase",
+                settings.supabase_breaker_failures,
+                settings.supabase_breaker_cooldown,
+            ),
+        )
+
+        self._http_client = httpx.Client(
+            transport=transport,
+            timeout=httpx.Timeout(timeout, connect=settings.supabase_connect_timeout),
+            follow_redirects=True,
+        )
+
+        self._supabase_client = create_client(
             url,
             key,
             options=ClientOptions(
-                postgrest_client_timeout=10,
-                storage_client_timeout=10,
                 schema="public",
+                httpx_client=self._http_client,
             ),
         )
+        return self._supabase_client
 
-        if self._credentials_repository is None:
-            if not encryption_service:
-                encryption_service = self.create_encryption_service()
+    def create_response_cache(
+        self, cache_dir: Optional[str] = None
+    ) -> Optional[IResponseCache]:
+        """
+        Cria o cache de respostas em disco, quando habilitado.
 
-            self._credentials_repository = CredentialsRepository(
-                encryption_service=encryption_service, supabase_client=supabase
+        Args:
+            cache_dir: Diretório do cache (padrão: ML_CACHE_DIR)
+
+        Returns:
+            Cache de respostas ou None se nenhum diretório foi configurado
+        """
+        cache_dir = cache_dir or settings.ml_cache_dir
+        if self._response_cache is None and cache_dir:
+            self._response_cache = DiskResponseCache(
+                cache_dir, max_bytes=settings.ml_cache_max_mb * 1024 * 1024
             )
-        return self._credentials_repository
+        return self._response_cache
+
+    def create_staging_service(
+        self, staging_dir: Optional[str] = None
+    ) -> Optional[IStagingService]:
+        """
+        Cria o serviço de staging em Parquet, quando habilitado.
+
+        Args:
+            staging_dir: Diretório raiz do staging (padrão: ML_STAGING_DIR)
+
+        Returns:
+            Serviço de staging ou None se nenhum diretório foi configurado
+        """
+        staging_dir = staging_dir or settings.staging_dir
+        if self._staging_service is None and staging_dir:
+            self._staging_service = ParquetStagingService(staging_dir)
+        return self._staging_service
+
+    def create_item_cache(self, path: Optional[str] = None) -> IItemCache:
+        """
+        Cria o cache de atributos de itens.
+
+        Args:
+            path: Arquivo SQLite (padrão: ML_ITEMS_CACHE; sem ele, em memória)
+
+        Returns:
+            Cache de itens
+        """
+        if self._item_cache is None:
+            self._item_cache = SqliteItemCache(
+                path or settings.ml_items_cache_path or ":memory:",
+                ttl=settings.ml_items_cache_ttl,
+            )
+        return self._item_cache
+
+    def create_item_enrichment_service(
+        self, client: Optional[Client] = None
+    ) -> IItemEnrichmentService:
+        """
+        Cria o serviço de enriquecimento de vendas via /items.
+
+        Args:
+            client: Cliente da API (padrão: um novo cliente da factory)
+
+        Returns:
+            Serviço de enriquecimento
+        """
+        if self._item_enrichment_service is None:
+            if client is None:
+                client = self.create_client()
+
+            self._item_enrichment_service = ItemEnrichmentService(
+                client=client,
+                cache=self.create_item_cache(),
+                workers=settings.ml_items_workers,
+            )
+        return self._item_enrichment_service
+
+    def create_order_notification_service(
+        self,
+        client: Optional[Client] = None,
+        sellers: Optional[Iterable[str]] = None,
+    ) -> IOrderNotificationService:
+        """
+        Cria o serviço de notificações de pedidos (orders_v2).
+
+        Args:
+            client: Cliente da API (padrão: um novo cliente da factory)
+            sellers: Lojas aceitas (padrão: qualquer loja)
+
+        Returns:
+            Serviço de notificações, já processando a fila
+        """
+        if self._order_notification_service is None:
+            if client is None:
+                client = self.create_client()
+
+            self._order_notification_service = OrderNotificationService(
+                client=client,
+                repository=self.create_credentials_repository(),
+                enrichment=(
+                    self.create_item_enrichment_service(client)
+                    if settings.ml_enrich_items
+                    else None
+                ),
+                sellers=sellers,
+                gravar=settings.write_backend != "none",
+            )
+        return self._order_notification_service
+
+    def create_metrics_sink(self, spec: Optional[str] = None) -> Optional[IMetricsSink]:
+        """
+        Cria o sink de métricas e agenda a exportação ao final do processo.
+
+        Args:
+            spec: "prometheus:<arquivo>", "json:<arquivo>" ou "json" (padrão: METRICS_SINK)
+
+        Returns:
+            Sink configurado ou None quando as métricas estão desativadas
+        """
+        spec = spec or settings.metrics_sink
+        if self._metrics_sink is not None or not spec:
+            return self._metrics_sink
+
+        kind, _, path = spec.partition(":")
+        if kind == "prometheus" and path:
+            self._metrics_sink = PrometheusTextFileSink(path)
+        elif kind == "json":
+            self._metrics_sink = JsonSummarySink(path or None)
+        else:
+            raise ValueError(f"METRICS_SINK inválido: {spec}")
+
+        metrics.enabled = True
+        atexit.register(self.export_metrics)
+        return self._metrics_sink
+
+    def export_metrics(self) -> None:
+        """Exporta as métricas coletadas para o sink configurado."""
+        if self._metrics_sink is None:
+            return
+        try:
+            self._metrics_sink.export(metrics.snapshot())
+        except Exception as e:
+            log.error(f"Erro ao exportar métricas: {e}")
 
     def create_encryption_service(self) -> IEncryptionService:
         """
@@ -141,8 +409,23 @@ class Factory:
             self._encryption_service = EncryptionService()
         return self._encryption_service
 
+    def close(self) -> None:
+        """Fecha as conexões HTTP mantidas pelo cliente Supabase compartilhado."""
+        if self._http_client is not None:
+            self._http_client.close()
+        self._http_client = None
+        self._supabase_client = None
+
     def reset(self) -> None:
         """Reseta todas as instâncias singleton."""
+        self.close()
         self._token_manager = None
         self._credentials_repository = None
         self._encryption_service = None
+        self._response_cache = None
+        self._staging_service = None
+        self._item_cache = None
+        self._item_enrichment_service = None
+        if self._order_notification_service is not None:
+            self._order_notification_service.close()
+        self._order_notification_service = None
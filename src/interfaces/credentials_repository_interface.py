@@ -5,9 +5,13 @@ Define o contrato para persistência de credenciais.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 import pandas as pd
 
+from src.models.mercado_livre import Item
+from src.models.records import AdsRecord, SaleRecord
+from src.models.rollups import AdsDailyRollup, SalesDailyRollup
+
 
 class ICredentialsRepository(ABC):
     """Interface para repositório de credenciais."""
@@ -35,6 +39,29 @@ class ICredentialsRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def compare_and_set_token(
+        self,
+        id: str,
+        expected_version: int,
+        new_version: int,
+        token: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Atualiza token_version (e, opcionalmente, os tokens) apenas se a versão
+        gravada ainda for expected_version.
+
+        Args:
+            id: Identificador da loja
+            expected_version: Versão lida anteriormente
+            new_version: Versão a gravar
+            token: Dados do token a gravar junto (opcional)
+
+        Returns:
+            True se a linha foi atualizada, False se outra versão já estava gravada
+        """
+        pass
+
     @abstractmethod
     def get_refresh_payload(self, id: str) -> Dict[str, Any]:
         """
@@ -82,6 +109,16 @@ class ICredentialsRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def insert_sales_records(self, records: Sequence[SaleRecord]) -> None:
+        """
+        Insere novos registros na tabela sales_ml.
+
+        Args:
+            records: Registros de venda a serem inseridos
+        """
+        pass
+
     @abstractmethod
     def delete_ads_by_id_and_date(
         self, id: str, start_date: str, end_date: str
@@ -95,6 +132,47 @@ class ICredentialsRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def delete_ads_by_mlbs_and_date(
+        self, id: str, mlbs: List[str], start_date: str, end_date: str
+    ) -> None:
+        """
+        Exclui registros da tabela ads_ml da loja para os MLBs informados e date entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            mlbs: Lista de MLBs
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+        """
+        pass
+
+    @abstractmethod
+    def get_ads_finalized_ranges(self, id: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Retorna, por MLB, o intervalo de dias de ads_ml já finalizado e armazenado.
+
+        Args:
+            id: Identificador da loja
+
+        Returns:
+            Dicionário {mlb: (date_from, date_to)}
+        """
+        pass
+
+    @abstractmethod
+    def save_ads_finalized_ranges(
+        self, id: str, ranges: Dict[str, Tuple[str, str]]
+    ) -> None:
+        """
+        Registra os intervalos de dias de ads_ml finalizados por MLB.
+
+        Args:
+            id: Identificador da loja
+            ranges: Dicionário {mlb: (date_from, date_to)}
+        """
+        pass
+
     @abstractmethod
     def insert_ads_from_dataframe(self, df: pd.DataFrame) -> None:
         """
@@ -105,6 +183,261 @@ class ICredentialsRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def insert_ads_records(self, records: Sequence[AdsRecord]) -> None:
+        """
+        Insere novos registros na tabela ads_ml.
+
+        Args:
+            records: Registros de métricas de ads a serem inseridos
+        """
+        pass
+
+    @abstractmethod
+    def get_sales_day_counts(
+        self, id: str, start_date: str, end_date: str
+    ) -> Dict[str, int]:
+        """
+        Retorna a quantidade de pedidos gravada em sales_ml por dia.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (YYYY-MM-DD)
+            end_date: Data final (YYYY-MM-DD)
+
+        Returns:
+            Dicionário {dia: pedidos} apenas dos dias com contagem registrada
+        """
+        pass
+
+    @abstractmethod
+    def upsert_sales_day_counts(self, id: str, counts: Dict[str, int]) -> None:
+        """
+        Registra a quantidade de pedidos gravada em sales_ml por dia.
+
+        Args:
+            id: Identificador da loja
+            counts: Dicionário {dia: pedidos}
+        """
+        pass
+
+    @abstractmethod
+    def delete_sales_day_counts(self, id: str, start_date: str, end_date: str) -> None:
+        """
+        Exclui as contagens de pedidos da loja entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (YYYY-MM-DD)
+            end_date: Data final (YYYY-MM-DD)
+        """
+        pass
+
+    @abstractmethod
+    def replace_sales_orders(
+        self, id: str, order_ids: Sequence[int], records: Sequence[SaleRecord]
+    ) -> Set[str]:
+        """
+        Substitui em sales_ml as linhas dos pedidos informados.
+
+        Args:
+            id: Identificador da loja
+            order_ids: Pedidos cujas linhas atuais são excluídas
+            records: Novas linhas (apenas dos pedidos ainda pagos)
+        Returns:
+            Dias (date_created) das linhas excluídas ou inseridas
+        """
+        pass
+
+    @abstractmethod
+    def get_sales_records(self, id: str, days: Sequence[str]) -> List[SaleRecord]:
+        """
+        Retorna as linhas de sales_ml da loja nos dias informados.
+
+        Args:
+            id: Identificador da loja
+            days: Dias (YYYY-MM-DD)
+        Returns:
+            Registros de venda
+        """
+        pass
+
+    @abstractmethod
+    def acquire_sales_lock(self, id: str, owner: str, ttl: float) -> bool:
+        """
+        Tenta obter a trava de gravação de sales_ml da loja, compartilhada entre processos.
+
+        Args:
+            id: Identificador da loja
+            owner: Identificador de quem pede a trava
+            ttl: Segundos de validade da posse
+        Returns:
+            True se a trava foi obtida
+        """
+        pass
+
+    @abstractmethod
+    def release_sales_lock(self, id: str, owner: str) -> None:
+        """
+        Libera a trava de gravação de sales_ml da loja, se ainda for de owner.
+
+        Args:
+            id: Identificador da loja
+            owner: Identificador usado em acquire_sales_lock
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_orders(self) -> Dict[Tuple[str, int], int]:
+        """
+        Retorna os pedidos notificados cuja busca falhou.
+
+        Returns:
+            Dicionário {(loja, pedido): tentativas}
+        """
+        pass
+
+    @abstractmethod
+    def save_pending_orders(self, id: str, attempts: Dict[int, int]) -> None:
+        """
+        Registra pedidos notificados cuja busca falhou.
+
+        Args:
+            id: Identificador da loja
+            attempts: Dicionário {pedido: tentativas feitas}
+        """
+        pass
+
+    @abstractmethod
+    def delete_pending_orders(self, id: str, order_ids: Sequence[int]) -> None:
+        """
+        Remove pedidos da lista de pendentes.
+
+        Args:
+            id: Identificador da loja
+            order_ids: Pedidos buscados com sucesso ou descartados
+        """
+        pass
+
+    @abstractmethod
+    def upsert_items(self, id: str, items: Sequence[Item]) -> None:
+        """
+        Grava ou atualiza os atributos dos MLBs da loja na tabela items_ml.
+
+        Args:
+            id: Identificador da loja
+            items: Itens lidos de /items
+        """
+        pass
+
+    @abstractmethod
+    def delete_sales_rollups_by_id_and_date(
+        self, id: str, start_date: str, end_date: str
+    ) -> None:
+        """
+        Exclui os agregados de sales_ml_diario da loja entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+        """
+        pass
+
+    @abstractmethod
+    def upsert_sales_rollups(self, rollups: Sequence[SalesDailyRollup]) -> None:
+        """
+        Grava os agregados diários de vendas em sales_ml_diario.
+
+        Args:
+            rollups: Agregados por loja, dia e MLB
+        """
+        pass
+
+    @abstractmethod
+    def delete_ads_rollups_by_id_and_date(
+        self, id: str, start_date: str, end_date: str
+    ) -> None:
+        """
+        Exclui os agregados de ads_ml_diario da loja entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+        """
+        pass
+
+    @abstractmethod
+    def upsert_ads_rollups(self, rollups: Sequence[AdsDailyRollup]) -> None:
+        """
+        Grava os agregados diários de ads em ads_ml_diario.
+
+        Args:
+            rollups: Agregados por loja, dia e MLB
+        """
+        pass
+
+    @abstractmethod
+    def get_seller_ids(self) -> List[str]:
+        """
+        Retorna os ids de todas as lojas com credenciais cadastradas.
+
+        Returns:
+            Lista de ids da tabela credenciais_ml
+        """
+        pass
+
+    @abstractmethod
+    def get_sync_history(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """
+        Retorna a última execução bem-sucedida de cada job por loja.
+
+        Returns:
+            Dicionário {(id, job): {"seconds", "orders", "mlbs", "days"}}
+        """
+        pass
+
+    @abstractmethod
+    def save_sync_run(
+        self, id: str, job: str, seconds: float, orders: int, mlbs: int, days: int
+    ) -> None:
+        """
+        Registra a duração de uma execução bem-sucedida de um job da loja.
+
+        Args:
+            id: Identificador da loja
+            job: "sales" ou "ads"
+            seconds: Duração da execução
+            orders: Pedidos da loja na janela sincronizada
+            mlbs: MLBs com métricas de ads da loja
+            days: Dias da janela sincronizada
+        """
+        pass
+
+    @abstractmethod
+    def get_deferred_sellers(self) -> List[str]:
+        """
+        Retorna as lojas adiadas pelo prazo na última execução que as selecionou.
+
+        Returns:
+            Lista de ids
+        """
+        pass
+
+    @abstractmethod
+    def update_deferred_sellers(
+        self, executed: Sequence[str], deferred: Sequence[str]
+    ) -> None:
+        """
+        Atualiza as lojas adiadas após uma execução com prazo.
+
+        Args:
+            executed: Lojas executadas (deixam de estar adiadas)
+            deferred: Lojas adiadas nesta execução
+        """
+        pass
+
     @abstractmethod
     def get_unique_mlbs_by_id(self, id: str) -> list:
         """
@@ -117,3 +450,20 @@ class ICredentialsRepository(ABC):
             Lista com os MLBs únicos
         """
         pass
+
+    @abstractmethod
+    def get_unique_mlbs_by_id_and_date(
+        self, id: str, start_date: str, end_date: str
+    ) -> list:
+        """
+        Retorna os MLBs únicos vendidos pela loja com date_created entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+
+        Returns:
+            Lista com os MLBs únicos
+        """
+        pass
@@ -0,0 +1,50 @@
+"""
+Interface para o transporte HTTP do cliente da API do Mercado Livre.
+
+Define o contrato usado pelo Client para enviar requisições, permitindo
+trocar a biblioteca HTTP (requests/HTTP 1.1 ou httpx/HTTP 2) sem alterar
+a lógica de tokens, retries e cache.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class IHttpTransport(ABC):
+    """Interface para o transporte HTTP."""
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        content: Optional[bytes] = None,
+    ) -> Any:
+        """
+        Envia a requisição e lê a resposta inteira.
+
+        Args:
+            method: Método HTTP
+            url: URL completa
+            headers: Headers da requisição
+            content: Corpo já serializado (opcional)
+        Returns:
+            Resposta com status_code, headers, content e text (já descomprimidos)
+        """
+        pass
+
+    @abstractmethod
+    def wire_bytes(self, response: Any) -> int:
+        """
+        Retorna os bytes do corpo recebidos pela rede, antes da descompressão.
+
+        Args:
+            response: Resposta retornada por request
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Fecha as conexões mantidas pelo transporte."""
+        pass
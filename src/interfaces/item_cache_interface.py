@@ -0,0 +1,47 @@
+"""
+Interface para cache de atributos de itens (MLBs).
+
+Define o contrato para guardar os atributos lidos de /items entre lojas e
+execuções.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable
+
+from src.models.mercado_livre import Item
+
+
+class IItemCache(ABC):
+    """Interface para cache de atributos de itens."""
+
+    @abstractmethod
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Item]:
+        """
+        Obtém os itens ainda válidos no cache.
+
+        Args:
+            ids: MLBs procurados
+        Returns:
+            Dicionário {mlb: item} apenas com os itens encontrados
+        """
+        pass
+
+    @abstractmethod
+    def set_many(self, items: Iterable[Item]) -> None:
+        """
+        Armazena os itens com o TTL configurado.
+
+        Args:
+            items: Itens lidos da API
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna contadores de uso do cache.
+
+        Returns:
+            Dicionário com hits, misses e stores
+        """
+        pass
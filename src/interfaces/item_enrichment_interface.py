@@ -0,0 +1,41 @@
+"""
+Interface para enriquecimento de vendas com atributos dos itens.
+
+Define o contrato para buscar atributos de MLBs em lote.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List
+
+from src.models.mercado_livre import Item
+from src.models.records import SaleRecord
+
+
+class IItemEnrichmentService(ABC):
+    """Interface para enriquecimento de vendas com atributos dos itens."""
+
+    @abstractmethod
+    def get_items(self, ids: Iterable[str], id: str) -> Dict[str, Item]:
+        """
+        Obtém os atributos dos itens, do cache ou da API.
+
+        Args:
+            ids: MLBs procurados
+            id: Identificador da loja usada na autenticação
+        Returns:
+            Dicionário {mlb: item} com os itens encontrados
+        """
+        pass
+
+    @abstractmethod
+    def enrich_sales(self, records: List[SaleRecord], id: str) -> Dict[str, Item]:
+        """
+        Preenche título, categoria e tipo de anúncio ausentes nas vendas.
+
+        Args:
+            records: Registros de venda (alterados no lugar)
+            id: Identificador da loja
+        Returns:
+            Itens dos MLBs presentes nas vendas
+        """
+        pass
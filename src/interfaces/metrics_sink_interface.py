@@ -0,0 +1,22 @@
+"""
+Interface para exportação de métricas.
+
+Define o contrato para destinos das métricas coletadas na execução.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+
+class IMetricsSink(ABC):
+    """Interface para exportação de métricas."""
+
+    @abstractmethod
+    def export(self, snapshot: Dict[str, List[Dict]]) -> None:
+        """
+        Exporta as métricas coletadas.
+
+        Args:
+            snapshot: Resultado de MetricsRegistry.snapshot()
+        """
+        pass
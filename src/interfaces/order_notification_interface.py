@@ -0,0 +1,49 @@
+"""
+Interface para o processamento de notificações de pedidos do Mercado Livre.
+
+Define o contrato para enfileirar notificações do tópico orders_v2 e
+atualizar sales_ml apenas com os pedidos notificados.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class IOrderNotificationService(ABC):
+    """Interface para o processamento de notificações de pedidos."""
+
+    @abstractmethod
+    def enqueue(self, notification: Dict[str, Any]) -> str:
+        """
+        Enfileira o pedido de uma notificação recebida no callback.
+
+        Args:
+            notification: Corpo JSON da notificação (resource, user_id, topic...)
+        Returns:
+            "queued", "duplicate" (pedido já na fila) ou "ignored"
+        """
+        pass
+
+    @abstractmethod
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o processamento de todos os pedidos enfileirados.
+
+        Args:
+            timeout: Segundos máximos de espera (None = sem limite)
+        Returns:
+            True se a fila foi esvaziada dentro do prazo
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna os contadores de notificações e pedidos processados.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Processa os pedidos pendentes e encerra a thread de processamento."""
+        pass
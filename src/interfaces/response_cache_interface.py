@@ -0,0 +1,80 @@
+"""
+Interface para cache de respostas HTTP.
+
+Define o contrato para armazenamento de respostas GET reaproveitáveis.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class IResponseCache(ABC):
+    """Interface para cache de respostas HTTP."""
+
+    @abstractmethod
+    def make_key(self, url: str, id: str) -> str:
+        """
+        Gera a chave de cache da requisição.
+
+        Args:
+            url: URL completa da requisição
+            id: Identificador da loja
+        Returns:
+            Chave única para a combinação URL + loja
+        """
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a entrada armazenada para a chave.
+
+        Args:
+            key: Chave de cache
+        Returns:
+            Dicionário com body (texto JSON), etag, last_modified, expires_at
+            e fresh ou None
+        """
+        pass
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        ttl: float = 0,
+    ) -> None:
+        """
+        Armazena a resposta para a chave.
+
+        Args:
+            key: Chave de cache
+            body: Corpo da resposta (texto JSON, decodificado na leitura)
+            etag: Cabeçalho ETag retornado pela API
+            last_modified: Cabeçalho Last-Modified retornado pela API
+            ttl: Tempo em segundos em que a entrada é servida sem revalidação
+        """
+        pass
+
+    @abstractmethod
+    def refresh(self, key: str, ttl: float = 0) -> None:
+        """
+        Renova a validade de uma entrada revalidada pela API (304).
+
+        Args:
+            key: Chave de cache
+            ttl: Novo tempo de validade em segundos
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            Dicionário com hits, stale, misses, revalidated, stores e evictions
+        """
+        pass
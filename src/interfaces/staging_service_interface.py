@@ -0,0 +1,62 @@
+"""
+Interface para a camada de staging dos dados coletados.
+
+Define o contrato para gravar e reler lotes brutos e normalizados.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+import pandas as pd
+
+
+class IStagingService(ABC):
+    """Interface para a camada de staging dos dados coletados."""
+
+    @abstractmethod
+    def write_raw(
+        self, dataset: str, id: str, run_id: str, payloads: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Grava as respostas brutas da API de uma execução.
+
+        Args:
+            dataset: Nome do conjunto de dados (sales, ads)
+            id: Identificador da loja
+            run_id: Identificador da execução
+            payloads: Respostas JSON retornadas pela API
+        """
+        pass
+
+    @abstractmethod
+    def write_frame(
+        self, dataset: str, id: str, df: pd.DataFrame, date_column: str
+    ) -> None:
+        """
+        Grava o lote normalizado particionado por loja e data.
+
+        Args:
+            dataset: Nome do conjunto de dados (sales, ads)
+            id: Identificador da loja
+            df: DataFrame normalizado
+            date_column: Coluna usada para particionar por data
+        """
+        pass
+
+    @abstractmethod
+    def load_frame(
+        self, dataset: str, id: str, start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        """
+        Lê os lotes normalizados de uma loja entre duas datas.
+
+        Args:
+            dataset: Nome do conjunto de dados (sales, ads)
+            id: Identificador da loja
+            start_date: Data inicial (YYYY-MM-DD)
+            end_date: Data final (YYYY-MM-DD)
+
+        Returns:
+            DataFrame com os registros armazenados no período
+        """
+        pass
@@ -54,12 +54,14 @@ class ITokenManager(ABC):
         pass
 
     @abstractmethod
-    def force_refreshing_token(self, id: str) -> str:
+    def force_refreshing_token(self, id: str, stale_token: Optional[str] = None) -> str:
         """
         Força a atualização do token de acesso.
 
         Args:
             id: Identificador da loja
+            stale_token: Token recusado pela API; se outra thread já o
+                substituiu, o token atual é retornado sem novo refresh
 
         Returns:
             Novo token de acesso
@@ -0,0 +1,130 @@
+"""
+Esquemas tipados das respostas da API do Mercado Livre.
+
+Contêm apenas os campos lidos pela integração; campos extras da resposta
+são ignorados na decodificação (ver src.utils.json_decoder).
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class Paging:
+    total: int = 0
+    offset: int = 0
+    limit: int = 0
+
+
+@dataclass(slots=True)
+class OrderItemInfo:
+    id: str = ""
+    title: Optional[str] = ""
+    category_id: Optional[str] = ""
+    seller_sku: Optional[str] = None
+
+
+@dataclass(slots=True)
+class OrderItem:
+    item: OrderItemInfo = field(default_factory=OrderItemInfo)
+    quantity: int = 0
+    unit_price: Optional[float] = 0.0
+    full_unit_price: Optional[float] = 0.0
+    sale_fee: Optional[float] = 0.0
+    listing_type_id: Optional[str] = ""
+
+
+@dataclass(slots=True)
+class Order:
+    id: int = 0
+    pack_id: Optional[int] = None
+    status: Optional[str] = None
+    date_created: Optional[str] = ""
+    paid_amount: Optional[float] = 0.0
+    order_items: List[OrderItem] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class OrderSearchResponse:
+    results: List[Order] = field(default_factory=list)
+    paging: Paging = field(default_factory=Paging)
+
+
+@dataclass(slots=True)
+class AdsDailyMetric:
+    date: str = ""
+    clicks: Optional[int] = None
+    prints: Optional[int] = None
+    ctr: Optional[float] = None
+    cost: Optional[float] = None
+    cpc: Optional[float] = None
+    acos: Optional[float] = None
+    organic_units_quantity: Optional[int] = None
+    organic_units_amount: Optional[float] = None
+    organic_items_quantity: Optional[int] = None
+    direct_items_quantity: Optional[int] = None
+    indirect_items_quantity: Optional[int] = None
+    advertising_items_quantity: Optional[int] = None
+    cvr: Optional[float] = None
+    roas: Optional[float] = None
+    sov: Optional[float] = None
+    direct_units_quantity: Optional[int] = None
+    indirect_units_quantity: Optional[int] = None
+    units_quantity: Optional[int] = None
+    direct_amount: Optional[float] = None
+    indirect_amount: Optional[float] = None
+    total_amount: Optional[float] = None
+
+
+@dataclass(slots=True)
+class AdsMetricsResponse:
+    results: List[AdsDailyMetric] = field(default_factory=list)
+    paging: Paging = field(default_factory=Paging)
+
+
+@dataclass(slots=True)
+class Item:
+    id: str = ""
+    title: Optional[str] = None
+    category_id: Optional[str] = None
+    listing_type_id: Optional[str] = None
+    status: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ItemMultigetEntry:
+    """Entrada de /items?ids=...: código por item e o corpo do item."""
+
+    code: int = 0
+    body: Optional[Item] = None
+
+
+@dataclass(slots=True)
+class Advertiser:
+    advertiser_id: int = 0
+    site_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class AdvertisersResponse:
+    advertisers: List[Advertiser] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class AdListingMetrics:
+    prints: Optional[int] = None
+    clicks: Optional[int] = None
+    cost: Optional[float] = None
+
+
+@dataclass(slots=True)
+class AdListing:
+    item_id: str = ""
+    status: Optional[str] = None
+    metrics: Optional[AdListingMetrics] = None
+
+
+@dataclass(slots=True)
+class AdsSearchResponse:
+    results: List[AdListing] = field(default_factory=list)
+    paging: Paging = field(default_factory=Paging)
@@ -0,0 +1,206 @@
+"""
+Registros compactos das linhas gravadas em sales_ml e ads_ml.
+
+Cada linha é uma dataclass com __slots__, sem o dicionário por instância.
+O dicionário do payload de insert é montado apenas no momento do envio,
+em lotes (ver to_payload), sem passar por um DataFrame.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from src.models.mercado_livre import AdsDailyMetric, Order, OrderItem
+
+R = TypeVar("R", "SaleRecord", "AdsRecord")
+
+
+def formatar_data(valor: Optional[str]) -> str:
+    """Retorna a data no formato yyyy-mm-dd, ou "" se o valor não for uma data."""
+    if not valor:
+        return ""
+    try:
+        return date.fromisoformat(valor[:10]).isoformat()
+    except ValueError:
+        return ""
+
+
+@dataclass(slots=True)
+class SaleRecord:
+    """Linha de sales_ml: um item de um pedido pago."""
+
+    numero_pedido: int
+    pack_id: int
+    title: str
+    category_id: str
+    mlb: str
+    seller_sku: str
+    quantity: int
+    unit_price: float
+    full_unit_price: float
+    sale_fee: float
+    listing_type_id: str
+    date_created: str
+    paid_amount: float
+    id: str
+
+    @classmethod
+    def from_order(cls, pedido: Order, order: OrderItem, id: str) -> "SaleRecord":
+        """Monta o registro a partir do pedido e do item, já com os valores padrão."""
+        return cls(
+            pedido.id or 0,
+            pedido.pack_id or 0,
+            order.item.title or "",
+            order.item.category_id or "",
+            order.item.id or "",
+            order.item.seller_sku or "",
+            order.quantity or 0,
+            order.unit_price or 0.0,
+            order.full_unit_price or 0.0,
+            order.sale_fee or 0.0,
+            order.listing_type_id or "",
+            formatar_data(pedido.date_created),
+            pedido.paid_amount or 0.0,
+            id,
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "Número_do_pedido_multiloja": self.numero_pedido,
+            "pack_id": self.pack_id,
+            "title": self.title,
+            "category_id": self.category_id,
+            "mlb": self.mlb,
+            "seller_sku": self.seller_sku,
+            "quantity": self.quantity,
+            "unit_price": self.unit_price,
+            "full_unit_price": self.full_unit_price,
+            "sale_fee": self.sale_fee,
+            "listing_type_id": self.listing_type_id,
+            "date_created": self.date_created,
+            "paid_amount": self.paid_amount,
+            "id": self.id,
+        }
+
+
+@dataclass(slots=True)
+class AdsRecord:
+    """Linha de ads_ml: métricas diárias de um MLB."""
+
+    date: str
+    mlb: str
+    id: str
+    clicks: Optional[int] = None
+    prints: Optional[int] = None
+    ctr: Optional[float] = None
+    cost: Optional[float] = None
+    cpc: Optional[float] = None
+    acos: Optional[float] = None
+    organic_units_quantity: Optional[int] = None
+    organic_units_amount: Optional[float] = None
+    organic_items_quantity: Optional[int] = None
+    direct_items_quantity: Optional[int] = None
+    indirect_items_quantity: Optional[int] = None
+    advertising_items_quantity: Optional[int] = None
+    cvr: Optional[float] = None
+    roas: Optional[float] = None
+    sov: Optional[float] = None
+    direct_units_quantity: Optional[int] = None
+    indirect_units_quantity: Optional[int] = None
+    units_quantity: Optional[int] = None
+    direct_amount: Optional[float] = None
+    indirect_amount: Optional[float] = None
+    total_amount: Optional[float] = None
+
+    @classmethod
+    def from_metric(cls, metrica: AdsDailyMetric, mlb: str, id: str) -> "AdsRecord":
+        """Monta o registro a partir da métrica diária retornada pela API."""
+        record = cls(formatar_data(metrica.date), mlb, id)
+        for nome in _METRICAS_ADS:
+            setattr(record, nome, getattr(metrica, nome))
+        return record
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {nome: getattr(self, nome) for nome in _COLUNAS_ADS}
+
+
+# Nomes das colunas nas tabelas, na ordem dos campos de cada registro
+_COLUNAS_VENDAS = (
+    "Número_do_pedido_multiloja",
+    "pack_id",
+    "title",
+    "category_id",
+    "mlb",
+    "seller_sku",
+    "quantity",
+    "unit_price",
+    "full_unit_price",
+    "sale_fee",
+    "listing_type_id",
+    "date_created",
+    "paid_amount",
+    "id",
+)
+_COLUNAS_ADS = tuple(f.name for f in fields(AdsRecord))
+_METRICAS_ADS = _COLUNAS_ADS[3:]
+
+
+def to_payload(records: Iterable[R]) -> List[Dict[str, Any]]:
+    """Serializa os registros no payload de insert do Supabase."""
+    return [record.to_payload() for record in records]
+
+
+def to_columns(records: Sequence[R]) -> Dict[str, List[Any]]:
+    """
+    Converte os registros em colunas, pronto para pd.DataFrame.
+
+    Usado apenas onde um DataFrame é de fato necessário (staging).
+    """
+    if not records:
+        return {}
+    nomes = _COLUNAS_VENDAS if isinstance(records[0], SaleRecord) else _COLUNAS_ADS
+    atributos = [f.name for f in fields(records[0])]
+    return {
+        nome: [getattr(r, atributo) for r in records]
+        for nome, atributo in zip(nomes, atributos)
+    }
+
+
+def from_frame(cls: Type[R], df: pd.DataFrame) -> List[R]:
+    """
+    Converte um DataFrame com as colunas da tabela em registros.
+
+    Valores ausentes viram None e datas viram texto yyyy-mm-dd.
+    """
+    nomes = _COLUNAS_VENDAS if cls is SaleRecord else _COLUNAS_ADS
+    colunas = []
+    for nome in nomes:
+        if nome not in df.columns:
+            colunas.append([None] * len(df))
+            continue
+        serie = df[nome]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            serie = serie.dt.strftime("%Y-%m-%d")
+        elif serie.dtype == "float32":
+            # Repr curto do float32 (0.1, e não 0.10000000149...)
+            serie = serie.map(lambda v: float(str(np.float32(v))), na_action="ignore")
+        colunas.append(
+            [None if pd.isna(v) else v.item() if hasattr(v, "item") else v for v in serie]
+        )
+    return [cls(*valores) for valores in zip(*colunas)]
+
+
+def from_rows(cls: Type[R], rows: Iterable[Dict[str, Any]]) -> List[R]:
+    """Converte linhas lidas da tabela (dicionários por coluna) em registros."""
+    nomes = _COLUNAS_VENDAS if cls is SaleRecord else _COLUNAS_ADS
+    registros = [cls(*(row.get(nome) for nome in nomes)) for row in rows]
+    for r in registros:
+        # Colunas date/timestamp voltam do PostgREST como texto ISO
+        if isinstance(r, SaleRecord):
+            r.date_created = formatar_data(r.date_created)
+        else:
+            r.date = formatar_data(r.date)
+    return registros
@@ -0,0 +1,107 @@
+"""
+Agregados diários por loja, dia e MLB, gravados junto das linhas brutas.
+
+Os agregados são calculados em memória a partir dos registros da execução
+(ver src.models.records), de modo que apenas os dias tocados são
+regravados em sales_ml_diario e ads_ml_diario.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from src.models.records import AdsRecord, SaleRecord
+
+
+@dataclass(slots=True)
+class SalesDailyRollup:
+    """Linha de sales_ml_diario."""
+
+    id: str
+    date: str
+    mlb: str
+    orders: int = 0
+    units: int = 0
+    revenue: float = 0.0
+    sale_fee: float = 0.0
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "date": self.date,
+            "mlb": self.mlb,
+            "orders": self.orders,
+            "units": self.units,
+            "revenue": round(self.revenue, 2),
+            "sale_fee": round(self.sale_fee, 2),
+        }
+
+
+@dataclass(slots=True)
+class AdsDailyRollup:
+    """Linha de ads_ml_diario; ACOS e ROAS são derivados de custo e receita."""
+
+    id: str
+    date: str
+    mlb: str
+    prints: int = 0
+    clicks: int = 0
+    cost: float = 0.0
+    units: int = 0
+    revenue: float = 0.0
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "date": self.date,
+            "mlb": self.mlb,
+            "prints": self.prints,
+            "clicks": self.clicks,
+            "cost": round(self.cost, 2),
+            "units": self.units,
+            "revenue": round(self.revenue, 2),
+            "acos": round(self.cost / self.revenue * 100, 2) if self.revenue else None,
+            "roas": round(self.revenue / self.cost, 2) if self.cost else None,
+        }
+
+
+def agregar_vendas(records: Iterable[SaleRecord]) -> List[SalesDailyRollup]:
+    """Soma unidades, receita e tarifa (preço e tarifa x quantidade) por dia e MLB."""
+    rollups: Dict[Tuple[str, str], SalesDailyRollup] = {}
+    pedidos: Dict[Tuple[str, str], Set[int]] = {}
+
+    for r in records:
+        if not r.date_created:
+            continue
+        key = (r.date_created, r.mlb)
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = SalesDailyRollup(r.id, r.date_created, r.mlb)
+            pedidos[key] = set()
+        pedidos[key].add(r.numero_pedido)
+        rollup.units += r.quantity
+        rollup.revenue += r.unit_price * r.quantity
+        rollup.sale_fee += r.sale_fee * r.quantity
+
+    for key, rollup in rollups.items():
+        rollup.orders = len(pedidos[key])
+    return list(rollups.values())
+
+
+def agregar_ads(records: Iterable[AdsRecord]) -> List[AdsDailyRollup]:
+    """Soma impressões, cliques, custo, unidades e receita por dia e MLB."""
+    rollups: Dict[Tuple[str, str], AdsDailyRollup] = {}
+
+    for r in records:
+        if not r.date:
+            continue
+        key = (r.date, r.mlb)
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = AdsDailyRollup(r.id, r.date, r.mlb)
+        rollup.prints += r.prints or 0
+        rollup.clicks += r.clicks or 0
+        rollup.cost += r.cost or 0.0
+        rollup.units += r.units_quantity or 0
+        rollup.revenue += r.total_amount or 0.0
+
+    return list(rollups.values())
@@ -0,0 +1,95 @@
+"""
+Esquemas de dtype dos DataFrames de sales_ml e ads_ml.
+
+Cada coluna declara o dtype e o valor usado para preencher ausentes
+(None mantém o nulo, com dtypes que o suportam). Colunas repetitivas viram
+categóricas, inteiros usam tipos nulos do pandas e datas viram datetime64.
+Valores monetários permanecem em float64; apenas as razões de ads (ctr,
+cpc, acos...) usam float32.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.models.records import R, to_columns
+
+# coluna: (dtype, valor de preenchimento)
+Schema = Dict[str, Tuple[str, Optional[Any]]]
+
+SCHEMA_VENDAS: Schema = {
+    "Número_do_pedido_multiloja": ("Int64", 0),
+    "pack_id": ("Int64", 0),
+    "title": ("category", ""),
+    "category_id": ("category", ""),
+    "mlb": ("category", ""),
+    "seller_sku": ("category", ""),
+    "quantity": ("Int32", 0),
+    "unit_price": ("float64", 0.0),
+    "full_unit_price": ("float64", 0.0),
+    "sale_fee": ("float64", 0.0),
+    "listing_type_id": ("category", ""),
+    "date_created": ("datetime64[ns]", None),
+    "paid_amount": ("float64", 0.0),
+    "id": ("category", ""),
+}
+
+SCHEMA_ADS: Schema = {
+    "date": ("datetime64[ns]", None),
+    "mlb": ("category", ""),
+    "id": ("category", ""),
+    "clicks": ("Int64", None),
+    "prints": ("Int64", None),
+    "ctr": ("float32", None),
+    "cost": ("float64", None),
+    "cpc": ("float32", None),
+    "acos": ("float32", None),
+    "organic_units_quantity": ("Int32", None),
+    "organic_units_amount": ("float64", None),
+    "organic_items_quantity": ("Int32", None),
+    "direct_items_quantity": ("Int32", None),
+    "indirect_items_quantity": ("Int32", None),
+    "advertising_items_quantity": ("Int32", None),
+    "cvr": ("float32", None),
+    "roas": ("float32", None),
+    "sov": ("float32", None),
+    "direct_units_quantity": ("Int32", None),
+    "indirect_units_quantity": ("Int32", None),
+    "units_quantity": ("Int32", None),
+    "direct_amount": ("float64", None),
+    "indirect_amount": ("float64", None),
+    "total_amount": ("float64", None),
+}
+
+
+def aplicar_schema(df: pd.DataFrame, schema: Schema) -> pd.DataFrame:
+    """
+    Preenche ausentes e converte as colunas para os dtypes do esquema.
+
+    Colunas ausentes no DataFrame são criadas com o valor de preenchimento;
+    colunas fora do esquema são mantidas como estão.
+    """
+    df = df.copy()
+    for coluna, (dtype, preenchimento) in schema.items():
+        if coluna not in df.columns:
+            df[coluna] = preenchimento
+        serie = df[coluna]
+
+        if dtype.startswith("datetime"):
+            df[coluna] = pd.to_datetime(
+                serie.replace("", None), errors="coerce"
+            ).astype(dtype)
+            continue
+
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object)
+        if preenchimento is not None:
+            serie = serie.fillna(preenchimento)
+        df[coluna] = serie.astype(dtype)
+
+    return df
+
+
+def to_frame(records: Sequence[R], schema: Schema) -> pd.DataFrame:
+    """Monta o DataFrame dos registros já com os dtypes do esquema."""
+    return aplicar_schema(pd.DataFrame(to_columns(records)), schema)
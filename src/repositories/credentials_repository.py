@@ -4,8 +4,9 @@ Repositório de credenciais implementando ICredentialsRepository.
 Gerencia a persistência de credenciais
 """
 
-from datetime import datetime
-from typing import Any, Dict
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import pandas as pd
 import os
@@ -13,11 +14,22 @@ from src.interfaces.encryption_service_interface import IEncryptionService
 from src.interfaces.credentials_repository_interface import (
     ICredentialsRepository,
 )
+from src.models.mercado_livre import Item
+from src.models.records import AdsRecord, SaleRecord, from_frame, from_rows, to_payload
+from src.models.rollups import AdsDailyRollup, SalesDailyRollup
+from src.utils.config import settings
 from src.utils.log import log
+from src.utils.metrics import metrics
 
-import os
 from supabase import Client
 
+# Limite de linhas por página do PostgREST e de itens por filtro "in"
+PAGE_SIZE = 1000
+IN_FILTER_BATCH = 100
+
+# expires_at de uma trava livre
+_EPOCH = "1970-01-01T00:00:00+00:00"
+
 
 class CredentialsRepository(ICredentialsRepository):
     """Repositório de credenciais"""
@@ -49,7 +61,7 @@ class CredentialsRepository(ICredentialsRepository):
             # Consulta a tabela do Supabase filtrando pelo id
             response = (
                 self._supabase.table("credenciais_ml")
-                .select("access_token, refresh_token, validade, client_id")
+                .select("access_token, refresh_token, validade, client_id, token_version")
                 .eq("id", id)
                 .execute()
             )
@@ -76,6 +88,7 @@ class CredentialsRepository(ICredentialsRepository):
             cred["refresh_token"] = self._encryption_service.decrypt(
                 cred["refresh_token"]
             )
+            cred["token_version"] = int(cred.get("token_version") or 0)
 
         except Exception as e:
             log.error(f"Erro ao buscar credenciais para {id}: {str(e)}")
@@ -119,9 +132,11 @@ class CredentialsRepository(ICredentialsRepository):
             check_data = check.data  # type: ignore
 
             if check_data and len(check_data) > 0:
+                started = time.perf_counter()
                 self._supabase.table(table_name).update(token_data).eq(
                     "id", id
                 ).execute()
+                self._record_call(table_name, "update", started, 1)
 
                 log.info(f"Tokens atualizados para a loja {id}")
             else:
@@ -131,6 +146,62 @@ class CredentialsRepository(ICredentialsRepository):
             log.error(f"Erro ao salvar tokens para {id}: {str(e)}")
             raise
 
+    def compare_and_set_token(
+        self,
+        id: str,
+        expected_version: int,
+        new_version: int,
+        token: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Atualiza token_version (e, opcionalmente, os tokens) apenas se a versão
+        gravada ainda for expected_version.
+
+        Args:
+            id: Identificador da loja
+            expected_version: Versão lida anteriormente
+            new_version: Versão a gravar
+            token: Dicionário contendo access_token, refresh_token e validade (opcional)
+
+        Returns:
+            True se a linha foi atualizada, False se outra versão já estava gravada
+        """
+        table_name = "credenciais_ml"
+
+        try:
+            data: Dict[str, Any] = {"token_version": new_version}
+            if token is not None:
+                data.update(
+                    {
+                        "access_token": self._encryption_service.encrypt(
+                            token["access_token"]
+                        ),
+                        "refresh_token": self._encryption_service.encrypt(
+                            token["refresh_token"]
+                        ),
+                        "validade": token.get("validade", datetime.now().isoformat()),
+                    }
+                )
+
+            started = time.perf_counter()
+            response = (
+                self._supabase.table(table_name)
+                .update(data)
+                .eq("id", id)
+                .eq("token_version", expected_version)
+                .execute()
+            )
+            updated = bool(getattr(response, "data", None))
+            self._record_call(table_name, "update", started, int(updated))
+            metrics.inc(
+                "token_version_cas_total", result="ok" if updated else "conflict"
+            )
+            return updated
+
+        except Exception as e:
+            log.error(f"Erro ao atualizar token_version para {id}: {str(e)}")
+            raise
+
     def get_refresh_payload(self, id: str) -> Dict[str, Any]:
         """
         Retorna o payload para refresh_token, buscando client_id e client_secret do Supabase conforme o id.
@@ -208,6 +279,7 @@ class CredentialsRepository(ICredentialsRepository):
             end_date: Data final (string, formato compatível com Supabase)
         """
         try:
+            started = time.perf_counter()
             response = (
                 self._supabase.table("sales_ml")
                 .delete()
@@ -216,6 +288,7 @@ class CredentialsRepository(ICredentialsRepository):
                 .lte("date_created", end_date)
                 .execute()
             )
+            self._record_call("sales_ml", "delete", started, len(response.data or []))
             if hasattr(response, "data") and response.data:  # type: ignore
                 log.info(
                     f"Registros excluídos para id={id} entre {start_date} e {end_date}"
@@ -235,21 +308,16 @@ class CredentialsRepository(ICredentialsRepository):
         Args:
             df: DataFrame contendo os registros a serem inseridos
         """
-        try:
-            records = [
-                {str(k): v for k, v in record.items()}
-                for record in df.to_dict(orient="records")
-            ]
-            response = self._supabase.table("sales_ml").insert(records).execute()
+        self.insert_sales_records(from_frame(SaleRecord, df))
 
-            if hasattr(response, "data") and response.data:  # type: ignore
-                log.info(f"{len(response.data)} registros inseridos na tabela sales_ml")  # type: ignore
-            else:
-                log.warning("Nenhum registro foi inserido na tabela sales_ml")
+    def insert_sales_records(self, records: Sequence[SaleRecord]) -> None:
+        """
+        Insere novos registros na tabela sales_ml.
 
-        except Exception as e:
-            log.error(f"Erro ao inserir registros na tabela sales_ml: {str(e)}")
-            raise
+        Args:
+            records: Registros de venda a serem inseridos
+        """
+        self._insert_records("sales_ml", records)
 
     def delete_ads_by_id_and_date(
         self, id: str, start_date: str, end_date: str
@@ -262,6 +330,7 @@ class CredentialsRepository(ICredentialsRepository):
             end_date: Data final (string, formato compatível com Supabase)
         """
         try:
+            started = time.perf_counter()
             response = (
                 self._supabase.table("ads_ml")
                 .delete()
@@ -270,6 +339,7 @@ class CredentialsRepository(ICredentialsRepository):
                 .lte("date", end_date)
                 .execute()
             )
+            self._record_call("ads_ml", "delete", started, len(response.data or []))
             if hasattr(response, "data") and response.data:  # type: ignore
                 log.info(f"Registros excluídos para entre {start_date} e {end_date}")
             else:
@@ -280,6 +350,106 @@ class CredentialsRepository(ICredentialsRepository):
             log.error(f"Erro ao excluir registros para: {str(e)}")
             raise
 
+    def delete_ads_by_mlbs_and_date(
+        self, id: str, mlbs: List[str], start_date: str, end_date: str
+    ) -> None:
+        """
+        Exclui registros da tabela ads_ml da loja para os MLBs informados e date entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            mlbs: Lista de MLBs
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+        """
+        try:
+            for i in range(0, len(mlbs), IN_FILTER_BATCH):
+                started = time.perf_counter()
+                response = (
+                    self._supabase.table("ads_ml")
+                    .delete()
+                    .eq("id", id)
+                    .in_("mlb", mlbs[i : i + IN_FILTER_BATCH])
+                    .gte("date", start_date)
+                    .lte("date", end_date)
+                    .execute()
+                )
+                self._record_call("ads_ml", "delete", started, len(response.data or []))
+
+            log.info(
+                f"Registros de ads excluídos para {len(mlbs)} MLBs entre {start_date} e {end_date}"
+            )
+        except Exception as e:
+            log.error(f"Erro ao excluir registros de ads por MLB para id={id}: {str(e)}")
+            raise
+
+    def get_ads_finalized_ranges(self, id: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Retorna, por MLB, o intervalo de dias de ads_ml já finalizado e armazenado.
+
+        Args:
+            id: Identificador da loja
+
+        Returns:
+            Dicionário {mlb: (date_from, date_to)}
+        """
+        try:
+            ranges: Dict[str, Tuple[str, str]] = {}
+            start = 0
+            while True:
+                response = (
+                    self._supabase.table("ads_ml_finalizado")
+                    .select("mlb, date_from, date_to")
+                    .eq("id", id)
+                    .range(start, start + PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = response.data if hasattr(response, "data") else []  # type: ignore
+                for row in rows:
+                    ranges[row["mlb"]] = (
+                        str(row["date_from"])[:10],
+                        str(row["date_to"])[:10],
+                    )
+                if len(rows) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+
+            log.info(f"{len(ranges)} MLBs com dias de ads finalizados para o id: {id}")
+            return ranges
+
+        except Exception as e:
+            log.error(f"Erro ao buscar dias de ads finalizados para {id}: {str(e)}")
+            raise
+
+    def save_ads_finalized_ranges(
+        self, id: str, ranges: Dict[str, Tuple[str, str]]
+    ) -> None:
+        """
+        Registra os intervalos de dias de ads_ml finalizados por MLB.
+
+        Args:
+            id: Identificador da loja
+            ranges: Dicionário {mlb: (date_from, date_to)}
+        """
+        if not ranges:
+            return
+
+        try:
+            records = [
+                {"id": id, "mlb": mlb, "date_from": date_from, "date_to": date_to}
+                for mlb, (date_from, date_to) in ranges.items()
+            ]
+            started = time.perf_counter()
+            self._supabase.table("ads_ml_finalizado").upsert(
+                records, on_conflict="id,mlb"
+            ).execute()
+            self._record_call("ads_ml_finalizado", "upsert", started, len(records))
+
+            log.info(f"Dias de ads finalizados registrados para {len(records)} MLBs")
+        except Exception as e:
+            log.error(f"Erro ao registrar dias de ads finalizados para {id}: {str(e)}")
+            raise
+
     def insert_ads_from_dataframe(self, df: pd.DataFrame) -> None:
         """
         Insere novos registros na tabela ads_ml a partir de um DataFrame do pandas.
@@ -287,20 +457,563 @@ class CredentialsRepository(ICredentialsRepository):
         Args:
             df: DataFrame contendo os registros a serem inseridos
         """
+        self.insert_ads_records(from_frame(AdsRecord, df))
+
+    def insert_ads_records(self, records: Sequence[AdsRecord]) -> None:
+        """
+        Insere novos registros na tabela ads_ml.
+
+        Args:
+            records: Registros de métricas de ads a serem inseridos
+        """
+        self._insert_records("ads_ml", records)
+
+    def get_sales_day_counts(
+        self, id: str, start_date: str, end_date: str
+    ) -> Dict[str, int]:
+        """
+        Retorna a quantidade de pedidos gravada em sales_ml por dia.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (YYYY-MM-DD)
+            end_date: Data final (YYYY-MM-DD)
+
+        Returns:
+            Dicionário {dia: pedidos} apenas dos dias com contagem registrada
+        """
+        try:
+            started = time.perf_counter()
+            response = (
+                self._supabase.table("sales_ml_contagem")
+                .select("date, orders")
+                .eq("id", id)
+                .gte("date", start_date)
+                .lte("date", end_date)
+                .execute()
+            )
+            rows = response.data if hasattr(response, "data") else []  # type: ignore
+            self._record_call("sales_ml_contagem", "select", started, len(rows))
+            return {str(row["date"])[:10]: int(row["orders"]) for row in rows}
+
+        except Exception as e:
+            log.error(f"Erro ao buscar contagens de vendas para {id}: {str(e)}")
+            raise
+
+    def upsert_sales_day_counts(self, id: str, counts: Dict[str, int]) -> None:
+        """
+        Registra a quantidade de pedidos gravada em sales_ml por dia.
+
+        Args:
+            id: Identificador da loja
+            counts: Dicionário {dia: pedidos}
+        """
+        if not counts:
+            return
+
         try:
             records = [
-                {str(k): v for k, v in record.items()}
-                for record in df.to_dict(orient="records")
+                {"id": id, "date": dia, "orders": pedidos}
+                for dia, pedidos in sorted(counts.items())
             ]
-            response = self._supabase.table("ads_ml").insert(records).execute()
+            started = time.perf_counter()
+            self._supabase.table("sales_ml_contagem").upsert(
+                records, on_conflict="id,date"
+            ).execute()
+            self._record_call("sales_ml_contagem", "upsert", started, len(records))
+        except Exception as e:
+            log.error(f"Erro ao registrar contagens de vendas para {id}: {str(e)}")
+            raise
 
-            if hasattr(response, "data") and response.data:  # type: ignore
-                log.info(f"{len(response.data)} registros inseridos na tabela ads_ml")  # type: ignore
-            else:
-                log.warning("Nenhum registro foi inserido na tabela ads_ml")
+    def delete_sales_day_counts(self, id: str, start_date: str, end_date: str) -> None:
+        """
+        Exclui as contagens de pedidos da loja entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (YYYY-MM-DD)
+            end_date: Data final (YYYY-MM-DD)
+        """
+        self._delete_by_id_and_date("sales_ml_contagem", "date", id, start_date, end_date)
+
+    def replace_sales_orders(
+        self, id: str, order_ids: Sequence[int], records: Sequence[SaleRecord]
+    ) -> Set[str]:
+        """
+        Substitui em sales_ml as linhas dos pedidos informados.
+
+        sales_ml não tem chave única por linha; o "upsert" de um pedido é a
+        exclusão das linhas atuais seguida da inserção das novas.
+
+        Args:
+            id: Identificador da loja
+            order_ids: Pedidos cujas linhas atuais são excluídas
+            records: Novas linhas (apenas dos pedidos ainda pagos)
 
+        Returns:
+            Dias (date_created) das linhas excluídas ou inseridas
+        """
+        if not order_ids:
+            return set()
+
+        dias = {r.date_created for r in records if r.date_created}
+        try:
+            for i in range(0, len(order_ids), IN_FILTER_BATCH):
+                chunk = list(order_ids[i : i + IN_FILTER_BATCH])
+                started = time.perf_counter()
+                response = (
+                    self._supabase.table("sales_ml")
+                    .delete()
+                    .eq("id", id)
+                    .in_("Número_do_pedido_multiloja", chunk)
+                    .execute()
+                )
+                rows = response.data or []
+                self._record_call("sales_ml", "delete", started, len(rows))
+                dias.update(
+                    str(row["date_created"])[:10] for row in rows if row.get("date_created")
+                )
         except Exception as e:
-            log.error(f"Erro ao inserir registros na tabela ads_ml: {str(e)}")
+            log.error(f"Erro ao excluir pedidos de {id} em sales_ml: {str(e)}")
+            raise
+
+        if records:
+            self._insert_records("sales_ml", records)
+        return dias
+
+    def get_sales_records(self, id: str, days: Sequence[str]) -> List[SaleRecord]:
+        """
+        Retorna as linhas de sales_ml da loja nos dias informados.
+
+        Args:
+            id: Identificador da loja
+            days: Dias (YYYY-MM-DD)
+
+        Returns:
+            Registros de venda
+        """
+        rows: List[Dict[str, Any]] = []
+        try:
+            days = sorted(days)
+            for i in range(0, len(days), IN_FILTER_BATCH):
+                chunk = days[i : i + IN_FILTER_BATCH]
+                start = 0
+                while True:
+                    started = time.perf_counter()
+                    response = (
+                        self._supabase.table("sales_ml")
+                        .select("*")
+                        .eq("id", id)
+                        .in_("date_created", chunk)
+                        .range(start, start + PAGE_SIZE - 1)
+                        .execute()
+                    )
+                    page = response.data if hasattr(response, "data") else []  # type: ignore
+                    self._record_call("sales_ml", "select", started, len(page))
+                    rows.extend(page)
+                    if len(page) < PAGE_SIZE:
+                        break
+                    start += PAGE_SIZE
+            return from_rows(SaleRecord, rows)
+
+        except Exception as e:
+            log.error(f"Erro ao buscar vendas de {id}: {str(e)}")
+            raise
+
+    def acquire_sales_lock(self, id: str, owner: str, ttl: float) -> bool:
+        """
+        Tenta obter a trava de gravação de sales_ml da loja (sales_ml_travas).
+
+        A posse é um update condicionado a expires_at já vencido
+        (compare-and-swap); a linha da loja é criada na primeira tentativa.
+
+        Args:
+            id: Identificador da loja
+            owner: Identificador de quem pede a trava
+            ttl: Segundos de validade da posse
+
+        Returns:
+            True se a trava foi obtida
+        """
+        table_name = "sales_ml_travas"
+
+        try:
+            for tentativa in range(2):
+                agora = datetime.now(timezone.utc)
+                data = {
+                    "owner": owner,
+                    "expires_at": (agora + timedelta(seconds=ttl)).isoformat(
+                        timespec="microseconds"
+                    ),
+                }
+                started = time.perf_counter()
+                response = (
+                    self._supabase.table(table_name)
+                    .update(data)
+                    .eq("id", id)
+                    .lt("expires_at", agora.isoformat(timespec="microseconds"))
+                    .execute()
+                )
+                acquired = bool(getattr(response, "data", None))
+                self._record_call(table_name, "update", started, int(acquired))
+                if acquired or tentativa:
+                    break
+
+                # Sem posse: cria a linha da loja, se ainda não existir, e tenta de novo
+                record = {"id": id, "owner": "", "expires_at": _EPOCH}
+                started = time.perf_counter()
+                self._supabase.table(table_name).upsert(
+                    record, on_conflict="id", ignore_duplicates=True
+                ).execute()
+                self._record_call(table_name, "upsert", started, 1)
+
+            metrics.inc("sales_lock_total", result="ok" if acquired else "busy")
+            return acquired
+
+        except Exception as e:
+            log.error(f"Erro ao obter a trava de vendas de {id}: {str(e)}")
+            raise
+
+    def release_sales_lock(self, id: str, owner: str) -> None:
+        """
+        Libera a trava de gravação de sales_ml da loja, se ainda for de owner.
+
+        Args:
+            id: Identificador da loja
+            owner: Identificador usado em acquire_sales_lock
+        """
+        table_name = "sales_ml_travas"
+
+        try:
+            data = {"owner": "", "expires_at": _EPOCH}
+            started = time.perf_counter()
+            response = (
+                self._supabase.table(table_name)
+                .update(data)
+                .eq("id", id)
+                .eq("owner", owner)
+                .execute()
+            )
+            self._record_call(table_name, "update", started, len(response.data or []))
+        except Exception as e:
+            log.error(f"Erro ao liberar a trava de vendas de {id}: {str(e)}")
+            raise
+
+    def get_pending_orders(self) -> Dict[Tuple[str, int], int]:
+        """
+        Retorna os pedidos notificados cuja busca falhou (ml_notificacoes_pendentes).
+
+        Returns:
+            Dicionário {(loja, pedido): tentativas}
+        """
+        pendentes: Dict[Tuple[str, int], int] = {}
+        try:
+            start = 0
+            while True:
+                started = time.perf_counter()
+                response = (
+                    self._supabase.table("ml_notificacoes_pendentes")
+                    .select("id, order_id, attempts")
+                    .range(start, start + PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = response.data if hasattr(response, "data") else []  # type: ignore
+                self._record_call("ml_notificacoes_pendentes", "select", started, len(rows))
+                pendentes.update(
+                    ((str(row["id"]), int(row["order_id"])), int(row.get("attempts") or 1))
+                    for row in rows
+                )
+                if len(rows) < PAGE_SIZE:
+                    return pendentes
+                start += PAGE_SIZE
+
+        except Exception as e:
+            log.error(f"Erro ao buscar pedidos pendentes: {str(e)}")
+            raise
+
+    def save_pending_orders(self, id: str, attempts: Dict[int, int]) -> None:
+        """
+        Registra pedidos notificados cuja busca falhou.
+
+        Args:
+            id: Identificador da loja
+            attempts: Dicionário {pedido: tentativas feitas}
+        """
+        if not attempts:
+            return
+
+        try:
+            failed_at = datetime.now(timezone.utc).isoformat()
+            records = [
+                {"id": id, "order_id": pedido, "attempts": tentativas, "failed_at": failed_at}
+                for pedido, tentativas in sorted(attempts.items())
+            ]
+            started = time.perf_counter()
+            self._supabase.table("ml_notificacoes_pendentes").upsert(
+                records, on_conflict="id,order_id"
+            ).execute()
+            self._record_call(
+                "ml_notificacoes_pendentes", "upsert", started, len(records)
+            )
+        except Exception as e:
+            log.error(f"Erro ao registrar pedidos pendentes de {id}: {str(e)}")
+            raise
+
+    def delete_pending_orders(self, id: str, order_ids: Sequence[int]) -> None:
+        """
+        Remove pedidos de ml_notificacoes_pendentes.
+
+        Args:
+            id: Identificador da loja
+            order_ids: Pedidos buscados com sucesso ou descartados
+        """
+        try:
+            order_ids = list(order_ids)
+            for i in range(0, len(order_ids), IN_FILTER_BATCH):
+                started = time.perf_counter()
+                response = (
+                    self._supabase.table("ml_notificacoes_pendentes")
+                    .delete()
+                    .eq("id", id)
+                    .in_("order_id", order_ids[i : i + IN_FILTER_BATCH])
+                    .execute()
+                )
+                self._record_call(
+                    "ml_notificacoes_pendentes", "delete", started, len(response.data or [])
+                )
+        except Exception as e:
+            log.error(f"Erro ao remover pedidos pendentes de {id}: {str(e)}")
+            raise
+
+    def upsert_items(self, id: str, items: Sequence[Item]) -> None:
+        """
+        Grava ou atualiza os atributos dos MLBs da loja na tabela items_ml.
+
+        Args:
+            id: Identificador da loja
+            items: Itens lidos de /items
+        """
+        if not items:
+            return
+
+        try:
+            updated_at = datetime.now(timezone.utc).isoformat()
+            batch = settings.supabase_insert_batch
+            for i in range(0, len(items), batch):
+                records = [
+                    {
+                        "id": id,
+                        "mlb": item.id,
+                        "title": item.title,
+                        "category_id": item.category_id,
+                        "listing_type_id": item.listing_type_id,
+                        "status": item.status,
+                        "updated_at": updated_at,
+                    }
+                    for item in items[i : i + batch]
+                ]
+                started = time.perf_counter()
+                self._supabase.table("items_ml").upsert(
+                    records, on_conflict="id,mlb"
+                ).execute()
+                self._record_call("items_ml", "upsert", started, len(records))
+
+            log.info(f"{len(items)} itens registrados na tabela items_ml para {id}")
+        except Exception as e:
+            log.error(f"Erro ao registrar itens para {id}: {str(e)}")
+            raise
+
+    def delete_sales_rollups_by_id_and_date(
+        self, id: str, start_date: str, end_date: str
+    ) -> None:
+        """
+        Exclui os agregados de sales_ml_diario da loja entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+        """
+        self._delete_by_id_and_date("sales_ml_diario", "date", id, start_date, end_date)
+
+    def upsert_sales_rollups(self, rollups: Sequence[SalesDailyRollup]) -> None:
+        """
+        Grava os agregados diários de vendas em sales_ml_diario.
+
+        Args:
+            rollups: Agregados por loja, dia e MLB
+        """
+        self._insert_records("sales_ml_diario", rollups, on_conflict="id,date,mlb")
+
+    def delete_ads_rollups_by_id_and_date(
+        self, id: str, start_date: str, end_date: str
+    ) -> None:
+        """
+        Exclui os agregados de ads_ml_diario da loja entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+        """
+        self._delete_by_id_and_date("ads_ml_diario", "date", id, start_date, end_date)
+
+    def upsert_ads_rollups(self, rollups: Sequence[AdsDailyRollup]) -> None:
+        """
+        Grava os agregados diários de ads em ads_ml_diario.
+
+        Args:
+            rollups: Agregados por loja, dia e MLB
+        """
+        self._insert_records("ads_ml_diario", rollups, on_conflict="id,date,mlb")
+
+    def get_seller_ids(self) -> List[str]:
+        """
+        Retorna os ids de todas as lojas com credenciais cadastradas.
+
+        Returns:
+            Lista de ids da tabela credenciais_ml
+        """
+        try:
+            ids: List[str] = []
+            start = 0
+            while True:
+                response = (
+                    self._supabase.table("credenciais_ml")
+                    .select("id")
+                    .range(start, start + PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = response.data if hasattr(response, "data") else []  # type: ignore
+                ids.extend(str(row["id"]) for row in rows if row.get("id"))
+                if len(rows) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+            return ids
+
+        except Exception as e:
+            log.error(f"Erro ao listar lojas com credenciais: {str(e)}")
+            raise
+
+    def get_sync_history(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """
+        Retorna a última execução bem-sucedida de cada job por loja.
+
+        Returns:
+            Dicionário {(id, job): {"seconds", "orders", "mlbs", "days"}}
+        """
+        try:
+            history: Dict[Tuple[str, str], Dict[str, float]] = {}
+            start = 0
+            while True:
+                response = (
+                    self._supabase.table("sync_ml_historico")
+                    .select("id, job, seconds, orders, mlbs, days")
+                    .range(start, start + PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = response.data if hasattr(response, "data") else []  # type: ignore
+                for row in rows:
+                    history[(str(row["id"]), row["job"])] = {
+                        "seconds": float(row["seconds"]),
+                        "orders": float(row.get("orders") or 0),
+                        "mlbs": float(row.get("mlbs") or 0),
+                        "days": float(row.get("days") or 0),
+                    }
+                if len(rows) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+            return history
+
+        except Exception as e:
+            log.error(f"Erro ao buscar o histórico de execuções: {str(e)}")
+            raise
+
+    def save_sync_run(
+        self, id: str, job: str, seconds: float, orders: int, mlbs: int, days: int
+    ) -> None:
+        """
+        Registra a duração de uma execução bem-sucedida de um job da loja.
+
+        Args:
+            id: Identificador da loja
+            job: "sales" ou "ads"
+            seconds: Duração da execução
+            orders: Pedidos da loja na janela sincronizada
+            mlbs: MLBs com métricas de ads da loja
+            days: Dias da janela sincronizada
+        """
+        try:
+            record = {
+                "id": id,
+                "job": job,
+                "seconds": round(seconds, 3),
+                "orders": orders,
+                "mlbs": mlbs,
+                "days": days,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            started = time.perf_counter()
+            self._supabase.table("sync_ml_historico").upsert(
+                record, on_conflict="id,job"
+            ).execute()
+            self._record_call("sync_ml_historico", "upsert", started, 1)
+        except Exception as e:
+            log.error(f"Erro ao registrar a execução de {job} para {id}: {str(e)}")
+            raise
+
+    def get_deferred_sellers(self) -> List[str]:
+        """
+        Retorna as lojas adiadas pelo prazo na última execução que as selecionou.
+
+        Returns:
+            Lista de ids
+        """
+        try:
+            started = time.perf_counter()
+            response = self._supabase.table("sync_ml_adiadas").select("id").execute()
+            rows = response.data if hasattr(response, "data") else []  # type: ignore
+            self._record_call("sync_ml_adiadas", "select", started, len(rows))
+            return [str(row["id"]) for row in rows]
+
+        except Exception as e:
+            log.error(f"Erro ao buscar lojas adiadas: {str(e)}")
+            raise
+
+    def update_deferred_sellers(
+        self, executed: Sequence[str], deferred: Sequence[str]
+    ) -> None:
+        """
+        Atualiza as lojas adiadas após uma execução com prazo.
+
+        Args:
+            executed: Lojas executadas (deixam de estar adiadas)
+            deferred: Lojas adiadas nesta execução
+        """
+        try:
+            executed = list(executed)
+            for i in range(0, len(executed), IN_FILTER_BATCH):
+                started = time.perf_counter()
+                response = (
+                    self._supabase.table("sync_ml_adiadas")
+                    .delete()
+                    .in_("id", executed[i : i + IN_FILTER_BATCH])
+                    .execute()
+                )
+                self._record_call(
+                    "sync_ml_adiadas", "delete", started, len(response.data or [])
+                )
+
+            if deferred:
+                deferred_at = datetime.now(timezone.utc).isoformat()
+                records = [{"id": id, "deferred_at": deferred_at} for id in deferred]
+                started = time.perf_counter()
+                self._supabase.table("sync_ml_adiadas").upsert(
+                    records, on_conflict="id"
+                ).execute()
+                self._record_call("sync_ml_adiadas", "upsert", started, len(records))
+        except Exception as e:
+            log.error(f"Erro ao atualizar lojas adiadas: {str(e)}")
             raise
 
     def get_unique_mlbs_by_id(self, id: str) -> list:
@@ -314,21 +1027,142 @@ class CredentialsRepository(ICredentialsRepository):
             Lista com os MLBs únicos
         """
         try:
-            response = (
-                self._supabase.table("sales_ml").select("mlb").eq("id", id).execute()
-            )
+            unique_mlbs = self._select_unique_mlbs(id)
 
-            if not hasattr(response, "data") or len(response.data) == 0:  # type: ignore
+            if not unique_mlbs:
                 log.warning(f"Nenhum MLB encontrado para o id: {id}")
                 return []
 
-            # Extrai os MLBs únicos da resposta
-            mlbs = [item["mlb"] for item in response.data if item.get("mlb")]  # type: ignore
-            unique_mlbs = list(set(mlbs))  # Remove duplicados
-
             log.info(f"{len(unique_mlbs)} MLBs únicos encontrados para o id: {id}")
             return unique_mlbs
 
         except Exception as e:
             log.error(f"Erro ao buscar MLBs únicos para {id}: {str(e)}")
             raise
+
+    def get_unique_mlbs_by_id_and_date(
+        self, id: str, start_date: str, end_date: str
+    ) -> list:
+        """
+        Retorna os MLBs únicos vendidos pela loja com date_created entre start_date e end_date.
+
+        Args:
+            id: Identificador da loja
+            start_date: Data inicial (string, formato compatível com Supabase)
+            end_date: Data final (string, formato compatível com Supabase)
+
+        Returns:
+            Lista com os MLBs únicos
+        """
+        try:
+            unique_mlbs = self._select_unique_mlbs(id, start_date, end_date)
+            log.info(
+                f"{len(unique_mlbs)} MLBs vendidos entre {start_date} e {end_date} para o id: {id}"
+            )
+            return unique_mlbs
+
+        except Exception as e:
+            log.error(f"Erro ao buscar MLBs vendidos para {id}: {str(e)}")
+            raise
+
+    def _select_unique_mlbs(
+        self,
+        id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[str]:
+        """Lê a coluna mlb de sales_ml em páginas de PAGE_SIZE, sem repetir MLBs."""
+        mlbs: Dict[str, None] = {}
+        start = 0
+        while True:
+            query = self._supabase.table("sales_ml").select("mlb").eq("id", id)
+            if start_date is not None:
+                query = query.gte("date_created", start_date)
+            if end_date is not None:
+                query = query.lte("date_created", end_date)
+            response = query.range(start, start + PAGE_SIZE - 1).execute()
+
+            rows = response.data if hasattr(response, "data") else []  # type: ignore
+            mlbs.update((row["mlb"], None) for row in rows if row.get("mlb"))
+            if len(rows) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+        return list(mlbs)
+
+    def _insert_records(
+        self,
+        table: str,
+        records: Sequence[Union[SaleRecord, AdsRecord, SalesDailyRollup, AdsDailyRollup]],
+        on_conflict: Optional[str] = None,
+    ) -> None:
+        """
+        Serializa os registros direto no payload e insere em lotes de SUPABASE_INSERT_BATCH.
+
+        Com on_conflict, faz upsert pelas colunas informadas. Apenas um lote
+        de dicionários existe em memória por vez.
+        """
+        op = "upsert" if on_conflict else "insert"
+        try:
+            inserted = 0
+            batch = settings.supabase_insert_batch
+            for i in range(0, len(records), batch):
+                payload = to_payload(records[i : i + batch])
+                started = time.perf_counter()
+                if on_conflict:
+                    query = self._supabase.table(table).upsert(
+                        payload, on_conflict=on_conflict
+                    )
+                else:
+                    query = self._supabase.table(table).insert(payload)
+                response = query.execute()
+                self._record_call(table, op, started, len(payload))
+                inserted += len(response.data or [])  # type: ignore
+
+            if inserted:
+                log.info(f"{inserted} registros gravados na tabela {table}")
+            else:
+                log.warning(f"Nenhum registro foi gravado na tabela {table}")
+
+        except Exception as e:
+            log.error(f"Erro ao gravar registros na tabela {table}: {str(e)}")
+            raise
+
+    def _delete_by_id_and_date(
+        self, table: str, column: str, id: str, start_date: str, end_date: str
+    ) -> None:
+        """Exclui as linhas da loja com a coluna de data entre start_date e end_date."""
+        try:
+            started = time.perf_counter()
+            response = (
+                self._supabase.table(table)
+                .delete()
+                .eq("id", id)
+                .gte(column, start_date)
+                .lte(column, end_date)
+                .execute()
+            )
+            self._record_call(table, "delete", started, len(response.data or []))
+            log.info(
+                f"{len(response.data or [])} registros excluídos de {table} para id={id} entre {start_date} e {end_date}"
+            )
+        except Exception as e:
+            log.error(f"Erro ao excluir registros de {table} para id={id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def _record_call(
+        table: str,
+        op: str,
+        started: float,
+        rows: int,
+    ) -> None:
+        """
+        Registra latência e linhas de uma chamada ao Supabase.
+
+        Os bytes enviados são contados pelo PayloadMetricsTransport, a partir
+        do corpo já serializado pelo cliente.
+        """
+        metrics.observe(
+            "supabase_call_seconds", time.perf_counter() - started, table=table, op=op
+        )
+        metrics.inc("supabase_rows_total", rows, table=table, op=op)
@@ -0,0 +1,100 @@
+"""
+Cache de atributos de itens em SQLite implementando IItemCache.
+
+Um único arquivo é compartilhado por todas as lojas e execuções; cada
+linha expira após o TTL configurado. Com o caminho ":memory:" o cache vale
+apenas para o processo atual.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from src.interfaces.item_cache_interface import IItemCache
+from src.models.mercado_livre import Item
+from src.utils.log import log
+
+# Limite de parâmetros por consulta "IN" do SQLite
+_SQLITE_BATCH = 500
+
+
+class SqliteItemCache(IItemCache):
+    """Cache de atributos de itens com TTL persistido em SQLite."""
+
+    def __init__(self, path: str, ttl: float = 86400):
+        """
+        Inicializa o cache.
+
+        Args:
+            path: Arquivo SQLite (ou ":memory:")
+            ttl: Segundos de validade de cada item
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                category_id TEXT,
+                listing_type_id TEXT,
+                status TEXT,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Item]:
+        """Lê os itens não expirados, contabilizando hits e misses."""
+        ids = list(dict.fromkeys(ids))
+        found: Dict[str, Item] = {}
+        now = time.time()
+
+        with self._lock:
+            for i in range(0, len(ids), _SQLITE_BATCH):
+                batch = ids[i : i + _SQLITE_BATCH]
+                rows = self._conn.execute(
+                    "SELECT id, title, category_id, listing_type_id, status FROM items "
+                    f"WHERE expires_at > ? AND id IN ({','.join('?' * len(batch))})",
+                    [now, *batch],
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = Item(*row)
+
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(ids) - len(found)
+        return found
+
+    def set_many(self, items: Iterable[Item]) -> None:
+        """Grava ou substitui os itens com a nova validade."""
+        expires_at = time.time() + self._ttl
+        rows: List[tuple] = [
+            (i.id, i.title, i.category_id, i.listing_type_id, i.status, expires_at)
+            for i in items
+            if i.id
+        ]
+        if not rows:
+            return
+
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.commit()
+                self._stats["stores"] += len(rows)
+        except sqlite3.Error as e:
+            log.warning(f"Erro ao gravar cache de itens: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna uma cópia dos contadores."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,98 @@
+"""
+Enriquecimento de vendas implementando IItemEnrichmentService.
+
+Os atributos dos MLBs são lidos do endpoint multi-get /items?ids=... em
+lotes de até 20 ids, com lotes em paralelo, e guardados no cache de itens
+compartilhado entre lojas e execuções.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from src.clients.client import Client
+from src.interfaces.item_cache_interface import IItemCache
+from src.interfaces.item_enrichment_interface import IItemEnrichmentService
+from src.models.mercado_livre import Item, ItemMultigetEntry
+from src.models.records import SaleRecord
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.config import settings
+from src.utils.log import log
+from src.utils.metrics import metrics
+
+# Máximo de ids aceito por /items?ids=
+MULTIGET_BATCH = 20
+ITEM_ATTRIBUTES = "id,title,category_id,listing_type_id,status"
+
+
+class ItemEnrichmentService(IItemEnrichmentService):
+    """Busca atributos de itens em lote, com cache."""
+
+    def __init__(self, client: Client, cache: IItemCache, workers: int = 4):
+        """
+        Inicializa o serviço.
+
+        Args:
+            client: Cliente da API do Mercado Livre
+            cache: Cache de atributos de itens
+            workers: Lotes requisitados em paralelo
+        """
+        self._client = client
+        self._cache = cache
+        self._workers = max(1, workers)
+
+    def get_items(self, ids: Iterable[str], id: str) -> Dict[str, Item]:
+        """Retorna os itens do cache e busca apenas os ausentes."""
+        ids = [mlb for mlb in dict.fromkeys(ids) if mlb]
+        items = self._cache.get_many(ids)
+        missing = [mlb for mlb in ids if mlb not in items]
+        if not missing:
+            return items
+
+        batches = [
+            missing[i : i + MULTIGET_BATCH]
+            for i in range(0, len(missing), MULTIGET_BATCH)
+        ]
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for fetched in executor.map(lambda b: self._fetch(b, id), batches):
+                self._cache.set_many(fetched)
+                items.update((item.id, item) for item in fetched)
+
+        log.info(
+            f"Itens: {len(ids) - len(missing)} do cache, {len(missing)} buscados "
+            f"em {len(batches)} requisições para {id}"
+        )
+        return items
+
+    def enrich_sales(self, records: List[SaleRecord], id: str) -> Dict[str, Item]:
+        """Preenche apenas campos vazios; valores do pedido são mantidos."""
+        items = self.get_items((r.mlb for r in records), id)
+        for record in records:
+            item = items.get(record.mlb)
+            if item is None:
+                continue
+            record.title = record.title or item.title or ""
+            record.category_id = record.category_id or item.category_id or ""
+            record.listing_type_id = record.listing_type_id or item.listing_type_id or ""
+        return items
+
+    def _fetch(self, batch: List[str], id: str) -> List[Item]:
+        try:
+            response = self._client.get(
+                f"{settings.ml_api_url}/items?ids={','.join(batch)}&attributes={ITEM_ATTRIBUTES}",
+                id,
+                schema=List[ItemMultigetEntry],
+            )
+        except CircuitOpenError as e:
+            # Enriquecimento é opcional: as vendas seguem sem os atributos
+            log.warning(f"Multi-get de itens ignorado para {id}: {e}")
+            return []
+        if not isinstance(response, list):
+            log.warning(f"Falha no multi-get de {len(batch)} itens para {id}")
+            return []
+
+        metrics.inc("ml_items_fetched_total", len(batch))
+        return [
+            entry.body
+            for entry in response
+            if entry.code == 200 and entry.body is not None and entry.body.id
+        ]
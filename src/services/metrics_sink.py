@@ -0,0 +1,106 @@
+"""
+Sinks de métricas implementando IMetricsSink.
+
+- PrometheusTextFileSink: arquivo no formato texto do Prometheus
+  (compatível com o textfile collector do node_exporter)
+- JsonSummarySink: resumo em JSON, em arquivo ou no log
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+from src.interfaces.metrics_sink_interface import IMetricsSink
+from src.utils.log import log
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ""
+    parts = [f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in merged.items()]
+    return "{" + ",".join(parts) + "}"
+
+
+def render_prometheus(snapshot: Dict[str, List[Dict]]) -> str:
+    """Formata o snapshot de métricas no formato de exposição texto do Prometheus."""
+    lines: List[str] = []
+    declared = set()
+
+    for counter in snapshot["counters"]:
+        if counter["name"] not in declared:
+            lines.append(f"# TYPE {counter['name']} counter")
+            declared.add(counter["name"])
+        lines.append(
+            f"{counter['name']}{_format_labels(counter['labels'])} {counter['value']}"
+        )
+
+    for hist in snapshot["histograms"]:
+        name = hist["name"]
+        if name not in declared:
+            lines.append(f"# TYPE {name} histogram")
+            declared.add(name)
+        cumulative = 0
+        for limit, count in zip(hist["buckets"], hist["counts"]):
+            cumulative += count
+            lines.append(
+                f"{name}_bucket{_format_labels(hist['labels'], {'le': str(limit)})} {cumulative}"
+            )
+        lines.append(
+            f"{name}_bucket{_format_labels(hist['labels'], {'le': '+Inf'})} {hist['count']}"
+        )
+        lines.append(f"{name}_sum{_format_labels(hist['labels'])} {hist['sum']}")
+        lines.append(f"{name}_count{_format_labels(hist['labels'])} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusTextFileSink(IMetricsSink):
+    """Grava as métricas no formato de exposição texto do Prometheus."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Caminho do arquivo .prom
+        """
+        self._path = path
+
+    def export(self, snapshot: Dict[str, List[Dict]]) -> None:
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_prometheus(snapshot))
+        os.replace(tmp_path, self._path)
+        log.info(f"Métricas exportadas em {self._path}")
+
+
+class JsonSummarySink(IMetricsSink):
+    """Gera um resumo em JSON com contadores e latências médias."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Caminho do arquivo JSON; sem caminho o resumo vai para o log
+        """
+        self._path = path
+
+    def export(self, snapshot: Dict[str, List[Dict]]) -> None:
+        summary = {
+            "counters": snapshot["counters"],
+            "histograms": [
+                {
+                    "name": h["name"],
+                    "labels": h["labels"],
+                    "count": h["count"],
+                    "sum": round(h["sum"], 6),
+                    "avg": round(h["sum"] / h["count"], 6) if h["count"] else 0.0,
+                }
+                for h in snapshot["histograms"]
+            ],
+        }
+
+        if self._path is None:
+            log.info(f"Resumo de métricas: {json.dumps(summary, ensure_ascii=False)}")
+            return
+
+        with open(self._path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        log.info(f"Métricas exportadas em {self._path}")
@@ -0,0 +1,360 @@
+"""
+Processamento de notificações orders_v2 implementando IOrderNotificationService.
+
+O callback apenas enfileira (loja, pedido) e responde na hora; uma thread
+de processamento junta os pedidos em lotes (até ML_WEBHOOK_BATCH pedidos ou
+ML_WEBHOOK_LINGER segundos após o primeiro), busca cada pedido em
+/orders/{id} com requisições em paralelo e substitui em sales_ml apenas as
+linhas desses pedidos. Notificações repetidas de um pedido ainda na fila
+são descartadas; pedidos que deixaram de estar pagos têm as linhas removidas.
+
+Na mesma trava de gravação, a contagem de pedidos (sales_ml_contagem) e os
+agregados diários dos dias afetados são recalculados a partir de sales_ml,
+para que a sondagem e os rollups continuem coerentes. Pedidos cuja busca
+falhou (o callback já respondeu 200) ficam em ml_notificacoes_pendentes e
+são buscados de novo ao iniciar e a cada ML_WEBHOOK_RETRY_INTERVAL segundos.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from src.clients.client import Client
+from src.interfaces.credentials_repository_interface import ICredentialsRepository
+from src.interfaces.item_enrichment_interface import IItemEnrichmentService
+from src.interfaces.order_notification_interface import IOrderNotificationService
+from src.models.mercado_livre import Order
+from src.models.records import SaleRecord
+from src.models.rollups import agregar_vendas
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.config import settings
+from src.utils.log import log
+from src.utils.metrics import metrics
+from src.utils.travas import trava_vendas
+
+TOPIC = "orders_v2"
+_RESOURCE = re.compile(r"/orders/(\d+)")
+
+# Chave da fila: (loja, id do pedido)
+Chave = Tuple[str, int]
+
+
+class OrderNotificationService(IOrderNotificationService):
+    """Fila deduplicada de pedidos notificados, processada em lotes."""
+
+    def __init__(
+        self,
+        client: Client,
+        repository: ICredentialsRepository,
+        enrichment: Optional[IItemEnrichmentService] = None,
+        sellers: Optional[Iterable[str]] = None,
+        batch_size: Optional[int] = None,
+        linger: Optional[float] = None,
+        workers: Optional[int] = None,
+        gravar: bool = True,
+    ):
+        """
+        Inicializa o serviço e a thread de processamento.
+
+        Args:
+            client: Cliente da API do Mercado Livre
+            repository: Repositório de destino
+            enrichment: Serviço de enriquecimento dos itens (opcional)
+            sellers: Lojas aceitas (None = qualquer loja)
+            batch_size: Pedidos por lote (padrão: ML_WEBHOOK_BATCH)
+            linger: Espera máxima para completar um lote (padrão: ML_WEBHOOK_LINGER)
+            workers: Pedidos buscados em paralelo (padrão: ML_WEBHOOK_WORKERS)
+            gravar: False apenas busca os pedidos (ML_WRITE_BACKEND=none)
+        """
+        self._client = client
+        self._repository = repository
+        self._enrichment = enrichment
+        self._sellers = set(sellers) if sellers is not None else None
+        self._batch_size = batch_size or settings.ml_webhook_batch
+        self._linger = settings.ml_webhook_linger if linger is None else linger
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or settings.ml_webhook_workers,
+            thread_name_prefix="order-fetch",
+        )
+        self._gravar = gravar
+
+        self._cond = threading.Condition()
+        # Pedidos pendentes, em ordem de chegada, com o instante do enfileiramento
+        self._pendentes: Dict[Chave, float] = {}
+        self._em_andamento = 0
+        self._pausa_ate = 0.0
+        self._fechado = False
+        self._stats: Dict[str, int] = defaultdict(int)
+        # Tentativas dos pedidos registrados em ml_notificacoes_pendentes
+        self._tentativas: Dict[Chave, int] = {}
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._consumir, name="order-notifications", daemon=True
+        )
+        self._thread.start()
+        self._thread_pendentes: Optional[threading.Thread] = None
+        if self._gravar:
+            self._thread_pendentes = threading.Thread(
+                target=self._reler_pendentes, name="order-retry", daemon=True
+            )
+            self._thread_pendentes.start()
+
+    def enqueue(self, notification: Dict[str, Any]) -> str:
+        chave = self._chave(notification)
+        with self._cond:
+            self._stats["recebidas"] += 1
+            if chave is None:
+                resultado = "ignored"
+            elif chave in self._pendentes:
+                resultado = "duplicate"
+            else:
+                self._pendentes[chave] = time.monotonic()
+                self._cond.notify_all()
+                resultado = "queued"
+            self._stats[resultado] += 1
+        metrics.inc("order_notifications_total", result=resultado)
+        return resultado
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pendentes or self._em_andamento:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._cond.wait(restante)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {**self._stats, "pendentes": len(self._pendentes)}
+
+    def close(self) -> None:
+        self._parar.set()
+        if self._thread_pendentes is not None:
+            self._thread_pendentes.join()
+        with self._cond:
+            self._fechado = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _reler_pendentes(self) -> None:
+        """Enfileira os pedidos de ml_notificacoes_pendentes ao iniciar e a cada intervalo."""
+        while True:
+            try:
+                pendentes = self._repository.get_pending_orders()
+            except Exception as e:
+                log.warning(f"Notificações: pedidos pendentes indisponíveis: {e}")
+                pendentes = {}
+
+            novos = 0
+            with self._cond:
+                for chave, tentativas in pendentes.items():
+                    if self._sellers is not None and chave[0] not in self._sellers:
+                        continue
+                    self._tentativas[chave] = tentativas
+                    if chave not in self._pendentes:
+                        self._pendentes[chave] = time.monotonic()
+                        novos += 1
+                if novos:
+                    self._cond.notify_all()
+            if novos:
+                log.info(f"Notificações: {novos} pedidos pendentes enfileirados de novo")
+
+            if self._parar.wait(settings.ml_webhook_retry_interval):
+                return
+
+    def _chave(self, notification: Dict[str, Any]) -> Optional[Chave]:
+        if notification.get("topic") != TOPIC:
+            return None
+        match = _RESOURCE.fullmatch(str(notification.get("resource") or ""))
+        loja = str(notification.get("user_id") or "")
+        if match is None or not loja:
+            return None
+        if self._sellers is not None and loja not in self._sellers:
+            return None
+        return loja, int(match.group(1))
+
+    def _consumir(self) -> None:
+        while True:
+            with self._cond:
+                while not self._fechado and (
+                    not self._pendentes or time.monotonic() < self._pausa_ate
+                ):
+                    espera = (
+                        self._pausa_ate - time.monotonic() if self._pendentes else None
+                    )
+                    self._cond.wait(espera)
+                if not self._pendentes:
+                    return
+
+                # Aguarda mais pedidos até completar o lote ou esgotar o linger
+                limite = time.monotonic() + self._linger
+                while len(self._pendentes) < self._batch_size and not self._fechado:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+
+                chaves = list(self._pendentes)[: self._batch_size]
+                lote = {chave: self._pendentes.pop(chave) for chave in chaves}
+                self._em_andamento = len(lote)
+
+            try:
+                self._processar(lote)
+            except Exception as e:
+                log.error(f"Notificações: erro ao processar lote de {len(lote)} pedidos: {e}")
+                with self._cond:
+                    self._stats["falhas"] += len(lote)
+            finally:
+                with self._cond:
+                    self._em_andamento = 0
+                    self._cond.notify_all()
+
+    def _buscar(self, chave: Chave) -> Union[Order, CircuitOpenError, None]:
+        loja, pedido = chave
+        try:
+            order = self._client.get(
+                f"{settings.ml_api_url}/orders/{pedido}", loja, schema=Order
+            )
+        except CircuitOpenError as e:
+            return e
+        except Exception as e:
+            log.error(f"Notificações: erro ao buscar o pedido {pedido} de {loja}: {e}")
+            return None
+        return order if isinstance(order, Order) else None
+
+    def _processar(self, lote: Dict[Chave, float]) -> None:
+        chaves = list(lote)
+        resultados = dict(zip(chaves, self._executor.map(self._buscar, chaves)))
+
+        adiados = [c for c, r in resultados.items() if isinstance(r, CircuitOpenError)]
+        if adiados:
+            # Circuito aberto: os pedidos voltam para a fila após o cooldown
+            retry_in = max(resultados[c].retry_in for c in adiados)  # type: ignore[union-attr]
+            with self._cond:
+                if self._fechado:
+                    # Encerrando: ficam para a próxima execução do receptor
+                    self._stats["falhas"] += len(adiados)
+                    encerrando = True
+                else:
+                    encerrando = False
+                    for chave in adiados:
+                        self._pendentes.setdefault(chave, lote[chave])
+                    self._pausa_ate = time.monotonic() + retry_in
+            if encerrando:
+                self._registrar_pendentes(adiados, tentativa=False)
+            log.warning(
+                f"Notificações: circuito aberto; {len(adiados)} pedidos adiados por {retry_in:.0f}s"
+            )
+
+        por_loja: Dict[str, Dict[int, Order]] = defaultdict(dict)
+        falhados: List[Chave] = []
+        for (loja, pedido), order in resultados.items():
+            if isinstance(order, Order):
+                por_loja[loja][pedido] = order
+            elif order is None:
+                falhados.append((loja, pedido))
+        falhas = len(falhados)
+        if falhados:
+            self._registrar_pendentes(falhados, tentativa=True)
+
+        linhas = 0
+        for loja, pedidos in por_loja.items():
+            registros: List[SaleRecord] = [
+                SaleRecord.from_order(order, item, loja)
+                for order in pedidos.values()
+                if order.status == "paid"
+                for item in order.order_items
+            ]
+            if registros and self._enrichment is not None:
+                self._enrichment.enrich_sales(registros, loja)
+            if self._gravar:
+                # Não intercala com a regravação de dias da sincronização por janela
+                with trava_vendas(loja, self._repository):
+                    dias = self._repository.replace_sales_orders(
+                        loja, list(pedidos), registros
+                    )
+                    self._atualizar_dias(loja, dias)
+                self._remover_pendentes(loja, list(pedidos))
+            linhas += len(registros)
+
+        agora = time.monotonic()
+        for chave, enfileirado in lote.items():
+            if chave not in adiados:
+                metrics.observe("order_notification_lag_seconds", agora - enfileirado)
+
+        buscados = sum(len(p) for p in por_loja.values())
+        with self._cond:
+            self._stats["buscados"] += buscados
+            self._stats["falhas"] += falhas
+            self._stats["linhas"] += linhas
+        log.info(
+            f"Notificações: {buscados} pedidos atualizados ({linhas} linhas) em "
+            f"{len(por_loja)} loja(s); {falhas} falhas, {len(adiados)} adiados"
+        )
+
+    def _atualizar_dias(self, loja: str, dias: Set[str]) -> None:
+        """Recalcula a contagem de pedidos e os agregados dos dias a partir de sales_ml."""
+        if not dias or not (settings.sales_probe or settings.daily_rollups):
+            return
+
+        registros = self._repository.get_sales_records(loja, sorted(dias))
+        if settings.sales_probe:
+            pedidos: Dict[str, Set[int]] = {dia: set() for dia in dias}
+            for r in registros:
+                pedidos.setdefault(r.date_created, set()).add(r.numero_pedido)
+            self._repository.upsert_sales_day_counts(
+                loja, {dia: len(numeros) for dia, numeros in pedidos.items()}
+            )
+        if settings.daily_rollups:
+            # Exclui antes: MLBs sem vendas restantes no dia deixam de ter agregado
+            for dia in sorted(dias):
+                self._repository.delete_sales_rollups_by_id_and_date(loja, dia, dia)
+            self._repository.upsert_sales_rollups(agregar_vendas(registros))
+
+    def _registrar_pendentes(self, chaves: List[Chave], tentativa: bool) -> None:
+        """Grava em ml_notificacoes_pendentes os pedidos que não foram buscados."""
+        if not self._gravar:
+            return
+
+        por_loja: Dict[str, Dict[int, int]] = defaultdict(dict)
+        descartados: Dict[str, List[int]] = defaultdict(list)
+        with self._cond:
+            for loja, pedido in chaves:
+                tentativas = self._tentativas.get((loja, pedido), 0) + int(tentativa)
+                if tentativas >= settings.ml_webhook_max_attempts:
+                    descartados[loja].append(pedido)
+                    self._tentativas.pop((loja, pedido), None)
+                else:
+                    por_loja[loja][pedido] = tentativas
+                    self._tentativas[(loja, pedido)] = tentativas
+
+        for loja, pedidos in descartados.items():
+            log.error(
+                f"Notificações: {len(pedidos)} pedidos de {loja} descartados após "
+                f"{settings.ml_webhook_max_attempts} tentativas; ficam para a "
+                f"sincronização por janela"
+            )
+        try:
+            for loja, pedidos in descartados.items():
+                self._repository.delete_pending_orders(loja, pedidos)
+            for loja, tentativas in por_loja.items():
+                self._repository.save_pending_orders(loja, tentativas)
+        except Exception as e:
+            log.error(f"Notificações: pedidos pendentes não registrados: {e}")
+
+    def _remover_pendentes(self, loja: str, pedidos: List[int]) -> None:
+        """Remove de ml_notificacoes_pendentes os pedidos já gravados."""
+        with self._cond:
+            registrados = [p for p in pedidos if self._tentativas.pop((loja, p), None) is not None]
+        if not registrados:
+            return
+        try:
+            self._repository.delete_pending_orders(loja, registrados)
+        except Exception as e:
+            log.warning(f"Notificações: pedidos pendentes de {loja} não removidos: {e}")
@@ -0,0 +1,169 @@
+"""
+Cache de respostas HTTP em disco implementando IResponseCache.
+
+Cada entrada é um arquivo JSON com o corpo da resposta e os metadados de
+revalidação (ETag/Last-Modified). O tamanho total é limitado e as entradas
+menos usadas recentemente são removidas primeiro.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.interfaces.response_cache_interface import IResponseCache
+from src.utils.log import log
+
+
+class DiskResponseCache(IResponseCache):
+    """Cache de respostas GET persistido em disco com limite de tamanho."""
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Inicializa o cache.
+
+        Args:
+            directory: Diretório onde as entradas são gravadas
+            max_bytes: Tamanho máximo ocupado pelas entradas em disco
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "stale": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        self._sizes: Dict[str, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                path = os.path.join(directory, name)
+                self._sizes[path] = os.path.getsize(path)
+        self._total_bytes = sum(self._sizes.values())
+
+    def make_key(self, url: str, id: str) -> str:
+        """Gera a chave a partir da URL e da loja."""
+        return hashlib.sha256(f"{id}|{url}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Lê a entrada do disco, contabilizando hit, stale ou miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f"Entrada de cache corrompida descartada ({key}): {e}")
+            self._remove(path)
+            self._count("misses")
+            return None
+
+        # Atualiza o mtime para a política LRU de remoção
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        entry["fresh"] = entry.get("expires_at", 0) > time.time()
+        self._count("hits" if entry["fresh"] else "stale")
+        return entry
+
+    def set(
+        self,
+        key: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        ttl: float = 0,
+    ) -> None:
+        """Grava a entrada de forma atômica e aplica o limite de tamanho."""
+        entry = {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": time.time() + ttl if ttl > 0 else 0,
+        }
+        self._write(key, entry)
+        self._count("stores")
+
+    def refresh(self, key: str, ttl: float = 0) -> None:
+        """Renova a validade de uma entrada confirmada pela API via 304."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        entry["expires_at"] = time.time() + ttl if ttl > 0 else 0
+        self._write(key, entry)
+        self._count("revalidated")
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna uma cópia das estatísticas de uso."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{key}.json")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            log.warning(f"Falha ao gravar entrada de cache ({key}): {e}")
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            size = os.path.getsize(path)
+            self._total_bytes += size - self._sizes.get(path, 0)
+            self._sizes[path] = size
+            if self._total_bytes > self._max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove as entradas acessadas há mais tempo até caber no limite."""
+        by_age = sorted(self._sizes, key=self._mtime)
+        target = self._max_bytes * 0.9
+        for path in by_age:
+            if self._total_bytes <= target:
+                break
+            self._total_bytes -= self._sizes.pop(path)
+            self._stats["evictions"] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(path, 0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _mtime(path: str) -> float:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
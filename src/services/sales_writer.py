@@ -0,0 +1,250 @@
+"""
+Gravação de vendas em paralelo à busca de pedidos.
+
+A busca (produtor) entrega os registros de cada página em uma fila limitada
+(ML_PIPELINE_QUEUE páginas); uma thread de gravação (consumidor) regrava
+sales_ml enquanto as páginas seguintes ainda são baixadas.
+
+Como /orders/search é percorrido em ordem de data, um dia está completo
+quando chegam registros de um dia posterior. Cada dia só é excluído e
+reinserido depois de completo; se a busca for interrompida, os dias já
+gravados ficam com as vendas novas e os demais mantêm as anteriores,
+em vez de o período ficar parcialmente vazio.
+
+Junto com cada dia regravado é registrada a quantidade de pedidos do dia
+(sales_ml_contagem), comparada pela sondagem do vendas.py com o total da
+API. A contagem do dia é excluída antes das vendas e só volta a ser
+registrada depois da inserção, para que uma gravação interrompida nunca
+deixe um dia incompleto com contagem igual à da API.
+
+Cada exclusão e a inserção correspondente são feitas com a trava de
+gravação da loja (src.utils.travas), compartilhada com o receptor de
+notificações, inclusive quando ele roda em outro processo.
+"""
+
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from src.interfaces.credentials_repository_interface import ICredentialsRepository
+from src.interfaces.item_enrichment_interface import IItemEnrichmentService
+from src.models.mercado_livre import Item
+from src.models.records import SaleRecord
+from src.models.rollups import agregar_vendas
+from src.utils.config import settings
+from src.utils.data import somar_dias
+from src.utils.log import log
+from src.utils.metrics import metrics
+from src.utils.travas import trava_vendas
+
+# Marca de fim da fila
+_FIM = None
+
+
+class SalesWriter:
+    """Consumidor da fila de registros de venda de uma loja e período."""
+
+    def __init__(
+        self,
+        repository: ICredentialsRepository,
+        id: str,
+        data_inicial: str,
+        data_final: str,
+        enrichment: Optional[IItemEnrichmentService] = None,
+        gravar: bool = True,
+        tamanho_fila: Optional[int] = None,
+        manter_vazio: bool = True,
+    ):
+        """
+        Args:
+            repository: Repositório de destino
+            id: Loja sincronizada
+            data_inicial: Primeiro dia regravado
+            data_final: Último dia regravado
+            enrichment: Serviço de enriquecimento dos itens (opcional)
+            gravar: False apenas acumula os registros (ML_WRITE_BACKEND=none)
+            tamanho_fila: Páginas em espera (padrão: ML_PIPELINE_QUEUE)
+            manter_vazio: False regrava o período mesmo se a busca não trouxer vendas
+        """
+        self._repository = repository
+        self._id = id
+        self._data_inicial = data_inicial
+        self._data_final = data_final
+        self._manter_vazio = manter_vazio
+        self._enrichment = enrichment
+        self._gravar = gravar
+        self._fila: "queue.Queue[Optional[List[SaleRecord]]]" = queue.Queue(
+            maxsize=tamanho_fila or settings.ml_pipeline_queue
+        )
+        self._thread = threading.Thread(
+            target=self._consumir, name=f"sales-writer-{id}", daemon=True
+        )
+
+        # Registros por dia; os dias antes de _proximo_dia já foram excluídos
+        self._por_dia: Dict[str, List[SaleRecord]] = defaultdict(list)
+        self._abertos: Dict[str, List[SaleRecord]] = defaultdict(list)
+        self._prontos: List[SaleRecord] = []
+        self._proximo_dia = data_inicial
+        self._ultimo_dia = ""
+        self._completo = False
+
+        self.itens: Dict[str, Item] = {}
+        self.registros = 0
+        self.gravacoes = 0
+        self.erro: Optional[Exception] = None
+
+    @property
+    def falhou(self) -> bool:
+        return self.erro is not None
+
+    def iniciar(self) -> "SalesWriter":
+        self._thread.start()
+        return self
+
+    def enviar(self, registros: List[SaleRecord]) -> None:
+        """Entrega os registros de uma página; bloqueia se a fila estiver cheia."""
+        started = time.perf_counter()
+        self._fila.put(registros)
+        metrics.observe(
+            "sales_pipeline_put_wait_seconds", time.perf_counter() - started
+        )
+
+    def finalizar(self, completo: bool) -> List[SaleRecord]:
+        """
+        Encerra a fila e aguarda a gravação.
+
+        Com completo=False (busca interrompida), os dias ainda abertos não
+        são gravados. Propaga o erro da thread de gravação, se houver.
+
+        Returns:
+            Todos os registros recebidos, por dia
+        """
+        self._completo = completo
+        self._fila.put(_FIM)
+        self._thread.join()
+        if self.erro is not None:
+            raise self.erro
+        return [r for registros in self._por_dia.values() for r in registros]
+
+    def _consumir(self) -> None:
+        while True:
+            lote = self._fila.get()
+            fim = lote is _FIM
+            if not fim:
+                self._receber(lote)
+                # Agrupa o que já estiver na fila em uma única gravação
+                while not fim:
+                    try:
+                        lote = self._fila.get_nowait()
+                    except queue.Empty:
+                        break
+                    fim = lote is _FIM
+                    if not fim:
+                        self._receber(lote)
+
+            if self.erro is None:
+                try:
+                    self._gravar_completos(fim)
+                except Exception as e:
+                    # Segue esvaziando a fila para não bloquear a busca
+                    log.error(f"Vendas ML: erro ao gravar vendas de {self._id}: {e}")
+                    self.erro = e
+            if fim:
+                return
+
+    def _receber(self, registros: List[SaleRecord]) -> None:
+        self.registros += len(registros)
+        for r in registros:
+            self._por_dia[r.date_created].append(r)
+            if r.date_created and r.date_created < self._proximo_dia:
+                # Dia já regravado nesta execução (ou anterior ao período)
+                self._prontos.append(r)
+            else:
+                self._abertos[r.date_created].append(r)
+            if r.date_created > self._ultimo_dia:
+                self._ultimo_dia = r.date_created
+
+    def _gravar_completos(self, fim: bool) -> None:
+        if fim and self._completo:
+            if self.registros == 0 and self._manter_vazio:
+                # Período sem vendas: mantém o que já estava gravado
+                return
+            limite = somar_dias(self._data_final, 1)
+            completos = list(self._abertos)
+        else:
+            # Dias anteriores ao último recebido estão completos
+            limite = self._ultimo_dia
+            completos = [d for d in self._abertos if d and d < limite]
+            prontos = len(self._prontos) + sum(len(self._abertos[d]) for d in completos)
+            if prontos < settings.supabase_insert_batch and not fim:
+                # Acumula dias completos até encher um lote de insert
+                return
+
+        if limite <= self._proximo_dia and not completos and not self._prontos:
+            return
+
+        # A trava só é pedida quando há o que gravar (entre processos, com gravação)
+        with trava_vendas(self._id, self._repository if self._gravar else None):
+            if limite <= self._proximo_dia and not completos:
+                self._registrar_contagens(self._inserir(set()))
+                return
+
+            for dia in completos:
+                self._prontos.extend(self._abertos.pop(dia))
+
+            excluidos: Set[str] = set()
+            excluir_ate = somar_dias(limite, -1)
+            if self._proximo_dia <= excluir_ate:
+                self._excluir(self._proximo_dia, excluir_ate)
+                dia = self._proximo_dia
+                while dia <= excluir_ate:
+                    excluidos.add(dia)
+                    dia = somar_dias(dia, 1)
+                self._proximo_dia = limite
+            self._registrar_contagens(excluidos | self._inserir(set(completos)))
+
+    def _excluir(self, de: str, ate: str) -> None:
+        if not self._gravar:
+            return
+        if settings.sales_probe:
+            self._repository.delete_sales_day_counts(self._id, de, ate)
+        self._repository.delete_sales_by_id_and_date(self._id, de, ate)
+        if settings.daily_rollups:
+            self._repository.delete_sales_rollups_by_id_and_date(self._id, de, ate)
+
+    def _inserir(self, dias: Set[str]) -> Set[str]:
+        """Insere os registros prontos; retorna os dias do período que receberam linhas."""
+        registros, self._prontos = self._prontos, []
+        if not registros:
+            return set()
+
+        if self._enrichment is not None:
+            self.itens.update(self._enrichment.enrich_sales(registros, self._id))
+        if not self._gravar:
+            return set()
+
+        self._repository.insert_sales_records(registros)
+        self.gravacoes += 1
+
+        if settings.daily_rollups:
+            # Recalcula o dia inteiro, inclusive registros que chegaram atrasados
+            dias |= {r.date_created for r in registros}
+            self._repository.upsert_sales_rollups(
+                agregar_vendas(r for dia in dias for r in self._por_dia[dia])
+            )
+
+        return {
+            r.date_created
+            for r in registros
+            if self._data_inicial <= r.date_created < self._proximo_dia
+        }
+
+    def _registrar_contagens(self, dias: Set[str]) -> None:
+        if not dias or not self._gravar or not settings.sales_probe:
+            return
+        self._repository.upsert_sales_day_counts(
+            self._id,
+            {dia: len({r.numero_pedido for r in self._por_dia[dia]}) for dia in dias},
+        )
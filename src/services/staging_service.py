@@ -0,0 +1,107 @@
+"""
+Staging em Parquet implementando IStagingService.
+
+Grava cada execução em arquivos Parquet particionados por loja e data, em
+disco local ou em um bucket montado, permitindo recargas e backfills sem
+novas chamadas à API. Requer o pacote opcional pyarrow.
+
+Estrutura:
+    <raiz>/<dataset>/raw/seller=<id>/date=<dia da execução>/<run_id>.parquet
+    <raiz>/<dataset>/normalized/seller=<id>/date=<YYYY-MM-DD>/part.parquet
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from src.interfaces.staging_service_interface import IStagingService
+from src.utils.log import log
+
+
+class ParquetStagingService(IStagingService):
+    """Staging dos lotes coletados em Parquet particionado."""
+
+    def __init__(self, root: str):
+        """
+        Inicializa o serviço de staging.
+
+        Args:
+            root: Diretório raiz (local ou bucket montado)
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "O staging em Parquet requer o pacote pyarrow (pip install pyarrow)."
+            ) from e
+
+        self._root = root
+
+    def write_raw(
+        self, dataset: str, id: str, run_id: str, payloads: List[Dict[str, Any]]
+    ) -> None:
+        """Grava as respostas brutas como JSON em uma coluna Parquet."""
+        if not payloads:
+            return
+
+        try:
+            directory = self._partition(
+                dataset, "raw", id, datetime.now().strftime("%Y-%m-%d")
+            )
+            df = pd.DataFrame(
+                {"payload": [json.dumps(p, ensure_ascii=False) for p in payloads]}
+            )
+            df.to_parquet(os.path.join(directory, f"{run_id}.parquet"), index=False)
+        except Exception as e:
+            log.error(f"Erro ao gravar staging bruto de {dataset} para {id}: {e}")
+            raise
+
+    def write_frame(
+        self, dataset: str, id: str, df: pd.DataFrame, date_column: str
+    ) -> None:
+        """Substitui as partições de data presentes no DataFrame."""
+        if df.empty:
+            return
+
+        try:
+            dias = pd.to_datetime(df[date_column], errors="coerce").dt.strftime(
+                "%Y-%m-%d"
+            )
+            for dia, parte in df.groupby(dias.fillna("unknown")):
+                directory = self._partition(dataset, "normalized", id, str(dia))
+                parte.to_parquet(os.path.join(directory, "part.parquet"), index=False)
+
+            log.info(f"{len(df)} registros de {dataset} gravados no staging para {id}")
+        except Exception as e:
+            log.error(f"Erro ao gravar staging de {dataset} para {id}: {e}")
+            raise
+
+    def load_frame(
+        self, dataset: str, id: str, start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        """Concatena as partições normalizadas dentro do período."""
+        base = os.path.join(self._root, dataset, "normalized", f"seller={id}")
+        if not os.path.isdir(base):
+            return pd.DataFrame()
+
+        partes = []
+        for name in sorted(os.listdir(base)):
+            dia = name.removeprefix("date=")
+            if start_date <= dia <= end_date:
+                path = os.path.join(base, name, "part.parquet")
+                if os.path.exists(path):
+                    partes.append(pd.read_parquet(path))
+
+        if not partes:
+            return pd.DataFrame()
+        return pd.concat(partes, ignore_index=True)
+
+    def _partition(self, dataset: str, stage: str, id: str, dia: str) -> str:
+        directory = os.path.join(
+            self._root, dataset, stage, f"seller={id}", f"date={dia}"
+        )
+        os.makedirs(directory, exist_ok=True)
+        return directory
@@ -0,0 +1,251 @@
+"""
+Agendamento das lojas de uma execução de sync com várias lojas.
+
+O custo de cada loja é estimado pelo histórico (sync_ml_historico): a
+duração da última execução bem-sucedida de cada job, escalada pelo tamanho
+atual ou, sem tamanho, pela razão entre os dias da janela atual e os da
+execução registrada. Só sales tem tamanho confiável antes da execução
+(pedidos na janela em sales_ml_contagem, com ML_SALES_PROBE); para ads,
+ads_ml_finalizado só cobre os MLBs com dias finalizados e fica vazio em
+janelas curtas, então vale a duração registrada escalada pela janela. As
+lojas são medidas em paralelo, pois o tempo da medição sai do prazo. Lojas
+sem histórico são estimadas pelo tamanho, com o custo médio por pedido das
+lojas que já têm histórico; sem nenhuma referência, vale
+ML_SYNC_DEFAULT_COST.
+
+As lojas são distribuídas entre os workers das mais longas para as mais
+curtas (LPT), o que reduz o tempo total, começando pelas adiadas na
+execução anterior (sync_ml_adiadas). Com prazo (ML_SYNC_DEADLINE), uma
+loja só começa se a estimativa couber no tempo restante menos a reserva
+para gravações e registro do histórico (ML_SYNC_DEADLINE_RESERVE); as que
+não couberem ficam para a próxima execução, em vez de serem interrompidas
+pelo timeout do job no meio da gravação. A primeira loja da fila sempre
+começa, mesmo que a estimativa exceda o prazo: caso contrário, uma loja
+maior que o prazo nunca seria executada nem teria a estimativa atualizada.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.interfaces.credentials_repository_interface import ICredentialsRepository
+from src.utils.config import settings
+from src.utils.log import log
+
+# Medida de tamanho usada para escalar e estimar cada job (ads não tem medida
+# confiável antes da execução e é escalado pelos dias da janela)
+_TAMANHO = {"sales": "orders"}
+
+# Lojas medidas ao mesmo tempo antes do agendamento
+_MEDICOES_PARALELAS = 8
+
+
+def dias_da_janela(data_inicial: str, data_final: str) -> int:
+    """Quantidade de dias entre data_inicial e data_final, inclusive."""
+    return (date.fromisoformat(data_final) - date.fromisoformat(data_inicial)).days + 1
+
+
+def medir_loja(
+    repository: ICredentialsRepository,
+    id: str,
+    jobs: Sequence[str],
+    data_inicial: str,
+    data_final: str,
+) -> Dict[str, int]:
+    """
+    Tamanho atual da loja para os jobs informados: pedidos na janela
+    (sales_ml_contagem) e MLBs com métricas de ads (ads_ml_finalizado).
+    """
+    tamanho: Dict[str, int] = {}
+    if "sales" in jobs:
+        pedidos = repository.get_sales_day_counts(id, data_inicial, data_final)
+        tamanho["orders"] = sum(pedidos.values())
+    if "ads" in jobs:
+        tamanho["mlbs"] = len(repository.get_ads_finalized_ranges(id))
+    return tamanho
+
+
+def _escalar(
+    anterior: Dict[str, float], medida: Optional[str], unidades: int, dias: int
+) -> float:
+    """Duração registrada escalada pelo tamanho atual ou, sem ele, pela janela."""
+    if medida is not None and anterior[medida] > 0 and unidades > 0:
+        return anterior["seconds"] * unidades / anterior[medida]
+    if anterior["days"] > 0:
+        return anterior["seconds"] * dias / anterior["days"]
+    return anterior["seconds"]
+
+
+def _medir_lojas(
+    repository: ICredentialsRepository,
+    lojas: Sequence[str],
+    data_inicial: str,
+    data_final: str,
+) -> Dict[str, Dict[str, int]]:
+    """Pedidos na janela de cada loja, medidos em paralelo (falhas ficam sem tamanho)."""
+
+    def medir(loja: str) -> Dict[str, int]:
+        try:
+            return medir_loja(repository, loja, ["sales"], data_inicial, data_final)
+        except Exception as e:
+            log.warning(f"Agendador: não foi possível medir a loja {loja}: {e}")
+            return {}
+
+    if not lojas:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(_MEDICOES_PARALELAS, len(lojas))) as executor:
+        return dict(zip(lojas, executor.map(medir, lojas)))
+
+
+def estimar_custos(
+    repository: ICredentialsRepository,
+    lojas: Sequence[str],
+    jobs: Sequence[str],
+    data_inicial: str,
+    data_final: str,
+) -> Dict[str, float]:
+    """
+    Estima, em segundos, a duração dos jobs de cada loja.
+
+    Returns:
+        Dicionário {loja: segundos}
+    """
+    try:
+        historico = repository.get_sync_history()
+    except Exception as e:
+        log.warning(f"Agendador: histórico indisponível ({e}); usando custo padrão")
+        return {loja: settings.sync_default_cost * len(jobs) for loja in lojas}
+
+    # Segundos por pedido das lojas com histórico
+    taxas: Dict[str, float] = {}
+    for job, medida in _TAMANHO.items():
+        linhas = [h for (_, j), h in historico.items() if j == job and h[medida] > 0]
+        if linhas:
+            taxas[job] = sum(h["seconds"] for h in linhas) / sum(h[medida] for h in linhas)
+
+    # Sem a sonda, sales_ml_contagem não é mantida e não há o que medir
+    tamanhos: Dict[str, Dict[str, int]] = {}
+    if "sales" in jobs and settings.sales_probe:
+        tamanhos = _medir_lojas(repository, lojas, data_inicial, data_final)
+
+    dias = dias_da_janela(data_inicial, data_final)
+    custos: Dict[str, float] = {}
+    for loja in lojas:
+        tamanho = tamanhos.get(loja, {})
+        custo = 0.0
+        for job in jobs:
+            medida = _TAMANHO.get(job)
+            unidades = tamanho.get(medida, 0) if medida else 0
+            anterior = historico.get((loja, job))
+            if anterior is not None:
+                custo += _escalar(anterior, medida, unidades, dias)
+            elif job in taxas and unidades:
+                custo += taxas[job] * unidades
+            else:
+                custo += settings.sync_default_cost
+        custos[loja] = custo
+    return custos
+
+
+class SyncScheduler:
+    """Executa as lojas em ordem decrescente de custo, respeitando o prazo."""
+
+    def __init__(
+        self,
+        custos: Dict[str, float],
+        workers: int,
+        prazo: Optional[float] = None,
+        reserva: float = 0.0,
+        prioritarias: Sequence[str] = (),
+    ):
+        """
+        Args:
+            custos: Duração estimada de cada loja (segundos)
+            workers: Lojas em paralelo
+            prazo: Segundos disponíveis a partir de agora (None = sem prazo)
+            reserva: Segundos mantidos livres ao fim do prazo
+            prioritarias: Lojas que começam antes das demais (adiadas na execução anterior)
+        """
+        self._custos = custos
+        self._workers = max(1, min(workers, len(custos)))
+        self._limite = None if prazo is None else time.monotonic() + prazo - reserva
+        self._lock = threading.Lock()
+        primeiro = set(prioritarias)
+        self._pendentes: List[str] = sorted(
+            custos, key=lambda loja: (loja not in primeiro, -custos[loja])
+        )
+        self._iniciadas = 0
+        self.adiadas: List[str] = []
+
+    def _proxima(self) -> Optional[str]:
+        """Retira a loja mais longa que ainda cabe no prazo."""
+        with self._lock:
+            if not self._pendentes:
+                return None
+            restante = (
+                float("inf") if self._limite is None else self._limite - time.monotonic()
+            )
+            if self._iniciadas == 0:
+                # A primeira da fila começa com todo o tempo disponível
+                loja = self._pendentes.pop(0)
+                if self._custos[loja] > restante:
+                    log.warning(
+                        f"Agendador: loja {loja} estimada em {self._custos[loja]:.0f}s, "
+                        f"acima dos {restante:.0f}s disponíveis; iniciando mesmo assim"
+                    )
+            else:
+                # O tempo restante só diminui: se nenhuma cabe, as demais não cabem mais
+                loja = next((l for l in self._pendentes if self._custos[l] <= restante), None)
+                if loja is None:
+                    return None
+                self._pendentes.remove(loja)
+            self._iniciadas += 1
+            return loja
+
+    def executar(self, tarefa: Callable[[str], Dict[str, bool]]) -> Dict[str, Dict[str, bool]]:
+        """
+        Executa a tarefa de cada loja que couber no prazo.
+
+        Returns:
+            Resultado da tarefa por loja executada; as demais ficam em `adiadas`
+        """
+        resultados: Dict[str, Dict[str, bool]] = {}
+
+        def worker() -> None:
+            while True:
+                loja = self._proxima()
+                if loja is None:
+                    return
+                resultados[loja] = tarefa(loja)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for future in [executor.submit(worker) for _ in range(self._workers)]:
+                future.result()
+
+        self.adiadas = list(self._pendentes)
+        return resultados
+
+
+def registrar_execucao(
+    repository: ICredentialsRepository,
+    id: str,
+    job: str,
+    segundos: float,
+    data_inicial: str,
+    data_final: str,
+) -> None:
+    """Grava a duração, o tamanho atual da loja e a janela no histórico (falhas só são registradas no log)."""
+    try:
+        tamanho = medir_loja(repository, id, [job], data_inicial, data_final)
+        repository.save_sync_run(
+            id,
+            job,
+            segundos,
+            tamanho.get("orders", 0),
+            tamanho.get("mlbs", 0),
+            dias_da_janela(data_inicial, data_final),
+        )
+    except Exception as e:
+        log.warning(f"Agendador: histórico de {job} da loja {id} não registrado: {e}")
@@ -4,22 +4,69 @@ Gerenciador de tokens implementando ITokenManager.
 Gerencia tokens OAuth com cache e refresh automático.
 """
 
-from datetime import datetime, timezone
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 import pandas as pd
 import requests
 import os
+import threading
+import time
 
 from src.interfaces.credentials_repository_interface import (
     ICredentialsRepository,
 )
 from src.interfaces.token_manager_interface import ITokenManager
+from src.utils.config import settings
 from src.utils.log import log
+from src.utils.metrics import metrics
+
+# Espera máxima por um refresh em andamento em outro processo
+REFRESH_WAIT_SECONDS = 30.0
+# Intervalo entre releituras das credenciais durante a espera
+REFRESH_POLL_SECONDS = 0.5
+
+
+@dataclass(slots=True)
+class _CachedToken:
+    """Credenciais em cache, com a validade já convertida para epoch."""
+
+    access_token: str
+    expires_at: float
+    cred: Dict[str, Any]
+    # time.monotonic() de quando a entrada foi gravada
+    cached_at: float
+
+
+def _expiry_epoch(cred: Dict[str, Any]) -> Optional[float]:
+    """
+    Converte a validade das credenciais em epoch (segundos).
+
+    Retorna None se não houver access_token ou se a validade for inválida.
+    Datas sem fuso são tratadas como UTC.
+    """
+    if not cred.get("access_token"):
+        return None
+
+    validade = cred.get("validade", "")
+    if not validade:
+        return None
+
+    expiration = pd.to_datetime(validade, utc=True, errors="coerce")
+    if pd.isna(expiration):
+        return None
+    return expiration.timestamp()
 
 
 class TokenManager(ITokenManager):
-    """Gerenciador de tokens OAuth com cache e refresh automático."""
+    """
+    Gerenciador de tokens OAuth com cache e refresh automático.
+
+    Seguro para uso entre threads: a leitura de um token válido em cache não
+    usa lock; leitura do repositório e refresh são serializados por loja, e
+    threads que aguardavam o mesmo refresh reutilizam o token obtido.
+    """
 
     def __init__(
         self,
@@ -32,7 +79,16 @@ class TokenManager(ITokenManager):
             credentials_repository: Repositório de credenciais
         """
         self._credentials_repository = credentials_repository
-        self._token_cache: Dict[str, Dict[str, Any]] = {}
+        self._token_cache: Dict[str, _CachedToken] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, id: str) -> threading.Lock:
+        lock = self._locks.get(id)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(id, threading.Lock())
+        return lock
 
     def get_access_token(self, id: str, clear_cache: bool = False) -> Optional[str]:
         """
@@ -46,57 +102,132 @@ class TokenManager(ITokenManager):
             Token de acesso válido ou None quando indisponível
         """
 
-        try:
-            # Verifica cache primeiro, Se não estiver no cache, busca no repositório
-            if clear_cache and id in self._token_cache:
-                del self._token_cache[id]
-
-            if id in self._token_cache:
-                cred = self._token_cache[id]
-            else:
-                cred = self._credentials_repository.get_credentials(id)
+        # Caminho rápido: token em cache e ainda válido
+        if not clear_cache:
+            cached = self._token_cache.get(id)
+            if cached is not None and time.time() < cached.expires_at:
+                return cached.access_token
 
+        pedido = time.monotonic()
+        with self._lock_for(id):
+            cached = self._token_cache.get(id)
             if (
-                not cred
-                or not cred.get("refresh_token")
-                or cred.get("refresh_token") == ""
+                cached is not None
+                and time.time() < cached.expires_at
+                and (not clear_cache or cached.cached_at >= pedido)
             ):
-                log.info(f"Refresh token ausente para {id}, retornando None.")
-                return None
+                # Outra thread já obteve o token enquanto esta aguardava
+                return cached.access_token
+
+            try:
+                # Se não estiver no cache (ou expirou), busca no repositório
+                if clear_cache:
+                    self._token_cache.pop(id, None)
+                if cached is not None and not clear_cache:
+                    cred = cached.cred
+                else:
+                    cred = self._credentials_repository.get_credentials(id)
+
+                if (
+                    not cred
+                    or not cred.get("refresh_token")
+                    or cred.get("refresh_token") == ""
+                ):
+                    log.info(f"Refresh token ausente para {id}, retornando None.")
+                    return None
+
+                if self.is_token_invalid(cred):
+                    log.info(f"Token inválido para {id}, atualizando...")
+                    cred = self._refresh_coordenado(id, cred)
+
+                self._cache(id, cred)
+
+                return cred.get("access_token")
+
+            except Exception as e:
+                log.error(f"Erro ao obter token para {id}: {e}")
+                raise
+
+    def _cache(self, id: str, cred: Dict[str, Any]) -> None:
+        """Guarda as credenciais; tokens sem validade conhecida expiram já."""
+        expires_at = _expiry_epoch(cred)
+        self._token_cache[id] = _CachedToken(
+            access_token=cred.get("access_token") or "",
+            expires_at=expires_at if expires_at is not None else 0.0,
+            cred=cred,
+            cached_at=time.monotonic(),
+        )
+
+    def _refresh_coordenado(self, id: str, cred: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Atualiza o token com no máximo um refresh OAuth por loja entre processos.
+
+        O processo que consegue avançar token_version (compare-and-swap) de
+        par para ímpar faz o refresh e grava o resultado com a versão par
+        seguinte. Os demais aguardam e reutilizam o token gravado pelo
+        vencedor, se ainda válido; se o vencedor desistiu (versão par com
+        token vencido), voltam a disputar a vez. Um refresh ímpar parado por
+        mais de REFRESH_WAIT_SECONDS é assumido por quem estiver esperando.
+        """
+        versao_inicial = int(cred.get("token_version") or 0)
+        deadline = time.monotonic() + REFRESH_WAIT_SECONDS
+
+        while True:
+            versao = int(cred.get("token_version") or 0)
+            em_andamento = versao % 2 == 1
+            if not em_andamento or time.monotonic() >= deadline:
+                vez = versao + 2 if em_andamento else versao + 1
+                if self._credentials_repository.compare_and_set_token(id, versao, vez):
+                    novo = self._refresh_com_vez(id, cred, vez)
+                    if novo is not None:
+                        return novo
+                    deadline = time.monotonic() + REFRESH_WAIT_SECONDS
+            else:
+                time.sleep(REFRESH_POLL_SECONDS)
+
+            cred = self._credentials_repository.get_credentials(id)
+            versao = int(cred.get("token_version") or 0)
+            if versao > versao_inicial and versao % 2 == 0:
+                if not self.is_token_invalid(cred):
+                    log.info(f"Token de {id} atualizado por outro processo, reutilizando")
+                    metrics.inc("token_refresh_coordinated_total", result="reused")
+                    return cred
+                # O outro processo desistiu do refresh: a vez volta a ser disputada
+                metrics.inc("token_refresh_coordinated_total", result="stale")
+
+    def _refresh_com_vez(
+        self, id: str, cred: Dict[str, Any], vez: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Faz o refresh com a vez obtida.
 
-            if self.is_token_invalid(cred):
-                log.info(f"Token inválido para {id}, atualizando...")
-                cred = self.refresh_token(id, cred)
-                self._credentials_repository.save_token(id, cred)
+        Returns:
+            Novas credenciais, ou None se a vez foi assumida por outro processo
+        """
+        new_cred = self.refresh_token(id, cred)
 
-            self._token_cache[id] = cred
+        if not new_cred.get("access_token") or not new_cred.get("refresh_token"):
+            # Libera a vez sem sobrescrever os tokens gravados
+            self._credentials_repository.compare_and_set_token(id, vez, vez + 1)
+            metrics.inc("token_refresh_coordinated_total", result="failed")
+            return new_cred
 
-            return self._token_cache[id].get("access_token")
+        if self._credentials_repository.compare_and_set_token(
+            id, vez, vez + 1, new_cred
+        ):
+            log.info(f"Tokens atualizados para a loja {id}")
+            metrics.inc("token_refresh_coordinated_total", result="refreshed")
+            return {**new_cred, "token_version": vez + 1}
 
-        except Exception as e:
-            log.error(f"Erro ao obter token para {id}: {e}")
-            raise
+        log.warning(f"Refresh de {id} assumido por outro processo, relendo credenciais")
+        metrics.inc("token_refresh_coordinated_total", result="lost")
+        return None
 
     def is_token_invalid(self, cred: Dict[str, Any]) -> bool:
         """Retorna True quando o token está expirado ou com validade inválida."""
         try:
-            if (
-                cred.get("access_token", "") is None
-                or cred.get("access_token", "") == ""
-            ):
-                return True
-
-            validade = cred.get("validade", "")
-            if not validade:
-                return True
-
-            expiration = pd.to_datetime(validade, utc=True, errors="coerce")
-            if pd.isna(expiration):
-                return True
-
-            current_time = datetime.now(timezone.utc)
-
-            return current_time >= expiration.to_pydatetime()
+            expires_at = _expiry_epoch(cred)
+            return expires_at is None or time.time() >= expires_at
 
         except Exception as exc:
             log.warning(f"Falha ao validar expiração do token: {exc}")
@@ -114,8 +245,7 @@ class TokenManager(ITokenManager):
         """
 
         try:
-            if id in self._token_cache:
-                del self._token_cache[id]
+            self._token_cache.pop(id, None)
 
             headers = {
                 "accept": "application/json",
@@ -140,11 +270,14 @@ class TokenManager(ITokenManager):
                     )
                     return {"access_token": "", "refresh_token": "", "validade": ""}
 
+            started = time.perf_counter()
             response = requests.post(
-                "https://api.mercadolibre.com/oauth/token",
+                f"{settings.ml_api_url}/oauth/token",
                 headers=headers,
                 data=payload,
             )
+            metrics.observe("token_refresh_seconds", time.perf_counter() - started)
+            metrics.inc("token_refresh_total", status=str(response.status_code))
 
             response = response.json()
 
@@ -159,36 +292,60 @@ class TokenManager(ITokenManager):
             log.error(f"Erro ao fazer refresh do token para {id}: {e}")
             return {"access_token": "", "refresh_token": "", "validade": ""}
 
-    def force_refreshing_token(self, id: str) -> str:
+    def force_refreshing_token(self, id: str, stale_token: Optional[str] = None) -> str:
         """
         Força a atualização do token de acesso.
 
+        Se outro processo já tiver atualizado o token desde a leitura, o token
+        gravado por ele é reutilizado. Com stale_token, um token diferente e
+        válido, já obtido por outra thread ou gravado no repositório, também
+        é reutilizado.
+
         Args:
             id: Identificador da loja
+            stale_token: Token recusado pela API (opcional)
 
         Returns:
             Novo token de acesso
         """
-        try:
-            cred = self._credentials_repository.get_credentials(id)
-
-            new_cred = self.refresh_token(id, cred)
-
-            refresh_token = new_cred.get("refresh_token", "")
-            access_token = new_cred.get("access_token", "")
+        with self._lock_for(id):
+            cached = self._token_cache.get(id)
+            if (
+                stale_token
+                and cached is not None
+                and cached.access_token
+                and cached.access_token != stale_token
+            ):
+                return cached.access_token
 
-            if not refresh_token or not access_token:
-                log.error(
-                    f"Falha ao forçar refresh para {id}: tokens ausentes após tentativa."
-                )
-                return ""
+            try:
+                cred = self._credentials_repository.get_credentials(id)
+                if (
+                    stale_token
+                    and cred.get("access_token")
+                    and cred.get("access_token") != stale_token
+                    and not self.is_token_invalid(cred)
+                ):
+                    # Outro processo já gravou um token mais novo que o recusado
+                    self._cache(id, cred)
+                    return cred["access_token"]
+
+                new_cred = self._refresh_coordenado(id, cred)
+
+                refresh_token = new_cred.get("refresh_token", "")
+                access_token = new_cred.get("access_token", "")
+
+                if not refresh_token or not access_token:
+                    log.error(
+                        f"Falha ao forçar refresh para {id}: tokens ausentes após tentativa."
+                    )
+                    return ""
 
-            self._credentials_repository.save_token(id, new_cred)
-            self._token_cache[id] = new_cred
-            return access_token
-        except Exception as e:
-            log.error(f"Erro ao forçar refresh do token para {id}: {e}")
-            raise
+                self._cache(id, new_cred)
+                return access_token
+            except Exception as e:
+                log.error(f"Erro ao forçar refresh do token para {id}: {e}")
+                raise
 
     def _obtain_new_token(self, id: str) -> None:
         """
@@ -1,12 +1,13 @@
-import json
-from typing import Any, Dict
-import time
+from typing import Any, Dict, Optional
 import requests
 
+from src.utils.json_decoder import decode
 from src.utils.log import log
 
 
-def tratamento_de_resposta(resp: requests.Response) -> Dict[str, Any]:
+def tratamento_de_resposta(
+    resp: requests.Response, schema: Optional[type] = None
+) -> Dict[str, Any]:
     """
     Analisa a resposta HTTP e retorna um dicionário de controle:
     {
@@ -14,18 +15,21 @@ def tratamento_de_resposta(resp: requests.Response) -> Dict[str, Any]:
         'finished': bool,     # Se deve encerrar e retornar
         'response': dict      # O conteúdo da resposta
     }
+
+    O corpo é decodificado uma única vez; respostas 2xx com `schema` são
+    decodificadas direto para a dataclass informada.
     """
+    status = resp.status_code
+
     try:
-        resp_data = resp.json()
-    except (json.JSONDecodeError, ValueError):
+        resp_data = decode(resp.content, schema if 200 <= status < 300 else None)
+    except ValueError:
         resp_data = {"raw_content": resp.text}
 
-    status = resp.status_code
-
     if 200 <= status < 300:
         return {"retry": False, "refresh_token": False, "response": resp_data}
     if status == 401:
-        log.warning(f"Resposta 401 - Token pode estar expirado: {resp.json()}")
+        log.warning(f"Resposta 401 - Token pode estar expirado: {resp_data}")
         return {"retry": True, "refresh_token": True, "response": resp_data}
     if status == 429:
         return {"retry": True, "refresh_token": False, "response": resp_data}
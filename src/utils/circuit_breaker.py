@@ -0,0 +1,143 @@
+"""
+Circuit breaker por família de endpoint da API do Mercado Livre e do Supabase.
+
+- closed: chamadas passam; falhas seguidas são contadas.
+- open: após ML_BREAKER_FAILURES falhas seguidas, as chamadas falham na hora
+  com CircuitOpenError durante ML_BREAKER_COOLDOWN segundos.
+- half-open: passado o cooldown, uma única chamada de teste é liberada; se
+  der certo o circuito fecha, se falhar volta a abrir.
+
+Contam como falha respostas 429/5xx e erros de conexão; demais respostas
+(inclusive 4xx) indicam que o endpoint está respondendo.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.config import settings
+from src.utils.log import log
+from src.utils.metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada porque o circuito da família está aberto."""
+
+    def __init__(self, family: str, retry_in: float):
+        super().__init__(
+            f"Circuito aberto para {family}; nova tentativa em {retry_in:.0f}s"
+        )
+        self.family = family
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Estado do circuito de uma família de endpoints."""
+
+    def __init__(self, family: str, failure_threshold: int, cooldown: float):
+        """
+        Args:
+            family: Nome da família (rótulo nas métricas)
+            failure_threshold: Falhas seguidas para abrir (0 desativa)
+            cooldown: Segundos em aberto antes da chamada de teste
+        """
+        self.family = family
+        self._threshold = failure_threshold
+        self._cooldown = cooldown
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> None:
+        """Levanta CircuitOpenError se a chamada não puder ser feita agora."""
+        if self._threshold <= 0:
+            return
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self.state == OPEN and elapsed >= self._cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            retry_in = max(0.0, self._cooldown - elapsed)
+
+        metrics.inc("ml_circuit_rejected_total", endpoint=self.family)
+        raise CircuitOpenError(self.family, retry_in)
+
+    def record(self, success: Optional[bool]) -> None:
+        """
+        Registra o resultado de uma chamada liberada por before_call.
+
+        Deve ser chamado para toda chamada liberada; None (erro antes de a
+        requisição chegar ao endpoint) apenas libera a chamada de teste.
+        """
+        if self._threshold <= 0:
+            return
+        with self._lock:
+            if success is None:
+                self._probing = False
+                return
+            if success:
+                if self.state != CLOSED:
+                    log.info(f"Circuito de {self.family} fechado")
+                self.state = CLOSED
+                self._failures = 0
+                self._probing = False
+                return
+
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self._threshold:
+                if self.state != OPEN:
+                    log.warning(
+                        f"Circuito de {self.family} aberto após {self._failures} "
+                        f"falhas seguidas (cooldown de {self._cooldown:.0f}s)"
+                    )
+                    metrics.inc("ml_circuit_opened_total", endpoint=self.family)
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class CircuitBreakerRegistry:
+    """Circuitos criados sob demanda, um por família de endpoint."""
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+    ):
+        """
+        Args:
+            failure_threshold: Falhas seguidas para abrir (padrão: ML_BREAKER_FAILURES)
+            cooldown: Segundos em aberto (padrão: ML_BREAKER_COOLDOWN)
+        """
+        self._threshold = (
+            failure_threshold
+            if failure_threshold is not None
+            else settings.ml_breaker_failures
+        )
+        self._cooldown = cooldown if cooldown is not None else settings.ml_breaker_cooldown
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    family, CircuitBreaker(family, self._threshold, self._cooldown)
+                )
+        return breaker
+
+    def stats(self) -> Dict[str, str]:
+        """Estado atual de cada família já usada."""
+        return {family: b.state for family, b in self._breakers.items()}
@@ -0,0 +1,87 @@
+"""
+Agrupamento de chamadas idênticas em andamento (single-flight).
+
+A primeira thread a pedir uma chave executa a chamada; as que pedirem a
+mesma chave antes do fim aguardam e recebem uma cópia do resultado (ou a
+mesma exceção), sem repetir a requisição.
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.utils.metrics import metrics
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class RequestCoalescer:
+    """Executa no máximo uma chamada por chave ao mesmo tempo."""
+
+    def __init__(self, metric: str = "coalesced_calls_total") -> None:
+        """
+        Args:
+            metric: Contador incrementado a cada chamada agrupada
+        """
+        self._metric = metric
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._leaders = 0
+        self._followers = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], **labels: str) -> Any:
+        """
+        Executa fn, ou aguarda a execução em andamento para a mesma chave.
+
+        Havendo seguidores, cada chamador recebe uma cópia profunda do
+        resultado, pois os modelos decodificados são mutáveis.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self._followers += 1
+                leader = False
+
+        if not leader:
+            metrics.inc(self._metric, **labels)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        # O original fica intacto para as cópias dos seguidores
+        if call.followers:
+            return copy.deepcopy(call.result)
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Chamadas executadas (leaders) e agrupadas (followers)."""
+        with self._lock:
+            return {
+                "leaders": self._leaders,
+                "followers": self._followers,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,293 @@
+"""
+Configurações de execução lidas das variáveis de ambiente.
+
+Centraliza os parâmetros ajustáveis por deployment (pool de conexões,
+timeouts etc.) para que a factory e os serviços não leiam o ambiente
+de forma espalhada.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "sim")
+
+
+@dataclass(frozen=True)
+class Settings:
+    # Supabase / PostgREST
+    supabase_pool_size: int = 10
+    supabase_keepalive_expiry: float = 30.0
+    supabase_connect_timeout: float = 5.0
+    supabase_timeout: float = 30.0
+    # Registros por requisição de insert/upsert
+    supabase_insert_batch: int = 5000
+    # HTTP/2 no cliente httpx do Supabase e corpos de insert/upsert em gzip
+    # (o gateway precisa aceitar Content-Encoding: gzip)
+    supabase_http2: bool = False
+    supabase_gzip_inserts: bool = False
+    # Circuit breaker das chamadas ao Supabase: falhas seguidas (429/5xx/conexão)
+    # para abrir (0 desativa) e segundos em aberto antes de testar de novo
+    supabase_breaker_failures: int = 5
+    supabase_breaker_cooldown: float = 30.0
+
+    # API do Mercado Livre (sobrescrita apenas para o stand-in local de benchmark)
+    ml_api_url: str = "https://api.mercadolibre.com"
+    # Transporte HTTP do cliente: "requests" (HTTP/1.1, sessão por thread) ou
+    # "httpx" (cliente único compartilhado, com HTTP/2 se ml_http2)
+    ml_http_backend: str = "requests"
+    ml_http2: bool = True
+    ml_http_pool_size: int = 20
+
+    # Tamanho de página de /orders/search (a API aceita até 51)
+    ml_orders_page_limit: int = 51
+    # Páginas de pedidos em espera entre a busca e a gravação de vendas
+    ml_pipeline_queue: int = 32
+    # Trava de gravação de sales_ml por loja entre processos (sales_ml_travas):
+    # validade de cada posse e espera máxima para obtê-la, em segundos
+    sales_lock_ttl: float = 300.0
+    sales_lock_wait: float = 600.0
+
+    # Máximo de requisições por segundo à API, somando todas as threads (0 = sem limite)
+    ml_rate_limit: float = 0.0
+    # Agrupa GETs idênticos feitos ao mesmo tempo por threads diferentes
+    ml_coalesce_gets: bool = True
+    # Circuit breaker por família de endpoint: falhas seguidas (429/5xx/conexão)
+    # para abrir (0 desativa) e segundos em aberto antes de testar de novo
+    ml_breaker_failures: int = 5
+    ml_breaker_cooldown: float = 60.0
+
+    # Execução da sincronização:
+    # - sync_mode: "incremental" (reaproveita dias de ads finalizados e sonda
+    #   os dias de vendas sem alteração) ou "full"
+    # - write_backend: "supabase" ou "none" (apenas staging, sem gravar no banco)
+    # - sync_workers: lojas sincronizadas em paralelo
+    sync_mode: str = "incremental"
+    write_backend: str = "supabase"
+    sync_workers: int = 1
+
+    # Fuso dos date_created de /orders/search: as vendas são gravadas por dia
+    # nesse fuso e a busca usa os mesmos limites de dia
+    ml_orders_utc_offset: str = "-04:00"
+    # Dias após os quais um pedido não muda mais (cancelamentos, devoluções,
+    # reclamações e pagamentos tardios); só pedidos mais antigos vêm do cache
+    ml_orders_final_days: int = 180
+
+    # Sondagem de vendas no modo incremental (contagens em sales_ml_contagem):
+    # lê o total de pedidos de cada bloco de dias com limit=1 e só rebusca os
+    # dias cujo total difere do gravado. Os últimos dias são sempre buscados,
+    # pois alterações que não mudam a quantidade de pedidos não são detectadas.
+    # Desativada por padrão: requer a tabela de sql/sales_ml_contagem.sql
+    sales_probe: bool = False
+    sales_probe_recent_days: int = 2
+    sales_probe_bucket_days: int = 7
+    sales_probe_workers: int = 4
+
+    # Prazo do sync de várias lojas, em segundos desde o início do processo
+    # (0 = sem prazo; no Cloud Run, o timeout do job). Uma loja só começa se a
+    # duração estimada couber no tempo restante menos a reserva para gravações
+    # e registro do histórico; sem histórico nem tamanho, vale o custo padrão
+    sync_deadline: float = 0.0
+    sync_deadline_reserve: float = 300.0
+    sync_default_cost: float = 60.0
+
+    # Modo daemon: intervalo entre syncs de cada loja (segundos), releitura
+    # da lista de lojas com --all-sellers e endpoint de controle (porta 0 desativa)
+    daemon_sales_interval: float = 900.0
+    daemon_ads_interval: float = 3600.0
+    daemon_sellers_refresh: float = 600.0
+    daemon_host: str = "127.0.0.1"
+    daemon_port: int = 8080
+    # Token exigido pelas rotas de controle (obrigatório fora do loopback)
+    daemon_token: Optional[str] = None
+
+    # Notificações orders_v2 (callback POST /notifications): pedidos por lote,
+    # espera máxima para completar um lote e pedidos buscados em paralelo
+    ml_webhooks: bool = False
+    ml_webhook_batch: int = 50
+    ml_webhook_linger: float = 1.0
+    ml_webhook_workers: int = 4
+    # Pedidos cuja busca falhou após o 200 ficam em ml_notificacoes_pendentes
+    # e são buscados de novo a cada intervalo, até o máximo de tentativas
+    ml_webhook_retry_interval: float = 300.0
+    ml_webhook_max_attempts: int = 5
+
+    # Cache de respostas da API do Mercado Livre (desativado sem diretório)
+    ml_cache_dir: Optional[str] = None
+    ml_cache_max_mb: int = 512
+    # Segundos em que respostas de janelas já finais (ads antes da janela de
+    # atribuição, pedidos mais antigos que ML_ORDERS_FINAL_DAYS) são servidas
+    # do cache sem revalidação
+    ml_cache_final_ttl: float = 86400.0
+
+    # Enriquecimento de vendas via /items?ids= (cache SQLite compartilhado;
+    # sem caminho o cache vale apenas para o processo)
+    ml_enrich_items: bool = False
+    ml_items_cache_path: Optional[str] = None
+    ml_items_cache_ttl: float = 86400.0
+    ml_items_workers: int = 4
+
+    # Agregados diários (sales_ml_diario, ads_ml_diario) dos dias regravados
+    daily_rollups: bool = False
+
+    # Staging em Parquet dos lotes coletados (desativado sem diretório)
+    staging_dir: Optional[str] = None
+
+    # Destino das métricas: "prometheus:<arquivo>", "json:<arquivo>" ou "json"
+    metrics_sink: Optional[str] = None
+
+    # Dias em que as métricas de ads ainda podem mudar (janela de atribuição)
+    ads_attribution_days: int = 7
+
+    # Requisita métricas apenas de MLBs com anúncio ativo ou com atividade
+    # na janela (listagem de anúncios do anunciante); opcionalmente apenas
+    # dos que também tiveram vendas na janela
+    ads_prefilter: bool = True
+    ads_only_sold_in_window: bool = False
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Monta as configurações a partir das variáveis de ambiente."""
+        return cls(
+            supabase_pool_size=_env_int("SUPABASE_POOL_SIZE", cls.supabase_pool_size),
+            supabase_keepalive_expiry=_env_float(
+                "SUPABASE_KEEPALIVE_EXPIRY", cls.supabase_keepalive_expiry
+            ),
+            supabase_connect_timeout=_env_float(
+                "SUPABASE_CONNECT_TIMEOUT", cls.supabase_connect_timeout
+            ),
+            supabase_timeout=_env_float("SUPABASE_TIMEOUT", cls.supabase_timeout),
+            supabase_insert_batch=_env_int(
+                "SUPABASE_INSERT_BATCH", cls.supabase_insert_batch
+            ),
+            supabase_http2=_env_bool("SUPABASE_HTTP2", cls.supabase_http2),
+            supabase_gzip_inserts=_env_bool(
+                "SUPABASE_GZIP_INSERTS", cls.supabase_gzip_inserts
+            ),
+            supabase_breaker_failures=_env_int(
+                "SUPABASE_BREAKER_FAILURES", cls.supabase_breaker_failures
+            ),
+            supabase_breaker_cooldown=_env_float(
+                "SUPABASE_BREAKER_COOLDOWN", cls.supabase_breaker_cooldown
+            ),
+            ml_api_url=os.environ.get("ML_API_URL") or cls.ml_api_url,
+            ml_http_backend=os.environ.get("ML_HTTP_BACKEND") or cls.ml_http_backend,
+            ml_http2=_env_bool("ML_HTTP2", cls.ml_http2),
+            ml_http_pool_size=_env_int("ML_HTTP_POOL_SIZE", cls.ml_http_pool_size),
+            ml_orders_page_limit=_env_int(
+                "ML_ORDERS_PAGE_LIMIT", cls.ml_orders_page_limit
+            ),
+            ml_pipeline_queue=_env_int("ML_PIPELINE_QUEUE", cls.ml_pipeline_queue),
+            sales_lock_ttl=_env_float("ML_SALES_LOCK_TTL", cls.sales_lock_ttl),
+            sales_lock_wait=_env_float("ML_SALES_LOCK_WAIT", cls.sales_lock_wait),
+            ml_rate_limit=_env_float("ML_RATE_LIMIT", cls.ml_rate_limit),
+            ml_coalesce_gets=_env_bool("ML_COALESCE_GETS", cls.ml_coalesce_gets),
+            ml_breaker_failures=_env_int(
+                "ML_BREAKER_FAILURES", cls.ml_breaker_failures
+            ),
+            ml_breaker_cooldown=_env_float(
+                "ML_BREAKER_COOLDOWN", cls.ml_breaker_cooldown
+            ),
+            sync_mode=os.environ.get("ML_SYNC_MODE") or cls.sync_mode,
+            write_backend=os.environ.get("ML_WRITE_BACKEND") or cls.write_backend,
+            sync_workers=_env_int("ML_SYNC_WORKERS", cls.sync_workers),
+            ml_orders_utc_offset=os.environ.get("ML_ORDERS_UTC_OFFSET")
+            or cls.ml_orders_utc_offset,
+            ml_orders_final_days=_env_int(
+                "ML_ORDERS_FINAL_DAYS", cls.ml_orders_final_days
+            ),
+            sales_probe=_env_bool("ML_SALES_PROBE", cls.sales_probe),
+            sales_probe_recent_days=_env_int(
+                "ML_SALES_PROBE_RECENT_DAYS", cls.sales_probe_recent_days
+            ),
+            sales_probe_bucket_days=_env_int(
+                "ML_SALES_PROBE_BUCKET", cls.sales_probe_bucket_days
+            ),
+            sales_probe_workers=_env_int(
+                "ML_SALES_PROBE_WORKERS", cls.sales_probe_workers
+            ),
+            sync_deadline=_env_float("ML_SYNC_DEADLINE", cls.sync_deadline),
+            sync_deadline_reserve=_env_float(
+                "ML_SYNC_DEADLINE_RESERVE", cls.sync_deadline_reserve
+            ),
+            sync_default_cost=_env_float("ML_SYNC_DEFAULT_COST", cls.sync_default_cost),
+            daemon_sales_interval=_env_float(
+                "ML_DAEMON_SALES_INTERVAL", cls.daemon_sales_interval
+            ),
+            daemon_ads_interval=_env_float(
+                "ML_DAEMON_ADS_INTERVAL", cls.daemon_ads_interval
+            ),
+            daemon_sellers_refresh=_env_float(
+                "ML_DAEMON_SELLERS_REFRESH", cls.daemon_sellers_refresh
+            ),
+            daemon_host=os.environ.get("ML_DAEMON_HOST") or cls.daemon_host,
+            daemon_port=_env_int("ML_DAEMON_PORT", cls.daemon_port),
+            daemon_token=os.environ.get("ML_DAEMON_TOKEN") or None,
+            ml_webhooks=_env_bool("ML_WEBHOOKS", cls.ml_webhooks),
+            ml_webhook_batch=_env_int("ML_WEBHOOK_BATCH", cls.ml_webhook_batch),
+            ml_webhook_linger=_env_float("ML_WEBHOOK_LINGER", cls.ml_webhook_linger),
+            ml_webhook_workers=_env_int("ML_WEBHOOK_WORKERS", cls.ml_webhook_workers),
+            ml_webhook_retry_interval=_env_float(
+                "ML_WEBHOOK_RETRY_INTERVAL", cls.ml_webhook_retry_interval
+            ),
+            ml_webhook_max_attempts=_env_int(
+                "ML_WEBHOOK_MAX_ATTEMPTS", cls.ml_webhook_max_attempts
+            ),
+            ml_cache_dir=os.environ.get("ML_CACHE_DIR") or None,
+            ml_cache_max_mb=_env_int("ML_CACHE_MAX_MB", cls.ml_cache_max_mb),
+            ml_cache_final_ttl=_env_float(
+                "ML_CACHE_FINAL_TTL", cls.ml_cache_final_ttl
+            ),
+            ml_enrich_items=_env_bool("ML_ENRICH_ITEMS", cls.ml_enrich_items),
+            ml_items_cache_path=os.environ.get("ML_ITEMS_CACHE") or None,
+            ml_items_cache_ttl=_env_float(
+                "ML_ITEMS_CACHE_TTL", cls.ml_items_cache_ttl
+            ),
+            ml_items_workers=_env_int("ML_ITEMS_WORKERS", cls.ml_items_workers),
+            daily_rollups=_env_bool("ML_DAILY_ROLLUPS", cls.daily_rollups),
+            staging_dir=os.environ.get("ML_STAGING_DIR") or None,
+            metrics_sink=os.environ.get("METRICS_SINK") or None,
+            ads_attribution_days=_env_int(
+                "ADS_ATTRIBUTION_DAYS", cls.ads_attribution_days
+            ),
+            ads_prefilter=_env_bool("ADS_PREFILTER", cls.ads_prefilter),
+            ads_only_sold_in_window=_env_bool(
+                "ADS_ONLY_SOLD_IN_WINDOW", cls.ads_only_sold_in_window
+            ),
+        )
+
+
+settings = Settings.from_env()
+
+
+def configurar(**valores: Any) -> None:
+    """
+    Sobrescreve campos de `settings` no processo atual (usado pela CLI).
+
+    Os módulos guardam a mesma instância, então a alteração vale para todos.
+    Campos lidos na criação de objetos (cache, sink de métricas) só têm
+    efeito se alterados antes da factory criá-los.
+    """
+    for nome, valor in valores.items():
+        if nome not in Settings.__dataclass_fields__:
+            raise ValueError(f"Configuração desconhecida: {nome}")
+        object.__setattr__(settings, nome, valor)
@@ -19,3 +19,21 @@ def get_periodo_ultimos_dias(dias: int = 2):
     data_anterior = (hoje - timedelta(days=dias)).strftime("%Y-%m-%d")
     data_posterior = hoje.strftime("%Y-%m-%d")
     return data_anterior, data_posterior
+
+
+def somar_dias(data: str, dias: int) -> str:
+    """
+    Soma (ou subtrai, se negativo) dias a uma data no formato YYYY-MM-DD.
+    """
+    return (datetime.strptime(data, "%Y-%m-%d") + timedelta(days=dias)).strftime(
+        "%Y-%m-%d"
+    )
+
+
+def get_data_corte(dias: int) -> str:
+    """
+    Retorna o primeiro dia ainda "aberto" de uma janela de atribuição.
+
+    Dias anteriores à data retornada são considerados finais.
+    """
+    return (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d")
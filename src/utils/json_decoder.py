@@ -0,0 +1,109 @@
+"""
+Decodificação de JSON com caminho rápido.
+
+- Com msgspec, respostas com esquema são decodificadas direto para as
+  dataclasses de src.models, sem materializar dicionários.
+- Com orjson, a decodificação genérica usa orjson.
+- Sem nenhum dos dois, usa o json da biblioteca padrão (mais lento).
+
+Os dois pacotes são dependências do projeto (pyproject.toml); o caminho
+com a biblioteca padrão só é usado em ambientes instalados sem eles.
+"""
+
+import dataclasses
+import json
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Optional, Type, TypeVar, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - ambiente sem as dependências
+    msgspec = None  # type: ignore
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - ambiente sem as dependências
+    orjson = None  # type: ignore
+
+from src.utils.log import log
+
+T = TypeVar("T")
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """Decodifica JSON genérico. Lança ValueError se o conteúdo for inválido."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def decode(content: Union[bytes, str], schema: Optional[Type[T]] = None) -> Any:
+    """
+    Decodifica o conteúdo, opcionalmente para o esquema informado.
+
+    Args:
+        content: Corpo da resposta
+        schema: Dataclass de destino (opcional)
+
+    Returns:
+        Instância do esquema ou o objeto JSON genérico
+
+    Raises:
+        ValueError: Se o conteúdo não for JSON válido
+    """
+    if schema is None:
+        return loads(content)
+
+    if msgspec is not None:
+        try:
+            return _msgspec_decoder(schema).decode(content)
+        except msgspec.ValidationError as e:
+            log.warning(
+                f"Resposta fora do esquema {getattr(schema, '__name__', schema)}: {e}"
+            )
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return convert(loads(content), schema)
+
+
+def convert(value: Any, schema: Any) -> Any:
+    """
+    Converte um objeto JSON genérico para o esquema, de forma tolerante.
+
+    Campos ausentes recebem o valor padrão e campos extras são ignorados.
+    """
+    if value is None:
+        return None
+
+    origin = typing.get_origin(schema)
+    if origin is Union:
+        args = [a for a in typing.get_args(schema) if a is not type(None)]
+        return convert(value, args[0]) if len(args) == 1 else value
+    if origin is list:
+        (item_type,) = typing.get_args(schema)
+        return [convert(v, item_type) for v in value] if isinstance(value, list) else []
+    if dataclasses.is_dataclass(schema) and isinstance(schema, type):
+        if not isinstance(value, dict):
+            return schema()
+        hints = _type_hints(schema)
+        return schema(
+            **{
+                name: convert(value[name], hint)
+                for name, hint in hints.items()
+                if name in value
+            }
+        )
+    return value
+
+
+@lru_cache(maxsize=None)
+def _type_hints(schema: type) -> Dict[str, Any]:
+    names = {f.name for f in dataclasses.fields(schema)}
+    return {k: v for k, v in typing.get_type_hints(schema).items() if k in names}
+
+
+@lru_cache(maxsize=None)
+def _msgspec_decoder(schema: type) -> Any:
+    return msgspec.json.Decoder(schema)  # type: ignore
@@ -0,0 +1,105 @@
+"""
+Registro de métricas em memória (contadores e histogramas).
+
+Uso semelhante ao `log`: o objeto `metrics` é compartilhado pelo processo e
+os sinks configurados na factory exportam o conteúdo ao final da execução.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, limit in enumerate(self.buckets):
+            if value <= limit:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """Contadores e histogramas rotulados, seguros para uso entre threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self.enabled = False
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Incrementa um contador."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Registra uma observação em um histograma."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(DEFAULT_BUCKETS)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Mede a duração do bloco e registra no histograma informado."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """
+        Retorna uma cópia serializável das métricas.
+
+        Returns:
+            Dicionário com as listas "counters" e "histograms"
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in self._counters.items()
+                for key, value in series.items()
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(key),
+                    "buckets": list(h.buckets),
+                    "counts": list(h.counts),
+                    "sum": h.sum,
+                    "count": h.count,
+                }
+                for name, series in self._histograms.items()
+                for key, h in series.items()
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def reset(self) -> None:
+        """Descarta todas as métricas registradas."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
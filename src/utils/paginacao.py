@@ -0,0 +1,173 @@
+"""
+Paginação adaptativa de /orders/search.
+
+- Usa o maior limit aceito pela API (ML_ORDERS_PAGE_LIMIT, 51 por padrão),
+  voltando para 50 se a API rejeitar o valor configurado.
+- A API não aceita offset >= 10000. Janelas com mais pedidos que isso são
+  divididas antes da paginação, com limites escolhidos pela densidade
+  observada (total da janela / duração), em vez de reiniciar a busca a
+  partir do date_created do último pedido.
+- Janelas vizinhas compartilham o segundo de fronteira; pedidos repetidos
+  são descartados pelo id.
+"""
+
+import math
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+from src.models.mercado_livre import OrderSearchResponse
+from src.utils.config import settings
+from src.utils.log import log
+
+# Maior offset aceito pela API é MAX_OFFSET - 1
+MAX_OFFSET = 10000
+# Limit aceito por todas as versões de /orders/search
+LIMITE_SEGURO = 50
+# Fração de MAX_OFFSET mirada ao dividir uma janela densa
+OCUPACAO_JANELA = 0.8
+
+# (início, fim, offset, limit) -> página ou None em caso de erro
+BuscarPagina = Callable[[datetime, datetime, int, int], Optional[OrderSearchResponse]]
+
+
+def formatar_instante(instante: datetime) -> str:
+    """Formata o instante em UTC no formato aceito pelos filtros de data."""
+    return instante.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class PaginadorPedidos:
+    """Percorre /orders/search por janelas de data, sem repetir pedidos."""
+
+    def __init__(
+        self,
+        buscar: BuscarPagina,
+        limite: Optional[int] = None,
+        max_offset: int = MAX_OFFSET,
+        max_falhas: int = 3,
+    ):
+        """
+        Args:
+            buscar: Função que requisita uma página da busca
+            limite: Tamanho de página inicial (padrão: settings)
+            max_offset: Limite de offset da API
+            max_falhas: Falhas seguidas toleradas em uma mesma página
+        """
+        self._buscar = buscar
+        self.limite = limite or settings.ml_orders_page_limit
+        self._max_offset = max_offset
+        self._max_falhas = max_falhas
+        self._limite_confirmado = False
+        self._vistos: Set[int] = set()
+
+        self.requisicoes = 0
+        self.janelas = 0
+        self.duplicados = 0
+        # False se a iteração foi interrompida por falha da API ou se uma
+        # janela indivisível não pôde ser lida inteira
+        self.completo = True
+
+    def paginas(self, inicio: datetime, fim: datetime) -> Iterator[OrderSearchResponse]:
+        """
+        Retorna as páginas do período, em ordem de data.
+
+        Os results de cada página já vêm sem pedidos vistos anteriormente.
+        Em caso de falha persistente a iteração termina (o erro é registrado).
+        """
+        pendentes = deque([(inicio, fim)])
+
+        while pendentes:
+            de, ate = pendentes.popleft()
+            primeira = self._pagina(de, ate, 0)
+            if primeira is None:
+                self.completo = False
+                return
+
+            total = primeira.paging.total
+            if total > self._max_offset:
+                janelas = self._dividir(de, ate, total)
+                if janelas:
+                    pendentes.extendleft(reversed(janelas))
+                    continue
+                # Ler só os primeiros pedidos regravaria o dia incompleto: a
+                # iteração termina e esse dia e os seguintes mantêm as vendas gravadas
+                log.error(
+                    f"Janela {formatar_instante(de)} com {total} pedidos não pode ser "
+                    f"dividida nem lida inteira (limite de {self._max_offset})"
+                )
+                self.completo = False
+                return
+
+            self.janelas += 1
+            # Conta antes de descartar os repetidos da fronteira
+            offset = len(primeira.results)
+            yield self._sem_repetidos(primeira)
+
+            while offset < min(total, self._max_offset):
+                pagina = self._pagina(de, ate, offset)
+                if pagina is None:
+                    self.completo = False
+                    return
+                if not pagina.results:
+                    break
+                offset += len(pagina.results)
+                yield self._sem_repetidos(pagina)
+
+    def _dividir(
+        self, de: datetime, ate: datetime, total: int
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Divide a janela em partes com cerca de OCUPACAO_JANELA * max_offset pedidos.
+
+        As partes são alinhadas ao segundo e incluem o segundo de fronteira
+        nas duas pontas; retorna [] se a janela não puder ser dividida.
+        """
+        duracao = (ate - de).total_seconds()
+        if duracao < 2:
+            return []
+        partes = math.ceil(total / (self._max_offset * OCUPACAO_JANELA))
+        passo = max(1, int(duracao // partes))
+
+        janelas = []
+        atual = de
+        while atual < ate:
+            proximo = min(atual + timedelta(seconds=passo), ate)
+            janelas.append((atual, proximo))
+            atual = proximo
+        return janelas
+
+    def _pagina(
+        self, de: datetime, ate: datetime, offset: int
+    ) -> Optional[OrderSearchResponse]:
+        falhas = 0
+        while falhas < self._max_falhas:
+            self.requisicoes += 1
+            pagina = self._buscar(de, ate, offset, self.limite)
+            if isinstance(pagina, OrderSearchResponse):
+                self._limite_confirmado = True
+                return pagina
+
+            if not self._limite_confirmado and self.limite > LIMITE_SEGURO:
+                log.warning(
+                    f"limit={self.limite} rejeitado em /orders/search; usando {LIMITE_SEGURO}"
+                )
+                self.limite = LIMITE_SEGURO
+                continue
+            falhas += 1
+
+        log.error(
+            f"Falha ao buscar pedidos em {formatar_instante(de)}..{formatar_instante(ate)} "
+            f"(offset {offset}) após {self._max_falhas} tentativas"
+        )
+        return None
+
+    def _sem_repetidos(self, pagina: OrderSearchResponse) -> OrderSearchResponse:
+        novos = []
+        for pedido in pagina.results:
+            if pedido.id in self._vistos:
+                self.duplicados += 1
+                continue
+            self._vistos.add(pedido.id)
+            novos.append(pedido)
+        pagina.results = novos
+        return pagina
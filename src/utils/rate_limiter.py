@@ -0,0 +1,51 @@
+"""
+Limitador de taxa (token bucket) compartilhado entre threads.
+
+A taxa é lida de `settings.ml_rate_limit` a cada chamada, de modo que a
+CLI pode ajustá-la mesmo depois de o cliente ter sido criado.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from src.utils.config import settings
+from src.utils.metrics import metrics
+
+
+class RateLimiter:
+    """Token bucket com capacidade de um segundo de requisições."""
+
+    def __init__(self, rate: Optional[float] = None):
+        """
+        Args:
+            rate: Requisições por segundo (padrão: ML_RATE_LIMIT; 0 desativa)
+        """
+        self._rate = rate
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self._rate if self._rate is not None else settings.ml_rate_limit
+
+    def acquire(self) -> None:
+        """Bloqueia até haver uma ficha disponível."""
+        while True:
+            rate = self.rate
+            if rate <= 0:
+                return
+
+            with self._lock:
+                now = time.monotonic()
+                capacity = max(1.0, rate)
+                self._tokens = min(capacity, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / rate
+
+            metrics.observe("ml_rate_limit_wait_seconds", wait)
+            time.sleep(wait)
@@ -0,0 +1,81 @@
+"""
+Travas de gravação de sales_ml por loja.
+
+A sincronização por janela (SalesWriter) e o receptor de notificações
+(OrderNotificationService) regravam linhas de sales_ml da mesma loja. Cada
+exclusão seguida de inserção é feita com a trava da loja, para que uma
+não intercale a outra e duplique ou perca pedidos.
+
+A trava tem duas camadas: uma threading.Lock por loja, para as threads do
+processo, e, com repositório, uma posse em sales_ml_travas compartilhada
+entre processos (o job de sync e o receptor rodam separados). A posse vale
+ML_SALES_LOCK_TTL segundos, para que a trava de um processo encerrado no
+meio da gravação expire sozinha.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from src.interfaces.credentials_repository_interface import ICredentialsRepository
+from src.utils.config import settings
+from src.utils.log import log
+from src.utils.metrics import metrics
+
+_guarda = threading.Lock()
+_travas_vendas: Dict[str, threading.Lock] = {}
+
+# Dono das posses deste processo em sales_ml_travas
+_DONO = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _trava_local(id: str) -> threading.Lock:
+    with _guarda:
+        trava = _travas_vendas.get(id)
+        if trava is None:
+            trava = _travas_vendas[id] = threading.Lock()
+        return trava
+
+
+@contextmanager
+def trava_vendas(
+    id: str, repository: Optional[ICredentialsRepository] = None
+) -> Iterator[None]:
+    """
+    Mantém a trava de gravação de sales_ml da loja durante o bloco.
+
+    Args:
+        id: Loja
+        repository: Repositório da trava entre processos (None = só no processo)
+
+    Raises:
+        TimeoutError: Se a trava não for obtida em ML_SALES_LOCK_WAIT segundos
+    """
+    with _trava_local(id):
+        if repository is None:
+            yield
+            return
+
+        started = time.monotonic()
+        espera = 0.05
+        while not repository.acquire_sales_lock(id, _DONO, settings.sales_lock_ttl):
+            if time.monotonic() - started >= settings.sales_lock_wait:
+                raise TimeoutError(
+                    f"Trava de vendas de {id} não obtida em {settings.sales_lock_wait:.0f}s"
+                )
+            time.sleep(espera)
+            espera = min(espera * 2, 1.0)
+        metrics.observe("sales_lock_wait_seconds", time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            try:
+                repository.release_sales_lock(id, _DONO)
+            except Exception as e:
+                # A posse expira sozinha após ML_SALES_LOCK_TTL
+                log.warning(f"Trava de vendas de {id} não liberada: {e}")
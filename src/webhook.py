@@ -0,0 +1,126 @@
+"""
+Receptor de notificações do Mercado Livre (`python -m src webhook`).
+
+Recebe os callbacks do tópico orders_v2 em POST /notifications, responde
+200 imediatamente (o Mercado Livre reenvia notificações sem resposta rápida)
+e deixa a busca e a gravação dos pedidos com o OrderNotificationService.
+
+    POST /notifications   corpo JSON da notificação
+    GET  /healthz         200 enquanto o receptor está ativo
+    GET  /stats           contadores de notificações e pedidos processados
+
+A mesma rota é servida pelo endpoint do daemon com --webhooks.
+"""
+
+import argparse
+import json
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.interfaces.order_notification_interface import IOrderNotificationService
+from src.utils.config import configurar, settings
+from src.utils.log import log
+
+NOTIFICATIONS_PATH = "/notifications"
+
+
+def receber_notificacao(
+    service: IOrderNotificationService, body: bytes
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Enfileira a notificação recebida no callback.
+
+    Returns:
+        (status HTTP, corpo JSON da resposta)
+    """
+    try:
+        notification = json.loads(body or b"null")
+    except ValueError:
+        return 400, {"erro": "JSON inválido"}
+    if not isinstance(notification, dict):
+        return 400, {"erro": "notificação deve ser um objeto JSON"}
+    return 200, {"status": service.enqueue(notification)}
+
+
+def criar_servidor_webhook(
+    service: IOrderNotificationService, host: str, port: int
+) -> ThreadingHTTPServer:
+    """Cria o servidor HTTP do receptor (não o inicia)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, body: Any) -> None:
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self) -> None:
+            path = urlsplit(self.path).path
+            if path == "/healthz":
+                self._send(200, {"status": "ok"})
+            elif path == "/stats":
+                self._send(200, service.stats())
+            else:
+                self._send(404, {"erro": "não encontrado"})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b""
+            if urlsplit(self.path).path != NOTIFICATIONS_PATH:
+                self._send(404, {"erro": "não encontrado"})
+                return
+            self._send(*receber_notificacao(service, body))
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def run_webhook(args: argparse.Namespace, sellers: Optional[list] = None) -> int:
+    opcoes = {
+        "write_backend": args.write_backend,
+        "ml_rate_limit": args.rate_limit,
+        "ml_http_backend": args.http_backend,
+        "daemon_host": args.host,
+        "daemon_port": args.port,
+    }
+    configurar(**{nome: valor for nome, valor in opcoes.items() if valor is not None})
+
+    from src import api, factory
+
+    service = factory.create_order_notification_service(api, sellers=sellers)
+    servidor = criar_servidor_webhook(service, settings.daemon_host, settings.daemon_port)
+    parar = threading.Event()
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sinal, lambda *_: parar.set())
+
+    threading.Thread(
+        target=servidor.serve_forever, name="webhook", daemon=True
+    ).start()
+    log.info(
+        f"Webhook: recebendo notificações em http://{settings.daemon_host}:"
+        f"{servidor.server_port}{NOTIFICATIONS_PATH}"
+    )
+
+    while not parar.wait(1.0):
+        pass
+
+    # Para de receber antes de esvaziar a fila
+    servidor.shutdown()
+    servidor.server_close()
+    service.close()
+    log.info(f"Webhook encerrado: {service.stats()}")
+    api.close()
+    factory.close()
+    return 0
@@ -17,6 +17,10 @@ provider "google" {
   region  = var.region
 }
 
+locals {
+  task_timeout_seconds = 3600 // Tempo limite da tarefa; também é o prazo do sync (ML_SYNC_DEADLINE)
+}
+
 resource "google_cloud_run_v2_job" "worker" {
   name     = var.service_name
   location = var.region
@@ -27,7 +31,7 @@ resource "google_cloud_run_v2_job" "worker" {
 
     template {
       max_retries = "0"          // Número de novas tentativas por tarefa com falha
-      timeout     = "3600s"      // Tempo limite da tarefa (ex: "3600s" para 1h)
+      timeout     = "${local.task_timeout_seconds}s"
 
       containers {
         image = var.container_image
@@ -37,6 +41,10 @@ resource "google_cloud_run_v2_job" "worker" {
             memory = "1Gi"            
           }
         }
+        env {
+          name  = "ML_SYNC_DEADLINE"
+          value = tostring(local.task_timeout_seconds)
+        }
         env {
           name  = "ACCOUNT_SERVICE_GOOGLE"
           value = var.env_var_account_service_google
@@ -0,0 +1,90 @@
+"""Testes de concorrência do CircuitBreaker."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+THREADS = 32
+
+
+def _tentar(breaker: CircuitBreaker) -> bool:
+    """True se a chamada foi liberada por before_call."""
+    try:
+        breaker.before_call()
+        return True
+    except CircuitOpenError:
+        return False
+
+
+def _abrir(breaker: CircuitBreaker, falhas: int) -> None:
+    for _ in range(falhas):
+        breaker.before_call()
+        breaker.record(False)
+    assert breaker.state == OPEN
+
+
+def test_falhas_concorrentes_abrem_o_circuito():
+    breaker = CircuitBreaker("teste", 5, 60)
+    barreira = threading.Barrier(THREADS, timeout=5)
+
+    def worker(_: int) -> None:
+        barreira.wait()
+        breaker.record(False)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(worker, range(THREADS)))
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_meio_aberto_libera_uma_unica_chamada_de_teste():
+    breaker = CircuitBreaker("teste", 2, 0.05)
+    _abrir(breaker, 2)
+    time.sleep(0.1)
+
+    barreira = threading.Barrier(THREADS, timeout=5)
+
+    def worker(_: int) -> bool:
+        barreira.wait()
+        return _tentar(breaker)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        liberadas = sum(executor.map(worker, range(THREADS)))
+
+    assert liberadas == 1
+    assert breaker.state == HALF_OPEN
+
+    # Sucesso da chamada de teste fecha o circuito para todas as threads
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        assert all(executor.map(lambda _: _tentar(breaker), range(THREADS)))
+
+
+def test_resultado_indefinido_libera_nova_chamada_de_teste():
+    """record(None) devolve a vez de teste sem fechar nem reabrir o circuito."""
+    breaker = CircuitBreaker("teste", 1, 0.05)
+    _abrir(breaker, 1)
+    time.sleep(0.1)
+
+    assert _tentar(breaker)
+    assert not _tentar(breaker)
+    breaker.record(None)
+    assert breaker.state == HALF_OPEN
+    assert _tentar(breaker)
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not _tentar(breaker)
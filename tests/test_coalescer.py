@@ -0,0 +1,82 @@
+"""Testes de concorrência do RequestCoalescer."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.coalescer import RequestCoalescer
+
+THREADS = 16
+
+
+def _aguardar_seguidores(coalescer: RequestCoalescer, seguidores: int) -> None:
+    deadline = time.monotonic() + 5
+    while coalescer.stats()["followers"] < seguidores:
+        assert time.monotonic() < deadline, "seguidores não chegaram"
+        time.sleep(0.005)
+
+
+def test_chamadas_identicas_executam_uma_vez():
+    """Threads com a mesma chave recebem cópias do resultado de uma só chamada."""
+    coalescer = RequestCoalescer()
+    liberar = threading.Event()
+    chamadas = []
+
+    def fn():
+        chamadas.append(1)
+        liberar.wait(5)
+        return {"results": [1, 2, 3]}
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(coalescer.do, "k", fn) for _ in range(THREADS)]
+        _aguardar_seguidores(coalescer, THREADS - 1)
+        liberar.set()
+        resultados = [f.result(timeout=5) for f in futures]
+
+    assert len(chamadas) == 1
+    assert all(r == {"results": [1, 2, 3]} for r in resultados)
+    # Cada chamador recebe seu próprio objeto mutável
+    assert len({id(r) for r in resultados}) == THREADS
+    assert len({id(r["results"]) for r in resultados}) == THREADS
+    assert coalescer.stats() == {"leaders": 1, "followers": THREADS - 1, "in_flight": 0}
+
+
+def test_excecao_chega_a_todos_os_seguidores():
+    coalescer = RequestCoalescer()
+    liberar = threading.Event()
+
+    def fn():
+        liberar.wait(5)
+        raise RuntimeError("falhou")
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(coalescer.do, "k", fn) for _ in range(THREADS)]
+        _aguardar_seguidores(coalescer, THREADS - 1)
+        liberar.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="falhou"):
+                future.result(timeout=5)
+
+    assert coalescer.stats()["in_flight"] == 0
+    # Terminada a chamada, a chave volta a executar normalmente
+    assert coalescer.do("k", lambda: 42) == 42
+
+
+def test_chaves_diferentes_nao_se_bloqueiam():
+    coalescer = RequestCoalescer()
+    barreira = threading.Barrier(THREADS, timeout=5)
+
+    def fn(chave: int):
+        # Só passa se todas as chaves estiverem em execução ao mesmo tempo
+        barreira.wait()
+        return chave
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        resultados = list(
+            executor.map(lambda k: coalescer.do(k, lambda: fn(k)), range(THREADS))
+        )
+
+    assert resultados == list(range(THREADS))
+    assert coalescer.stats() == {"leaders": THREADS, "followers": 0, "in_flight": 0}
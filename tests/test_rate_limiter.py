@@ -0,0 +1,49 @@
+"""Testes de concorrência do RateLimiter."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.rate_limiter import RateLimiter
+
+
+def test_threads_respeitam_a_taxa():
+    """Fichas disputadas por várias threads não ultrapassam a taxa."""
+    rate = 200.0
+    threads, por_thread = 16, 10
+    limiter = RateLimiter(rate)
+    liberadas = []
+    lock = threading.Lock()
+
+    def worker(_: int) -> None:
+        for _ in range(por_thread):
+            limiter.acquire()
+            with lock:
+                liberadas.append(time.monotonic())
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = time.monotonic() - started
+
+    total = threads * por_thread
+    assert len(liberadas) == total
+    # O balde começa vazio: cada ficha leva 1/rate segundos para ser reposta
+    assert elapsed >= (total - 1) / rate * 0.9
+
+    # Em nenhuma janela de 0,2s saem mais fichas que a taxa permite (com folga)
+    liberadas.sort()
+    janela = 0.2
+    inicio = 0
+    for fim, instante in enumerate(liberadas):
+        while instante - liberadas[inicio] > janela:
+            inicio += 1
+        assert fim - inicio + 1 <= rate * janela + 2
+
+
+def test_taxa_zero_nao_bloqueia():
+    limiter = RateLimiter(0)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: limiter.acquire(), range(1000)))
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,156 @@
+"""Testes de concorrência do cache e do refresh coordenado do TokenManager."""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.services import token_manager
+from src.services.token_manager import TokenManager
+
+LOJA = "123"
+THREADS = 32
+
+
+def _validade(horas: float) -> str:
+    return str(datetime.now(timezone.utc) + timedelta(hours=horas))
+
+
+class FakeRepository:
+    """Credenciais de uma loja em memória, com o compare-and-set do repositório."""
+
+    def __init__(self, access_token: str = "antigo", horas: float = -1):
+        self._lock = threading.Lock()
+        self.cred: Dict[str, Any] = {
+            "access_token": access_token,
+            "refresh_token": "refresh",
+            "validade": _validade(horas),
+            "token_version": 0,
+        }
+        self.leituras = 0
+
+    def get_credentials(self, id: str) -> Dict[str, Any]:
+        with self._lock:
+            self.leituras += 1
+            return dict(self.cred)
+
+    def compare_and_set_token(
+        self,
+        id: str,
+        expected_version: int,
+        new_version: int,
+        token: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        with self._lock:
+            if self.cred["token_version"] != expected_version:
+                return False
+            self.cred["token_version"] = new_version
+            if token:
+                self.cred.update(token)
+            return True
+
+
+class FakeOAuth:
+    """Substitui o refresh OAuth: cada chamada demora e gera um token novo."""
+
+    def __init__(self, atraso: float = 0.05):
+        self._atraso = atraso
+        self._seq = itertools.count(1)
+        self.chamadas: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, id: str, cred: Dict[str, Any]) -> Dict[str, Any]:
+        time.sleep(self._atraso)
+        with self._lock:
+            token = f"novo-{next(self._seq)}"
+            self.chamadas.append(token)
+        return {"access_token": token, "refresh_token": "refresh", "validade": _validade(4)}
+
+
+@pytest.fixture(autouse=True)
+def _espera_curta(monkeypatch):
+    monkeypatch.setattr(token_manager, "REFRESH_POLL_SECONDS", 0.01)
+
+
+def _manager(repository: FakeRepository, oauth: FakeOAuth) -> TokenManager:
+    manager = TokenManager(repository)  # type: ignore[arg-type]
+    manager.refresh_token = oauth  # type: ignore[method-assign]
+    return manager
+
+
+def _em_paralelo(fns) -> List[Any]:
+    barreira = threading.Barrier(len(fns), timeout=5)
+
+    def rodar(fn):
+        barreira.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=len(fns)) as executor:
+        return [f.result(timeout=30) for f in [executor.submit(rodar, fn) for fn in fns]]
+
+
+def test_token_expirado_faz_um_unico_refresh_entre_threads():
+    repository, oauth = FakeRepository(), FakeOAuth()
+    manager = _manager(repository, oauth)
+
+    tokens = _em_paralelo([lambda: manager.get_access_token(LOJA)] * THREADS)
+
+    assert oauth.chamadas == ["novo-1"]
+    assert set(tokens) == {"novo-1"}
+    assert repository.cred["access_token"] == "novo-1"
+    assert repository.cred["token_version"] == 2
+
+
+def test_token_valido_em_cache_nao_relê_o_repositorio():
+    repository, oauth = FakeRepository(horas=4), FakeOAuth()
+    manager = _manager(repository, oauth)
+
+    tokens = _em_paralelo([lambda: manager.get_access_token(LOJA)] * THREADS)
+
+    assert set(tokens) == {"antigo"}
+    assert repository.leituras == 1
+    assert oauth.chamadas == []
+
+
+def test_refresh_unico_entre_processos():
+    """Dois gerenciadores (processos) com o mesmo repositório fazem um só refresh."""
+    repository, oauth = FakeRepository(), FakeOAuth(atraso=0.1)
+    managers = [_manager(repository, oauth) for _ in range(2)]
+
+    tokens = _em_paralelo(
+        [lambda m=m: m.get_access_token(LOJA) for m in managers] * (THREADS // 2)
+    )
+
+    assert oauth.chamadas == ["novo-1"]
+    assert set(tokens) == {"novo-1"}
+
+
+def test_refresh_forcado_por_token_recusado_acontece_uma_vez():
+    repository, oauth = FakeRepository(horas=4), FakeOAuth()
+    manager = _manager(repository, oauth)
+    recusado = manager.get_access_token(LOJA)
+
+    tokens = _em_paralelo(
+        [lambda: manager.force_refreshing_token(LOJA, stale_token=recusado)] * THREADS
+    )
+
+    assert oauth.chamadas == ["novo-1"]
+    assert set(tokens) == {"novo-1"}
+
+
+def test_refresh_forcado_reutiliza_token_gravado_por_outro_processo():
+    repository, oauth = FakeRepository(horas=4), FakeOAuth()
+    manager = _manager(repository, oauth)
+    recusado = manager.get_access_token(LOJA)
+
+    # Outro processo já trocou o token recusado
+    repository.compare_and_set_token(
+        LOJA, 0, 2, {"access_token": "de-outro", "validade": _validade(4)}
+    )
+
+    assert manager.force_refreshing_token(LOJA, stale_token=recusado) == "de-outro"
+    assert oauth.chamadas == []
@@ -1,14 +1,142 @@
 import sys
-import time
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
 
+from dataclasses import asdict
 from datetime import datetime
-from src import api
-from src.utils.data import get_periodo_ultimos_dias, get_first_and_last_day_of_last_year
+from src import api, factory
+from src.interfaces.credentials_repository_interface import ICredentialsRepository
+from src.models.mercado_livre import Item, OrderSearchResponse
+from src.models.records import SaleRecord, from_frame
+from src.models.rollups import agregar_vendas
+from src.models.schemas import SCHEMA_VENDAS, aplicar_schema, to_frame
+from src.services.sales_writer import SalesWriter
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.config import settings
+from src.utils.data import get_data_corte, somar_dias
 from src.utils.log import log
-from src.factories.factory import Factory
+from src.utils.metrics import metrics
+from src.utils.paginacao import BuscarPagina, PaginadorPedidos, formatar_instante
+from src.utils.travas import trava_vendas
+
+
+def _limites(data_inicial: str, data_final: str) -> Tuple[datetime, datetime]:
+    """Início e fim dos dias no fuso dos date_created (ML_ORDERS_UTC_OFFSET)."""
+    fuso = settings.ml_orders_utc_offset
+    return (
+        datetime.fromisoformat(f"{data_inicial}T00:00:00{fuso}"),
+        datetime.fromisoformat(f"{data_final}T23:59:59{fuso}"),
+    )
+
+
+def _buscador(id: str, fechados_ate: Optional[datetime] = None) -> BuscarPagina:
+    """
+    Busca uma página de pedidos pagos da janela.
+
+    Janelas que terminam antes de `fechados_ate` (pedidos que não mudam mais)
+    são servidas do cache por ML_CACHE_FINAL_TTL.
+    """
+
+    def buscar(de: datetime, ate: datetime, offset: int, limite: int):
+        fechada = fechados_ate is not None and ate < fechados_ate
+        return api.get(
+            f"{settings.ml_api_url}/orders/search?offset={offset}&limit={limite}&seller={id}&order.status=paid&order.date_created.from={formatar_instante(de)}&order.date_created.to={formatar_instante(ate)}&sort=date_asc",
+            id,
+            cache_ttl=settings.ml_cache_final_ttl if fechada else None,
+            schema=OrderSearchResponse,
+        )
+
+    return buscar
+
+
+def _sondar(buscar: BuscarPagina, dias: List[str]) -> Optional[int]:
+    """Total de pedidos pagos de dias consecutivos, lido com limit=1 (None se falhar)."""
+    try:
+        response = buscar(*_limites(dias[0], dias[-1]), 0, 1)
+    except Exception as e:
+        log.warning(f"Vendas ML: falha na sondagem de {dias[0]} a {dias[-1]}: {e}")
+        return None
+    return response.paging.total if isinstance(response, OrderSearchResponse) else None
+
+
+def _dias_alterados(
+    repository: ICredentialsRepository,
+    id: str,
+    data_inicial: str,
+    data_final: str,
+    buscar: BuscarPagina,
+) -> Tuple[Dict[str, Optional[int]], int]:
+    """
+    Compara o total de pedidos da API com a contagem gravada de cada dia.
+
+    Dias recentes (ML_SALES_PROBE_RECENT_DAYS) ou sem contagem gravada são
+    sempre buscados. Os demais são sondados em blocos de até
+    ML_SALES_PROBE_BUCKET dias consecutivos; só os blocos cujo total difere
+    da soma gravada são sondados dia a dia.
+
+    Returns:
+        ({dia a buscar: total na API, ou None se não sondado}, requisições feitas)
+    """
+    dias: List[str] = []
+    dia = data_inicial
+    while dia <= data_final:
+        dias.append(dia)
+        dia = somar_dias(dia, 1)
+
+    recentes = somar_dias(data_final, 1 - settings.sales_probe_recent_days)
+    gravadas = repository.get_sales_day_counts(id, data_inicial, data_final)
+    alterados: Dict[str, Optional[int]] = {
+        dia: None for dia in dias if dia >= recentes or dia not in gravadas
+    }
+
+    blocos: List[List[str]] = []
+    bloco: List[str] = []
+    for dia in dias:
+        if dia not in alterados:
+            bloco.append(dia)
+        if bloco and (dia in alterados or len(bloco) == settings.sales_probe_bucket_days):
+            blocos.append(bloco)
+            bloco = []
+    if bloco:
+        blocos.append(bloco)
+
+    with ThreadPoolExecutor(max_workers=settings.sales_probe_workers) as executor:
+        totais = list(executor.map(lambda b: _sondar(buscar, b), blocos))
+        divergentes = [
+            (b, total)
+            for b, total in zip(blocos, totais)
+            if total != sum(gravadas[dia] for dia in b)
+        ]
+        sondar = [dia for b, _ in divergentes if len(b) > 1 for dia in b]
+        totais_dia = dict(zip(sondar, executor.map(lambda d: _sondar(buscar, [d]), sondar)))
+    totais_dia.update((b[0], total) for b, total in divergentes if len(b) == 1)
+
+    for dia, total in totais_dia.items():
+        if total != gravadas[dia]:
+            alterados[dia] = total
+
+    ignorados = len(dias) - len(alterados)
+    metrics.inc("sales_probe_days_total", ignorados, result="unchanged")
+    metrics.inc("sales_probe_days_total", len(alterados), result="fetched")
+    return dict(sorted(alterados.items())), len(blocos) + len(sondar)
+
+
+def _periodos(alterados: Dict[str, Optional[int]]) -> List[Tuple[str, str, bool]]:
+    """
+    Agrupa os dias a buscar em intervalos consecutivos.
+
+    Returns:
+        [(primeiro dia, último dia, mantém o gravado se a busca vier vazia)]
+    """
+    periodos: List[Tuple[str, str, bool]] = []
+    for dia, total in alterados.items():
+        if periodos and somar_dias(periodos[-1][1], 1) == dia:
+            de, _, manter_vazio = periodos[-1]
+            periodos[-1] = (de, dia, manter_vazio or total != 0)
+        else:
+            periodos.append((dia, dia, total != 0))
+    return periodos
 
 
 def get_vendas_ml(
@@ -18,122 +146,165 @@ def get_vendas_ml(
     data_inicial_ano: str,
     data_final_ano: str,
 ) -> bool:
-    repository = Factory().create_credentials_repository()
-    erros = []
+    repository = factory.create_credentials_repository()
+    staging = factory.create_staging_service()
+    run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+
+    paginas_brutas: List[Dict[str, Any]] = []
+    gravar = settings.write_backend != "none"
+    sondar = gravar and settings.sales_probe and settings.sync_mode == "incremental"
+    buscar = _buscador(id)
+
+    # Sem sondagem, o período inteiro é buscado e, se vier vazio, mantido
+    periodos = [(data_inicial, data_final, True)]
+    data_corte = get_data_corte(settings.ml_orders_final_days)
+    if not sondar and data_inicial < data_corte:
+        # Pedidos mais antigos que ML_ORDERS_FINAL_DAYS não mudam mais: esses
+        # dias formam uma janela própria, servida do cache
+        buscar = _buscador(id, fechados_ate=_limites(data_corte, data_corte)[0])
+        if data_corte <= data_final:
+            periodos = [
+                (data_inicial, somar_dias(data_corte, -1), True),
+                (data_corte, data_final, True),
+            ]
+    elif sondar:
+        try:
+            alterados, sondagens = _dias_alterados(
+                repository, id, data_inicial, data_final, buscar
+            )
+        except Exception as e:
+            log.warning(f"Vendas ML: sondagem indisponível para {id} ({e}); buscando o período")
+        else:
+            periodos = _periodos(alterados)
+            log.info(
+                f"Vendas ML: sondagem de {id} com {sondagens} requisições; "
+                f"{len(alterados)} dias a buscar em {len(periodos)} intervalos"
+            )
 
-    dados_vendas: List[Dict[str, Any]] = []
+    enrichment = (
+        factory.create_item_enrichment_service(api) if settings.ml_enrich_items else None
+    )
+    if gravar:
+        # O ano passado é excluído a cada execução, mesmo sem vendas novas
+        repository.delete_sales_by_id_and_date(id, data_inicial_ano, data_final_ano)
+        if settings.daily_rollups:
+            repository.delete_sales_rollups_by_id_and_date(
+                id, data_inicial_ano, data_final_ano
+            )
 
-    offset = 0
+    registros: List[SaleRecord] = []
+    itens: Dict[str, Item] = {}
+    for de, ate, manter_vazio in periodos:
+        paginador = PaginadorPedidos(buscar)
 
-    data_inicial_padrao = data_inicial + "T00:00:00Z"
+        # As páginas são gravadas, dia a dia, enquanto as seguintes são baixadas
+        writer = SalesWriter(
+            repository,
+            id,
+            de,
+            ate,
+            enrichment=enrichment,
+            gravar=gravar,
+            manter_vazio=manter_vazio,
+        ).iniciar()
 
-    while True:
+        completo = False
         try:
-            response = api.get(
-                f"https://api.mercadolibre.com/orders/search?offset={offset}&limit=50&seller={id}&order.status=paid&order.date_created.from={data_inicial_padrao}&order.date_created.to={data_final}T23:59:59Z&sort=date_asc",
-                id,
-            )
+            for response in paginador.paginas(*_limites(de, ate)):
+                if staging is not None:
+                    paginas_brutas.append(asdict(response))
 
-            if response == {} or response == None:
-                if len(erros) > 30:
+                writer.enviar(
+                    [
+                        SaleRecord.from_order(pedido, order, id)
+                        for pedido in response.results
+                        for order in pedido.order_items
+                    ]
+                )
+                if writer.falhou:
                     break
-                erros.append(f"Resposta vazia ou nula para {id}")
-                continue
-
-            for pedido in response.get("results", []):
-                for order in pedido.get("order_items", []):
-                    # Formata a data para yyyy-mm-dd
-                    date_created_raw = pedido.get("date_created", "")
-                    try:
-                        date_created_fmt = (
-                            datetime.strptime(
-                                date_created_raw[:10], "%Y-%m-%d"
-                            ).strftime("%Y-%m-%d")
-                            if date_created_raw
-                            else ""
-                        )
-                    except Exception:
-                        date_created_fmt = ""
-
-                    dados_vendas.append(
-                        {
-                            "Número_do_pedido_multiloja": pedido.get("id", 0),
-                            "pack_id": pedido.get("pack_id", 0),
-                            "title": order.get("item", {}).get("title", ""),
-                            "category_id": order.get("item", {}).get("category_id", ""),
-                            "mlb": order.get("item", {}).get("id", ""),
-                            "seller_sku": order.get("item", {}).get("seller_sku", ""),
-                            "quantity": order.get("quantity", 0),
-                            "unit_price": order.get("unit_price", 0.0),
-                            "full_unit_price": order.get("full_unit_price", 0.0),
-                            "sale_fee": order.get("sale_fee", 0.0),
-                            "listing_type_id": order.get("listing_type_id", ""),
-                            "pack_id": pedido.get("pack_id", 0),
-                            "date_created": date_created_fmt,
-                            "paid_amount": pedido.get("paid_amount", 0.0),
-                            "id": id,
-                        }
-                    )
-
-            if offset >= response.get("paging", {}).get("total", 0):
-                break
-
-            offset += 50
-
-            if offset >= 10000:
-                data_inicial_padrao = pedido.get("date_created", "")
-                offset = 0
+            completo = paginador.completo and not writer.falhou
+
+        except CircuitOpenError as e:
+            # Os dias já concluídos são gravados pelo writer; os demais ficam para a próxima execução
+            log.error(f"Vendas ML: {e}; interrompendo a busca de {id}")
 
         except Exception as e:
             log.error(f"Vendas ML: Error get_vendas_ml: {e}")
-            break
-
-    if len(dados_vendas) > 0:
-        df_vendas_ml = pd.DataFrame(dados_vendas)
-        df_vendas_ml = df_vendas_ml.fillna(
-            {
-                "Número_do_pedido_multiloja": 0,
-                "title": "",
-                "category_id": "",
-                "mlb": "",
-                "seller_sku": "",
-                "quantity": 0,
-                "unit_price": 0.0,
-                "full_unit_price": 0.0,
-                "sale_fee": 0.0,
-                "listing_type_id": "",
-                "pack_id": 0,
-                "date_created": "",
-                "paid_amount": 0.0,
-                "id": id,
-            }
+
+        try:
+            registros.extend(writer.finalizar(completo))
+        except Exception:
+            # O erro de gravação já foi registrado pela thread de gravação
+            return False
+        itens.update(writer.itens)
+
+        log.info(
+            f"Vendas ML: {de} a {ate}: {paginador.requisicoes} requisições em "
+            f"{paginador.janelas} janelas (limit={paginador.limite}, "
+            f"{paginador.duplicados} pedidos repetidos descartados, "
+            f"{writer.gravacoes} gravações)"
         )
 
-        repository.delete_sales_by_id_and_date(id, data_inicial_ano, data_final_ano)
-        repository.delete_sales_by_id_and_date(id, data_inicial, data_final)
+        if not completo:
+            # Dias ainda não concluídos mantêm as vendas gravadas anteriormente
+            log.error(
+                f"Vendas ML: busca incompleta para {id}; apenas os dias concluídos foram regravados"
+            )
+            return False
+
+    if itens and gravar:
+        repository.upsert_items(id, list(itens.values()))
 
-        repository.insert_sales_from_dataframe(df_vendas_ml)
+    if len(registros) > 0 and staging is not None:
+        df_vendas_ml = to_frame(registros, SCHEMA_VENDAS)
+        staging.write_raw("sales", id, run_id, paginas_brutas)
+        staging.write_frame("sales", id, df_vendas_ml, "date_created")
+
+    if not gravar:
+        log.info(
+            f"Vendas ML: {len(registros)} registros de {id} não gravados (ML_WRITE_BACKEND=none)"
+        )
 
     return True
 
 
-if __name__ == "__main__":
-    start_time = time.time()
+def recarregar_vendas_do_staging(id: str, data_inicial: str, data_final: str) -> bool:
+    """
+    Regrava em sales_ml as vendas do período a partir do staging, sem chamar a API.
+    """
+    repository = factory.create_credentials_repository()
+    staging = factory.create_staging_service()
+    if staging is None:
+        log.error("Vendas ML: staging não configurado (ML_STAGING_DIR)")
+        return False
 
-    # id = sys.argv[1]
-    # periodo = sys.argv[2]
+    df_vendas_ml = staging.load_frame("sales", id, data_inicial, data_final)
+    if df_vendas_ml.empty:
+        log.warning(f"Vendas ML: nenhum dado no staging para {id}")
+        return False
+    df_vendas_ml = aplicar_schema(df_vendas_ml, SCHEMA_VENDAS)
 
-    id = "179385579"
-    periodo = "short"
-    
-    data_inicial_ano, data_final_ano = get_first_and_last_day_of_last_year()
+    # Cada partição tem apenas os dias gravados por uma execução: exclui só os
+    # dias presentes no staging, para não perder os que nunca foram gravados
+    registros = from_frame(SaleRecord, df_vendas_ml)
+    dias = dict.fromkeys(sorted({r.date_created for r in registros if r.date_created}))
+    with trava_vendas(id, repository):
+        for de, ate, _ in _periodos(dias):
+            if settings.sales_probe:
+                # O staging pode estar defasado em relação à API: os dias voltam a ser buscados
+                repository.delete_sales_day_counts(id, de, ate)
+            repository.delete_sales_by_id_and_date(id, de, ate)
+            if settings.daily_rollups:
+                repository.delete_sales_rollups_by_id_and_date(id, de, ate)
+        repository.insert_sales_records(registros)
 
-    if periodo == "short":
-        data_anterior, data_posterior = get_periodo_ultimos_dias(7)
-    else:
-        data_anterior, data_posterior = get_periodo_ultimos_dias(120)
+        if settings.daily_rollups:
+            repository.upsert_sales_rollups(agregar_vendas(registros))
+    return True
 
-    get_vendas_ml(id, data_anterior, data_posterior, data_inicial_ano, data_final_ano)
 
-    end_time = time.time()
-    print(f"Vendas ML requisitadas em {end_time - start_time:.2f} segundos")
+if __name__ == "__main__":
+    from src.cli import main
+
+    sys.exit(main(["sync", "sales", *sys.argv[1:]]))